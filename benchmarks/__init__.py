@@ -0,0 +1 @@
+"""Benchmarks for the Inky pHat Dashboard."""
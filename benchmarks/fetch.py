@@ -0,0 +1,65 @@
+"""Benchmark for polling sensor states from a local Home Assistant stand-in.
+
+Run from the repository root with `python -m benchmarks.fetch`.
+"""
+
+import asyncio
+import time
+
+from inky_phat_dashboard.waste_module import WasteModule
+from tests.fake_home_assistant import (
+    FakeHomeAssistant,
+    create_config,
+    create_states,
+)
+
+SENSOR_COUNTS = [1, 4, 12]
+LATENCY_SECONDS = 0.05
+UNRELATED_ENTITY_COUNT = 200
+CYCLES = 5
+
+
+async def run(sensor_count: int, **home_assistant_options) -> tuple[float, float]:
+    """Poll the stand-in and return the milliseconds and requests per cycle."""
+
+    states = create_states(sensor_count)
+    states.update({f"sensor.unrelated{i}": "on" for i in range(UNRELATED_ENTITY_COUNT)})
+
+    async with FakeHomeAssistant(
+        states, latency_seconds=LATENCY_SECONDS
+    ) as home_assistant:
+        waste_module = WasteModule(
+            create_config(home_assistant.url, sensor_count, **home_assistant_options)
+        )
+
+        start = time.perf_counter()
+        for _ in range(CYCLES):
+            await waste_module.update()
+        elapsed = time.perf_counter() - start
+
+        return elapsed * 1000 / CYCLES, home_assistant.request_count / CYCLES
+
+
+def main():
+    """Run the benchmark."""
+
+    print(
+        f"latency {LATENCY_SECONDS * 1000:.0f} ms per request, "
+        f"{UNRELATED_ENTITY_COUNT} unrelated entities"
+    )
+    print(f"{'sensors':>8}{'mode':>20}{'ms/cycle':>12}{'requests/cycle':>16}")
+
+    modes = {
+        "sequential": {"max_parallel_requests": 1},
+        "parallel": {},
+        "bulk": {"bulk_fetch": True},
+    }
+
+    for sensor_count in SENSOR_COUNTS:
+        for mode, options in modes.items():
+            elapsed_ms, requests = asyncio.run(run(sensor_count, **options))
+            print(f"{sensor_count:>8}{mode:>20}{elapsed_ms:>12.1f}{requests:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark for setting up the background and border of a frame.
+
+Run from the repository root with `python -m benchmarks.frame_setup`.
+"""
+
+import timeit
+
+from PIL import Image
+
+from inky_phat_dashboard.const import IMAGE_BORDER_PATH, ColorMode
+from inky_phat_dashboard.image_generator import ImageGenerator
+from inky_phat_dashboard.image_tools import ImageTools
+from inky_phat_dashboard.models import Config, HomeAssistantConfig
+
+REPEAT = 5
+NUMBER = 200
+
+
+def best_of(func) -> float:
+    """Return the best time per call in microseconds."""
+
+    return min(timeit.repeat(func, repeat=REPEAT, number=NUMBER)) / NUMBER * 1e6
+
+
+def main():
+    """Run the benchmark."""
+
+    print(
+        f"{'color mode':<12}{'alert':<8}{'decode+recolor':>16}{'sprite':>10}{'base':>10}"
+    )
+
+    for color_mode in ColorMode:
+        config = Config(
+            color_palette="red",
+            home_assistant_config=HomeAssistantConfig(url="", token=""),
+            color_mode=color_mode,
+        )
+        image_generator = ImageGenerator(config)
+
+        for is_border_alert in (False, True):
+            color = (
+                image_generator.alert_color
+                if is_border_alert
+                else image_generator.primary_color
+            )
+
+            def decode_and_recolor():
+                return ImageTools.merge_images(
+                    ImageTools.create_background(color_mode),
+                    ImageTools.recolor_non_transparent_pixels(
+                        Image.open(IMAGE_BORDER_PATH).convert("RGBA"), color
+                    ),
+                    (0, 0),
+                )
+
+            def sprite():
+                return ImageTools.merge_images(
+                    ImageTools.create_background(color_mode),
+                    image_generator._sprite_cache.get(IMAGE_BORDER_PATH, color),
+                    (0, 0),
+                )
+
+            def base_layer():
+                return image_generator._create_base_layer(is_border_alert)
+
+            print(
+                f"{color_mode:<12}{is_border_alert!s:<8}"
+                f"{best_of(decode_and_recolor):>14.1f}us"
+                f"{best_of(sprite):>8.1f}us"
+                f"{best_of(base_layer):>8.1f}us"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark for recoloring the media assets.
+
+Run from the repository root with `python -m benchmarks.recolor`.
+"""
+
+import timeit
+
+from PIL import Image
+
+from inky_phat_dashboard.const import IMAGE_BORDER_PATH
+from inky_phat_dashboard.image_tools import ImageTools
+
+ASSET_PATHS = [
+    IMAGE_BORDER_PATH,
+    "media/waste/waste_small.png",
+    "media/waste/recycling_small.png",
+    "media/waste/paper_small.png",
+    "media/waste/organic_small.png",
+    "media/waste/waste_large.png",
+]
+COLOR = (255, 0, 0, 255)
+REPEAT = 5
+NUMBER = 20
+
+
+def recolor_per_pixel(
+    image: Image.Image, new_color: tuple[int, int, int, int]
+) -> Image.Image:
+    """Recolor an image like the former per-pixel implementation."""
+
+    new_data: list[tuple[int, int, int, int]] = []
+    pixels = image.load()
+    for y in range(image.height):
+        for x in range(image.width):
+            item = pixels[x, y]
+            new_data.append(
+                (new_color[0], new_color[1], new_color[2], item[3])
+                if item[3] != 0
+                else item
+            )
+    image.putdata(new_data)
+    return image
+
+
+def best_of(func) -> float:
+    """Return the best time per call in milliseconds."""
+
+    return min(timeit.repeat(func, repeat=REPEAT, number=NUMBER)) / NUMBER * 1000
+
+
+def main():
+    """Run the benchmark."""
+
+    images = {path: Image.open(path).convert("RGBA") for path in ASSET_PATHS}
+
+    print(f"{'asset':<36}{'per-pixel ms':>14}{'bulk ms':>10}{'speedup':>10}")
+
+    for path, image in images.items():
+        per_pixel = best_of(lambda: recolor_per_pixel(image.copy(), COLOR))
+        bulk = best_of(
+            lambda: ImageTools.recolor_non_transparent_pixels(image.copy(), COLOR)
+        )
+        print(f"{path:<36}{per_pixel:>14.3f}{bulk:>10.3f}{per_pixel / bulk:>9.1f}x")
+
+    frame = [(image, COLOR) for image in images.values()]
+    per_pixel = best_of(
+        lambda: [recolor_per_pixel(image.copy(), color) for image, color in frame]
+    )
+    bulk = best_of(
+        lambda: ImageTools.recolor_non_transparent_pixels_batch(
+            (image.copy(), color) for image, color in frame
+        )
+    )
+    print(
+        f"{'batch (all assets)':<36}{per_pixel:>14.3f}{bulk:>10.3f}{per_pixel / bulk:>9.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""Headless benchmark suite for ImageGenerator and ImageTools.
+
+Run from the repository root with `python -m benchmarks.render`. Use
+`--output results.json` to save the results and `--compare results.json` to
+compare a later run against them, e.g. between two commits. Allocations are
+the Python heap allocations traced by tracemalloc during one call.
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+import PIL
+from PIL import Image
+
+from inky_phat_dashboard.const import (
+    DEFAULT_FONT_PATH,
+    IMAGE_BORDER_PATH,
+    RECTANGLE_TEXT_DASHBOARD_UPPER_LEFT,
+    RECTANGLE_TEXT_DETAILED_UPPER,
+    ColorMode,
+    ColorPalette,
+    RenderMode,
+    VerticalAlign,
+)
+from inky_phat_dashboard.image_generator import ImageGenerator
+from inky_phat_dashboard.image_tools import ImageTools
+from inky_phat_dashboard.models import (
+    Config,
+    DashboardElementData,
+    DashboardViewData,
+    DetailedViewData,
+    DetailedViewTwoLinesData,
+    HomeAssistantConfig,
+)
+
+DEFAULT_ITERATIONS = 100
+WARMUP_ITERATIONS = 3
+PERCENTILES = (50, 90, 99)
+
+
+def dashboard_view_data(is_alert: bool) -> DashboardViewData:
+    """Get the data for a full dashboard view."""
+
+    return DashboardViewData(
+        elements=[
+            DashboardElementData("media/waste/waste_small.png", "2"),
+            DashboardElementData("media/waste/recycling_small.png", "14"),
+            DashboardElementData(
+                "media/waste/paper_small.png", "Morgen", is_alert, is_alert
+            ),
+            DashboardElementData(
+                "media/waste/organic_small.png", "Nicht verfügbar", is_alert, is_alert
+            ),
+        ],
+        is_border_alert=is_alert,
+    )
+
+
+def detailed_view_data(is_alert: bool) -> DetailedViewData:
+    """Get the data for a detailed view."""
+
+    return DetailedViewData(
+        "media/clock/clock_large.png",
+        "22:30",
+        is_border_alert=is_alert,
+        is_icon_alert=is_alert,
+        is_text_alert=is_alert,
+    )
+
+
+def detailed_view_two_lines_data(is_alert: bool) -> DetailedViewTwoLinesData:
+    """Get the data for a detailed view with two lines."""
+
+    return DetailedViewTwoLinesData(
+        "media/waste/waste_large.png",
+        "Restabfall",
+        "Morgen",
+        is_border_alert=is_alert,
+        is_icon_alert=is_alert,
+        is_upper_text_alert=is_alert,
+        is_lower_text_alert=is_alert,
+    )
+
+
+def cases() -> dict[str, Callable[[], object]]:
+    """Get the benchmarked calls by name."""
+
+    result: dict[str, Callable[[], object]] = {}
+
+    for render_mode, color_mode, color_palette, is_alert in itertools.product(
+        RenderMode, ColorMode, ColorPalette, (False, True)
+    ):
+        image_generator = ImageGenerator(
+            Config(
+                color_palette=color_palette,
+                home_assistant_config=HomeAssistantConfig(url="", token=""),
+                color_mode=color_mode,
+                render_mode=render_mode,
+            )
+        )
+        suffix = (
+            f"{render_mode}/{color_mode}/{color_palette}/"
+            f"{'alert' if is_alert else 'normal'}"
+        )
+
+        result[f"generate_dashboard_view/{suffix}"] = (
+            lambda image_generator=image_generator, is_alert=is_alert: (
+                image_generator.generate_dashboard_view(dashboard_view_data(is_alert))
+            )
+        )
+        result[f"generate_detailed_view/{suffix}"] = (
+            lambda image_generator=image_generator, is_alert=is_alert: (
+                image_generator.generate_detailed_view(detailed_view_data(is_alert))
+            )
+        )
+        result[f"generate_detailed_view_two_lines/{suffix}"] = (
+            lambda image_generator=image_generator, is_alert=is_alert: (
+                image_generator.generate_detailed_view_two_lines(
+                    detailed_view_two_lines_data(is_alert)
+                )
+            )
+        )
+
+    border = Image.open(IMAGE_BORDER_PATH).convert("RGBA")
+    icon = Image.open("media/waste/waste_small.png").convert("RGBA")
+    canvas = ImageTools.create_background(ColorMode.LIGHT)
+
+    result["recolor_non_transparent_pixels/border"] = lambda: (
+        ImageTools.recolor_non_transparent_pixels(border.copy(), (255, 0, 0, 255))
+    )
+    result["recolor_non_transparent_pixels/icon_small"] = lambda: (
+        ImageTools.recolor_non_transparent_pixels(icon.copy(), (0, 0, 0, 255))
+    )
+    result["place_text_in_rectangle/dashboard"] = lambda: (
+        ImageTools.place_text_in_rectangle(
+            canvas,
+            DEFAULT_FONT_PATH,
+            RECTANGLE_TEXT_DASHBOARD_UPPER_LEFT,
+            "Morgen",
+            (0, 0, 0, 255),
+            VerticalAlign.CENTER,
+        )
+    )
+    result["place_text_in_rectangle/detailed"] = lambda: (
+        ImageTools.place_text_in_rectangle(
+            canvas,
+            DEFAULT_FONT_PATH,
+            RECTANGLE_TEXT_DETAILED_UPPER,
+            "Restabfall",
+            (0, 0, 0, 255),
+            VerticalAlign.BOTTOM,
+        )
+    )
+
+    return result
+
+
+def measure(func: Callable[[], object], iterations: int) -> dict[str, float]:
+    """Measure the latency percentiles and allocations of a call."""
+
+    for _ in range(WARMUP_ITERATIONS):
+        func()
+
+    durations_ms = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        durations_ms.append((time.perf_counter() - start) * 1000)
+
+    # Allocations are traced in a separate call so tracing does not skew timings
+    tracemalloc.start()
+    func()
+    allocated_bytes = sum(
+        statistic.size
+        for statistic in tracemalloc.take_snapshot().statistics("filename")
+    )
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    quantiles = statistics.quantiles(durations_ms, n=100, method="inclusive")
+    result = {
+        "iterations": iterations,
+        "mean_ms": statistics.fmean(durations_ms),
+        **{
+            f"p{percentile}_ms": quantiles[percentile - 1] for percentile in PERCENTILES
+        },
+        "allocated_kib": allocated_bytes / 1024,
+        "peak_kib": peak_bytes / 1024,
+    }
+
+    return result
+
+
+def print_results(results: dict[str, dict[str, float]], baseline: dict | None):
+    """Print the results and the change of the median against a baseline."""
+
+    header = f"{'benchmark':<64}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'peak KiB':>10}"
+    if baseline is not None:
+        header += f"{'p50 change':>12}"
+    print(header)
+
+    for name, result in results.items():
+        line = (
+            f"{name:<64}{result['p50_ms']:>9.3f}{result['p90_ms']:>9.3f}"
+            f"{result['p99_ms']:>9.3f}{result['peak_kib']:>10.1f}"
+        )
+
+        if baseline is not None:
+            baseline_result = baseline["results"].get(name)
+            line += (
+                f"{(result['p50_ms'] / baseline_result['p50_ms'] - 1):>+12.1%}"
+                if baseline_result
+                else f"{'new':>12}"
+            )
+
+        print(line)
+
+
+def main():
+    """Run the benchmark suite."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--filter", default="", help="Only run names containing this")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    parser.add_argument("--compare", type=Path, help="Compare against a JSON result")
+    args = parser.parse_args()
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+
+    results = {
+        name: measure(func, args.iterations)
+        for name, func in cases().items()
+        if args.filter in name
+    }
+
+    print_results(results, baseline)
+
+    if args.output:
+        args.output.write_text(
+            json.dumps(
+                {
+                    "metadata": {
+                        "python": platform.python_version(),
+                        "pillow": PIL.__version__,
+                        "machine": platform.machine(),
+                        "iterations": args.iterations,
+                    },
+                    "results": results,
+                },
+                indent=2,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark for rendering frames in RGBA and palette render mode.
+
+Run from the repository root with `python -m benchmarks.render_mode`.
+"""
+
+import timeit
+
+from inky_phat_dashboard.const import RenderMode
+from inky_phat_dashboard.image_generator import ImageGenerator
+from inky_phat_dashboard.models import (
+    Config,
+    DashboardElementData,
+    DashboardViewData,
+    DetailedViewTwoLinesData,
+    HomeAssistantConfig,
+)
+
+REPEAT = 5
+NUMBER = 50
+
+DASHBOARD_VIEW_DATA = DashboardViewData(
+    elements=[
+        DashboardElementData("media/waste/waste_small.png", "2"),
+        DashboardElementData("media/waste/recycling_small.png", "14"),
+        DashboardElementData("media/waste/paper_small.png", "Morgen", True, True),
+        DashboardElementData("media/waste/organic_small.png", "Heute", True, True),
+    ],
+    is_border_alert=True,
+)
+DETAILED_VIEW_TWO_LINES_DATA = DetailedViewTwoLinesData(
+    "media/waste/waste_large.png", "Restabfall", "Morgen", is_icon_alert=True
+)
+
+
+def best_of(func) -> float:
+    """Return the best time per call in milliseconds."""
+
+    return min(timeit.repeat(func, repeat=REPEAT, number=NUMBER)) / NUMBER * 1000
+
+
+def main():
+    """Run the benchmark."""
+
+    print(f"{'render mode':<14}{'dashboard ms':>14}{'two lines ms':>14}")
+
+    for render_mode in RenderMode:
+        image_generator = ImageGenerator(
+            Config(
+                color_palette="red",
+                home_assistant_config=HomeAssistantConfig(url="", token=""),
+                render_mode=render_mode,
+            )
+        )
+
+        dashboard = best_of(
+            lambda: image_generator.generate_dashboard_view(DASHBOARD_VIEW_DATA)
+        )
+        two_lines = best_of(
+            lambda: image_generator.generate_detailed_view_two_lines(
+                DETAILED_VIEW_TWO_LINES_DATA
+            )
+        )
+        print(f"{render_mode:<14}{dashboard:>14.3f}{two_lines:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
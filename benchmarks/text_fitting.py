@@ -0,0 +1,101 @@
+"""Benchmark for fitting the texts of a dashboard frame into their rectangles.
+
+Run from the repository root with `python -m benchmarks.text_fitting`.
+"""
+
+import time
+
+from PIL import Image, ImageDraw, ImageFont
+
+from inky_phat_dashboard.const import (
+    DEFAULT_FONT_PATH,
+    INKY_HEIGHT,
+    INKY_WIDTH,
+    RECTANGLE_TEXT_DASHBOARD_LOWER_LEFT,
+    RECTANGLE_TEXT_DASHBOARD_LOWER_RIGHT,
+    RECTANGLE_TEXT_DASHBOARD_UPPER_LEFT,
+    RECTANGLE_TEXT_DASHBOARD_UPPER_RIGHT,
+    VerticalAlign,
+)
+from inky_phat_dashboard.image_tools import ImageTools
+
+FRAME_TEXTS = [
+    (RECTANGLE_TEXT_DASHBOARD_UPPER_LEFT, "Heute"),
+    (RECTANGLE_TEXT_DASHBOARD_UPPER_RIGHT, "Morgen"),
+    (RECTANGLE_TEXT_DASHBOARD_LOWER_LEFT, "14"),
+    (RECTANGLE_TEXT_DASHBOARD_LOWER_RIGHT, "Nicht verfügbar"),
+]
+FRAMES = 20
+
+truetype_calls = 0
+truetype = ImageFont.truetype
+
+
+def counting_truetype(*args, **kwargs) -> ImageFont.FreeTypeFont:
+    """Load a font and count the call."""
+
+    global truetype_calls
+    truetype_calls += 1
+    return truetype(*args, **kwargs)
+
+
+def fit_countdown(
+    draw: ImageDraw.ImageDraw, rectangle: tuple[int, int, int, int], text: str
+) -> int:
+    """Fit a text like the former implementation, counting the size down from 100."""
+
+    _, _, width, height = rectangle
+    font_size = 100
+    while font_size > 0:
+        font = ImageFont.truetype(DEFAULT_FONT_PATH, font_size)
+        text_bbox = draw.textbbox((0, 0), text, font=font)
+        if (
+            text_bbox[2] - text_bbox[0] <= width
+            and text_bbox[3] - text_bbox[1] <= height
+        ):
+            break
+        font_size -= 1
+    return font_size
+
+
+def fit_bisect(
+    draw: ImageDraw.ImageDraw, rectangle: tuple[int, int, int, int], text: str
+) -> int:
+    """Fit a text with the bisecting layout engine."""
+
+    return ImageTools.layout_text(
+        DEFAULT_FONT_PATH, rectangle, text, VerticalAlign.CENTER
+    ).font_size
+
+
+def run(name: str, fit) -> None:
+    """Fit the frame texts repeatedly and print calls and timings per frame."""
+
+    global truetype_calls
+    draw = ImageDraw.Draw(Image.new("RGBA", (INKY_WIDTH, INKY_HEIGHT)))
+
+    for label, frames in (("first frame", 1), (f"next {FRAMES} frames", FRAMES)):
+        truetype_calls = 0
+        start = time.perf_counter()
+        for _ in range(frames):
+            for rectangle, text in FRAME_TEXTS:
+                fit(draw, rectangle, text)
+        elapsed_ms = (time.perf_counter() - start) * 1000 / frames
+        print(
+            f"{name:<10}{label:<18}{truetype_calls / frames:>16.1f}{elapsed_ms:>12.3f}"
+        )
+
+
+def main():
+    """Run the benchmark."""
+
+    ImageFont.truetype = counting_truetype
+    ImageTools.get_font.cache_clear()
+
+    print(f"{'engine':<10}{'':<18}{'truetype/frame':>16}{'ms/frame':>12}")
+    run("countdown", fit_countdown)
+    run("bisect", fit_bisect)
+
+
+if __name__ == "__main__":
+    main()
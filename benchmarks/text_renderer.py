@@ -0,0 +1,90 @@
+"""Benchmark for drawing texts with FreeType and with the glyph atlas.
+
+Run from the repository root with `python -m benchmarks.text_renderer`.
+"""
+
+import timeit
+
+from inky_phat_dashboard.const import (
+    DEFAULT_FONT_PATH,
+    RECTANGLE_TEXT_DASHBOARD_LOWER_LEFT,
+    RECTANGLE_TEXT_DASHBOARD_LOWER_RIGHT,
+    RECTANGLE_TEXT_DASHBOARD_UPPER_LEFT,
+    RECTANGLE_TEXT_DASHBOARD_UPPER_RIGHT,
+    RECTANGLE_TEXT_DETAILED_LOWER,
+    RECTANGLE_TEXT_DETAILED_UPPER,
+    ColorMode,
+    ColorPalette,
+    TextRenderer,
+    VerticalAlign,
+)
+from inky_phat_dashboard.image_tools import ImageTools
+from inky_phat_dashboard.text_layout_cache import TextLayoutCache
+
+REPEAT = 5
+NUMBER = 200
+
+FRAME_TEXTS = {
+    "dashboard": [
+        (RECTANGLE_TEXT_DASHBOARD_UPPER_LEFT, "Heute"),
+        (RECTANGLE_TEXT_DASHBOARD_UPPER_RIGHT, "Morgen"),
+        (RECTANGLE_TEXT_DASHBOARD_LOWER_LEFT, "14"),
+        (RECTANGLE_TEXT_DASHBOARD_LOWER_RIGHT, "Nicht verfügbar"),
+    ],
+    "two lines": [
+        (RECTANGLE_TEXT_DETAILED_UPPER, "Restabfall"),
+        (RECTANGLE_TEXT_DETAILED_LOWER, "Morgen"),
+    ],
+}
+
+
+def best_of(func) -> float:
+    """Return the best time per call in milliseconds."""
+
+    return min(timeit.repeat(func, repeat=REPEAT, number=NUMBER)) / NUMBER * 1000
+
+
+def main():
+    """Run the benchmark."""
+
+    palette = ImageTools.palette_from_color_palette(ColorPalette.RED)
+    backgrounds = {
+        "rgba": (ImageTools.create_background(ColorMode.LIGHT), (0, 0, 0, 255)),
+        "palette": (
+            ImageTools.create_palette_background(ColorMode.LIGHT, palette),
+            2,
+        ),
+    }
+
+    print(f"{'renderer':<14}{'image':<10}{'frame':<12}{'ms/frame':>10}")
+
+    for text_renderer in TextRenderer:
+        # Layouts are cached so that only drawing the texts is measured
+        text_layout_cache = TextLayoutCache()
+
+        for image_name, (background, color) in backgrounds.items():
+            for frame_name, frame_texts in FRAME_TEXTS.items():
+
+                def draw_frame():
+                    image = background.copy()
+                    for rectangle, text in frame_texts:
+                        ImageTools.place_text_in_rectangle(
+                            image,
+                            DEFAULT_FONT_PATH,
+                            rectangle,
+                            text,
+                            color,
+                            VerticalAlign.CENTER,
+                            text_layout_cache,
+                            text_renderer,
+                        )
+
+                elapsed_ms = best_of(draw_frame)
+                print(
+                    f"{text_renderer:<14}{image_name:<10}{frame_name:<12}"
+                    f"{elapsed_ms:>10.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,37 @@
 """The main module for the inky_phat_dashboard package."""
 
+import argparse
 import asyncio
 import logging
 import os
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from dotenv import load_dotenv
+from inky_phat_dashboard.startup_profile import StartupProfile
 
-from inky_phat_dashboard.const import (
-    DEFAULT_CONFIG_FILE_PATH,
-    DEFAULT_LOG_PATH,
-    ENV_CONFIG_FILE_PATH,
-    ENV_LOG_FILE_PATH,
-)
-from inky_phat_dashboard.dashboard import Dashboard
-from inky_phat_dashboard.models import Config
+if TYPE_CHECKING:
+    from inky_phat_dashboard.dashboard import Dashboard
+    from inky_phat_dashboard.models import Config
 
 
 async def main():
+    startup_profile = StartupProfile()
+    args = parse_args()
+
+    # Everything beyond the standard library is imported here, so the import
+    # phase covers it, the imaging stack of the dashboard being the bulk
+    from dotenv import load_dotenv
+
+    from inky_phat_dashboard.const import (
+        DEFAULT_CONFIG_FILE_PATH,
+        ENV_CONFIG_FILE_PATH,
+    )
+    from inky_phat_dashboard.dashboard import Dashboard
+    from inky_phat_dashboard.models import Config
+
+    startup_profile.mark("import")
+
     load_dotenv()
 
     config_file_path = Path(
@@ -32,28 +45,56 @@ async def main():
         asyncio.get_event_loop().stop()
         return
 
-    init_logger(config)
+    startup_profile.mark("config")
+
+    log_file_path = init_logger(config)
+
+    startup_profile.mark("logger init")
 
     logging.info("Starting inky-phat-dashboard service...")
     logging.info(f"Working directory: {os.getcwd()}")
     logging.info(f"Config file path: {config_file_path}")
-    logging.info(f"Log file path: {config.logging_config.path}")
+    logging.info(f"Log file path: {log_file_path}")
 
     dashboard = Dashboard(config)
+
+    startup_profile.mark("dashboard init")
+
+    if args.startup_profile:
+        asyncio.create_task(print_startup_profile(dashboard, startup_profile))
+
     await dashboard.start()
 
 
-def init_logger(config: Config):
-    """Initialize the logger."""
+def parse_args() -> argparse.Namespace:
+    """Parse the command line arguments."""
 
-    log_file_path = Path(
-        config.logging_config.path or os.getenv(ENV_LOG_FILE_PATH) or DEFAULT_LOG_PATH
+    parser = argparse.ArgumentParser(prog="inky_phat_dashboard")
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="print the duration of each startup phase once the first frame is shown",
     )
 
-    config.logging_config.path = log_file_path
+    return parser.parse_args()
+
+
+async def print_startup_profile(
+    dashboard: "Dashboard", startup_profile: StartupProfile
+):
+    """Print the startup profile once the first frame is shown."""
+
+    await dashboard.first_frame_shown.wait()
+
+    startup_profile.mark("first render")
 
-    if not log_file_path.is_absolute():
-        log_file_path = config.config_file_path.parent / log_file_path
+    print(startup_profile.report(), flush=True)
+
+
+def init_logger(config: "Config") -> Path:
+    """Initialize the logger and return the path of the log file."""
+
+    log_file_path = config.log_file_path
 
     logging.basicConfig(
         level=config.logging_config.level.upper(),
@@ -65,6 +106,8 @@ def init_logger(config: Config):
         ],
     )
 
+    return log_file_path
+
 
 if __name__ == "__main__":
     asyncio.run(main())
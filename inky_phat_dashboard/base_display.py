@@ -0,0 +1,13 @@
+"""Base display for Inky pHAT Dashboard."""
+
+from abc import ABC, abstractmethod
+
+from PIL import Image
+
+
+class BaseDisplay(ABC):
+    """Base display for Inky pHAT Dashboard."""
+
+    @abstractmethod
+    def show(self, image: Image.Image) -> None:
+        """Show an image on the display."""
@@ -1,13 +1,46 @@
 """Base module for Inky pHAT Dashboard."""
 
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 
+from inky_phat_dashboard.const import (
+    DEFAULT_MODULE_UPDATE_INTERVAL_SECONDS,
+    DEFAULT_MODULE_UPDATE_TIMEOUT_SECONDS,
+)
 from inky_phat_dashboard.models import ViewData
 
 
 class BaseModule(ABC):
     """Base module for Inky pHAT Dashboard."""
 
+    def __init__(self):
+        """Initialize the base module."""
+
+        self._data_listeners: list[Callable[[], None]] = []
+
+    def add_data_listener(self, listener: Callable[[], None]):
+        """Add a listener that is called when the data of the module changed."""
+
+        self._data_listeners.append(listener)
+
+    def _notify_data_changed(self):
+        """Notify the listeners that the data of the module changed."""
+
+        for listener in self._data_listeners:
+            listener()
+
+    @property
+    def update_interval_seconds(self) -> float:
+        """Get the interval between updates of the module."""
+
+        return DEFAULT_MODULE_UPDATE_INTERVAL_SECONDS
+
+    @property
+    def update_timeout_seconds(self) -> float:
+        """Get the time after which an update of the module is cancelled."""
+
+        return DEFAULT_MODULE_UPDATE_TIMEOUT_SECONDS
+
     @abstractmethod
     async def update(self) -> None:
         """Update the module."""
@@ -15,3 +48,14 @@ class BaseModule(ABC):
     @abstractmethod
     async def get_view_datas(self) -> list[ViewData]:
         """Get the view datas for the module."""
+
+    def on_config_changed(self, changed_fields: set[str]) -> None:
+        """Adapt the module to the fields that changed in the live config."""
+
+    def dump_state(self) -> dict | None:
+        """Get the last known state of the module for the snapshot, if it has one."""
+
+        return None
+
+    def restore_state(self, state: dict) -> None:
+        """Restore the last known state of the module from the snapshot."""
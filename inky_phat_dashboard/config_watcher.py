@@ -0,0 +1,65 @@
+"""Config watcher for the Inky pHat Dashboard."""
+
+import asyncio
+import logging
+import os
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from inky_phat_dashboard.models import Config
+
+
+class ConfigWatcher:
+    """Polls the config file and loads it again when it was modified."""
+
+    def __init__(
+        self,
+        config_file_path: Path,
+        on_change: Callable[[Config], Awaitable[None]],
+        interval_seconds: float,
+    ):
+        """Initialize the config watcher."""
+
+        self._config_file_path = config_file_path
+        self._on_change = on_change
+        self._interval_seconds = interval_seconds
+        self._signature = self._get_signature()
+
+    async def run(self):
+        """Watch the config file and hand over every valid change."""
+
+        while True:
+            await asyncio.sleep(self._interval_seconds)
+            await self.check()
+
+    async def check(self):
+        """Load the config file if it was modified since the last check."""
+
+        signature = self._get_signature()
+
+        if signature == self._signature:
+            return
+
+        self._signature = signature
+
+        try:
+            config = Config.load(self._config_file_path)
+        except Exception as ex:
+            logging.error(
+                f"Config {self._config_file_path} is invalid, keeping the current one: "
+                f"{ex}"
+            )
+            return
+
+        logging.info(f"Config {self._config_file_path} changed, applying it")
+        await self._on_change(config)
+
+    def _get_signature(self) -> tuple[int, int] | None:
+        """Get the modification time and size of the config file."""
+
+        try:
+            stat = os.stat(self._config_file_path)
+        except OSError:
+            return None
+
+        return stat.st_mtime_ns, stat.st_size
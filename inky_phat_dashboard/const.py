@@ -4,11 +4,11 @@ from enum import Enum, StrEnum
 
 
 class ColorInPalette(Enum):
-    """Color in palette enumeration."""
+    """Color in palette enumeration, in the index order of the Inky driver."""
 
     WHITE = 0
-    ALERT = 1
-    BLACK = 2
+    BLACK = 1
+    ALERT = 2
 
 
 class Color(Enum):
@@ -34,6 +34,36 @@ class ColorPalette(StrEnum):
     YELLOW = ("yellow",)
 
 
+class RenderMode(StrEnum):
+    """Render mode enumeration."""
+
+    RGBA = "rgba"
+    PALETTE = "palette"
+
+
+class TextRenderer(StrEnum):
+    """Text renderer enumeration."""
+
+    FREETYPE = "freetype"
+    GLYPH_ATLAS = "glyph_atlas"
+
+
+class DisplayType(StrEnum):
+    """Display type enumeration."""
+
+    INKY = "inky"
+    VIEWER = "viewer"
+    FILE = "file"
+    MEMORY = "memory"
+
+
+class FrameFileFormat(StrEnum):
+    """Frame file format enumeration."""
+
+    PNG = "png"
+    RAW = "raw"
+
+
 class VerticalAlign(Enum):
     TOP = "top"
     CENTER = "center"
@@ -50,19 +80,118 @@ DEFAULT_LOG_FMT = "%(asctime)s %(levelname)s %(message)s"
 DEFAULT_LOG_DATEFMT = "%Y-%m-%d %H:%M:%S"
 DEFAULT_LOG_FILEMODE = "a"
 DEFAULT_DATA_TIMEOUT_SECONDS = 10
+DEFAULT_REQUEST_TIMEOUT_SECONDS = 10
+DEFAULT_MAX_PARALLEL_REQUESTS = 4
+DEFAULT_USE_WEBSOCKET = False
+DEFAULT_BULK_FETCH = False
+DEFAULT_UPDATE_TIMEOUT_SECONDS = 30
+DEFAULT_MAX_POLL_INTERVAL_SECONDS = 600
+DEFAULT_MODULE_UPDATE_INTERVAL_SECONDS = 60
+DEFAULT_MODULE_UPDATE_TIMEOUT_SECONDS = 30
 DEFAULT_VIEW_CHANGE_SECONDS = 5
 DEFAULT_FONT_PATH = "fonts/MinecraftRegular.otf"
 DEFAULT_COLOR_MODE = ColorMode.LIGHT
+DEFAULT_RENDER_MODE = RenderMode.RGBA
+DEFAULT_TEXT_RENDERER = TextRenderer.FREETYPE
 DEFAULT_WASTE_ALERT_DAYS = 1
 DEFAULT_WASTE_DETAILED_DAYS = 3
+DEFAULT_DWELL_WEIGHT = 1
 DEFAULT_ENABLE_INKY = True
 DEFAULT_FLIP_SCREEN = True
+DEFAULT_DISPLAY_OUTPUT_PATH = "frames"
+DEFAULT_DISPLAY_FILE_FORMAT = FrameFileFormat.PNG
+DEFAULT_MEMORY_DISPLAY_MAX_FRAMES = 100
+DEFAULT_RENDER_WORKER_COUNT = 1
+DEFAULT_CONFIG_WATCH_INTERVAL_SECONDS = 5
+DEFAULT_FRAME_CACHE_SIZE = 16
+DEFAULT_ENABLE_STATE_SNAPSHOT = True
+DEFAULT_STATE_SNAPSHOT_INTERVAL_SECONDS = 60
+DEFAULT_METRICS_ENABLED = False
+DEFAULT_METRICS_HOST = "127.0.0.1"
+DEFAULT_METRICS_LOG_INTERVAL_SECONDS = 300
+DEFAULT_PROFILING_ENABLED = False
+DEFAULT_PROFILING_CYCLES = 10
+DEFAULT_PROFILING_TOP_ALLOCATIONS = 25
 
 RESTART_DELAY_SECONDS = 5
+MODULE_BACKOFF_MAX_SECONDS = 300
+DISPLAY_REFRESH_JOB = "display_refresh"
+STATE_SNAPSHOT_JOB = "state_snapshot"
+METRICS_SUMMARY_JOB = "metrics_summary"
+
+# Config fields grouped by what has to be invalidated when they change
+CONFIG_RENDER_FIELDS = frozenset(
+    {
+        "color_mode",
+        "color_palette",
+        "flip_screen",
+        "font_path",
+        "render_mode",
+        "text_renderer",
+    }
+)
+CONFIG_SCHEDULE_FIELDS = frozenset(
+    {
+        "data_timeout_seconds",
+        "state_snapshot_interval_seconds",
+        "view_change_interval_seconds",
+    }
+)
+CONFIG_RESTART_FIELDS = frozenset(
+    {
+        "config_watch_interval_seconds",
+        "display",
+        "display_file_format",
+        "display_output_path",
+        "enable_inky",
+        "enable_state_snapshot",
+        "metrics_config",
+        "render_worker_count",
+    }
+)
+LOOP_LAG_INTERVAL_SECONDS = 0.1
+METRICS_PREFIX = "inky_phat_dashboard"
+METRICS_BUCKETS_SECONDS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+LOOP_LAG_REPORT_INTERVAL_SECONDS = 60
+WEBSOCKET_RECONNECT_DELAY_SECONDS = 5
+WASTE_CHANGE_WINDOW_SECONDS = 15 * 60
+POLL_BACKOFF_MAX_DOUBLINGS = 16
+WEBSOCKET_SUBSCRIBE_MESSAGE_ID = 1
+WEBSOCKET_GET_STATES_MESSAGE_ID = 2
 
 INKY_WIDTH = 250
 INKY_HEIGHT = 122
 
+MIN_FONT_SIZE = 1
+MAX_FONT_SIZE = 100
+FONT_CACHE_SIZE = 256
+GLYPH_ATLAS_CACHE_SIZE = 32
+DEFAULT_SPRITE_CACHE_SIZE = 32
+TEXT_LAYOUT_CACHE_FILE_NAME = "text_layout_cache.json"
+TEXT_LAYOUT_CACHE_VERSION = 1
+STATE_SNAPSHOT_FILE_NAME = "state_snapshot.json"
+STATE_SNAPSHOT_VERSION = 2
+LAST_FRAME_FILE_NAME = "last_frame.png"
+
+NON_TRANSPARENT_MASK_LUT = [0] + [255] * 255
+PALETTE_MASK_LUT = [0] * 128 + [255] * 128
+
 IMAGE_BACKGROUND_PATH = "media/general/background.png"
 IMAGE_BORDER_PATH = "media/general/border.png"
 
@@ -83,12 +212,12 @@ RECTANGLE_TEXT_DASHBOARD_LOWER_RIGHT = (167, 65, 68, 42)
 COLOR_PALETTE_TO_COLORS = {
     ColorPalette.RED: [
         Color.WHITE.value,
-        Color.RED.value,
         Color.BLACK.value,
+        Color.RED.value,
     ],
     ColorPalette.YELLOW: [
         Color.WHITE.value,
-        Color.YELLOW.value,
         Color.BLACK.value,
+        Color.YELLOW.value,
     ],
 }
@@ -1,14 +1,37 @@
 """Inky pHat Dashboard Module."""
 
 import asyncio
+import functools
 import logging
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Callable
 
-from inky import auto
 from PIL import Image
 
-from inky_phat_dashboard.const import RESTART_DELAY_SECONDS
+from inky_phat_dashboard.base_display import BaseDisplay
+from inky_phat_dashboard.base_module import BaseModule
+from inky_phat_dashboard.config_watcher import ConfigWatcher
+from inky_phat_dashboard.const import (
+    CONFIG_RENDER_FIELDS,
+    CONFIG_SCHEDULE_FIELDS,
+    DISPLAY_REFRESH_JOB,
+    METRICS_SUMMARY_JOB,
+    MODULE_BACKOFF_MAX_SECONDS,
+    RESTART_DELAY_SECONDS,
+    STATE_SNAPSHOT_JOB,
+    DisplayType,
+)
+from inky_phat_dashboard.file_display import FileDisplay
+from inky_phat_dashboard.frame_cache import FrameCache
 from inky_phat_dashboard.image_generator import ImageGenerator
+from inky_phat_dashboard.image_tools import ImageTools
+from inky_phat_dashboard.inky_display import InkyDisplay
+from inky_phat_dashboard.loop_lag_monitor import LoopLagMonitor
+from inky_phat_dashboard.memory_display import MemoryDisplay
+from inky_phat_dashboard.metrics import metrics
+from inky_phat_dashboard.metrics_server import MetricsServer
 from inky_phat_dashboard.models import (
     Config,
     DashboardViewData,
@@ -16,6 +39,10 @@ from inky_phat_dashboard.models import (
     DetailedViewTwoLinesData,
     ViewData,
 )
+from inky_phat_dashboard.profiler import Profiler
+from inky_phat_dashboard.scheduler import Scheduler
+from inky_phat_dashboard.state_snapshot import StateSnapshot
+from inky_phat_dashboard.viewer_display import ViewerDisplay
 from inky_phat_dashboard.waste_module import WasteModule
 
 
@@ -27,88 +54,572 @@ class Dashboard:
 
         self._config = config
         self._image_generator = ImageGenerator(config)
+        self._frame_cache = FrameCache(config.frame_cache_size)
         self._modules = [
             WasteModule(config),
         ]
-        self._data_collection_task: asyncio.Task | None = None
-        self._display_refresh_task: asyncio.Task | None = None
-        self._last_view_data: ViewData | None = None
-        self._inky_display = auto() if config.enable_inky else None
+        self._scheduler_task: asyncio.Task | None = None
+        self._loop_lag_monitor_task: asyncio.Task | None = None
+        self._view_ids: list[str] = []
+        self._view_positions: dict[str, int] = {}
+        self._current_view_id: str | None = None
+        self._current_view_dwell = 0
+        self._last_view_index: int | None = None
+        self._prepared_frames: dict[str, Image.Image] = {}
+        self._module_failures: dict[BaseModule, int] = {}
+        self._displayed_image: Image.Image | None = None
+        self._displayed_fingerprint: str | None = None
+        self._display_pushes = 0
+        self._skipped_display_pushes = 0
+        self._display: BaseDisplay | None = None
+        self._render_executor = ThreadPoolExecutor(
+            max_workers=config.render_worker_count, thread_name_prefix="render"
+        )
+        self._display_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="display"
+        )
+        # The monitor wakes the loop often, so it only runs when its output is used
+        self._loop_lag_monitor = (
+            LoopLagMonitor()
+            if config.metrics_config.enabled
+            or config.logging_config.level.upper() == "DEBUG"
+            else None
+        )
+        self.first_frame_shown = asyncio.Event()
+        self._scheduler = Scheduler()
+        self._scheduler.add_job(
+            DISPLAY_REFRESH_JOB,
+            self._refresh_display,
+            lambda: self._config.view_change_interval_seconds,
+            on_trigger=self._refresh_current_view,
+        )
+        self._config_watcher = (
+            ConfigWatcher(
+                config.config_file_path,
+                self._apply_config,
+                config.config_watch_interval_seconds,
+            )
+            if config.config_file_path is not None
+            else None
+        )
+        metrics.enabled = config.metrics_config.enabled
+        self._metrics_server = (
+            MetricsServer(
+                metrics, config.metrics_config.host, config.metrics_config.port
+            )
+            if config.metrics_config.enabled and config.metrics_config.port is not None
+            else None
+        )
+
+        # The metrics settings only apply on startup, so the interval is fixed
+        log_interval_seconds = config.metrics_config.log_interval_seconds
+
+        if config.metrics_config.enabled and log_interval_seconds:
+            self._scheduler.add_job(
+                METRICS_SUMMARY_JOB,
+                self._log_metrics_summary,
+                lambda: log_interval_seconds,
+                run_immediately=False,
+            )
+
+        self._profiler = Profiler(config.log_file_path.parent)
+
+        if config.profiling_config.enabled:
+            self._start_profiling()
+
+        self._state_snapshot = (
+            StateSnapshot(config.config_file_path.parent)
+            if config.enable_state_snapshot and config.config_file_path is not None
+            else None
+        )
+
+        if self._state_snapshot is not None:
+            # The interval limits how often the SD card is written to
+            self._scheduler.add_job(
+                STATE_SNAPSHOT_JOB,
+                self._save_state_snapshot,
+                lambda: self._config.state_snapshot_interval_seconds,
+                run_immediately=False,
+            )
+
+    def _get_display(self) -> BaseDisplay:
+        """Get the display, creating it on first use."""
+
+        if self._display is None:
+            self._display = self._create_display(self._config)
+
+        return self._display
+
+    @staticmethod
+    def _create_display(config: Config) -> BaseDisplay:
+        """Create the display configured for the dashboard."""
+
+        match config.display_type:
+            case DisplayType.INKY:
+                return InkyDisplay()
+            case DisplayType.VIEWER:
+                return ViewerDisplay()
+            case DisplayType.FILE:
+                return FileDisplay(
+                    Path(config.display_output_path), config.display_file_format
+                )
+            case DisplayType.MEMORY:
+                return MemoryDisplay()
+
+        raise ValueError(f"Invalid display type: {config.display_type}")
 
     async def start(self):
         """Start the Inky pHat Dashboard."""
 
         self._is_running = True
+        self._add_signal_handlers()
 
-        for module in self._modules:
-            logging.debug(f"Updating module {module}...")
-            await module.update()
+        # Creating the display imports and probes the hardware, which overlaps
+        # with the first data collection instead of delaying it
+        display_initialization = asyncio.get_running_loop().run_in_executor(
+            self._display_executor, self._get_display
+        )
+
+        # Restored states are refreshed in the background instead of up front,
+        # so the panel does not wait for Home Assistant after a restart
+        is_restored = await self._restore_state_snapshot()
+
+        if not is_restored:
+            await self._update_modules()
+
+            # A restored frame without module states is stale once the data is in
+            if self.first_frame_shown.is_set():
+                self._scheduler.trigger(DISPLAY_REFRESH_JOB)
+
+        await display_initialization
+
+        for index, module in enumerate(self._modules):
+            # New data is shown right away instead of waiting for the next view
+            module.add_data_listener(
+                lambda: self._scheduler.trigger(DISPLAY_REFRESH_JOB)
+            )
+            self._scheduler.add_job(
+                f"update_{self._get_module_key(index, module)}",
+                functools.partial(self._update_module, module),
+                functools.partial(self._get_module_interval_seconds, module),
+                run_immediately=is_restored,
+            )
+
+        self._scheduler_task = asyncio.create_task(self._scheduler.run())
+        tasks = [self._scheduler_task]
+
+        if self._loop_lag_monitor is not None:
+            self._loop_lag_monitor_task = asyncio.create_task(
+                self._loop_lag_monitor.run()
+            )
+            tasks.append(self._loop_lag_monitor_task)
+
+        if self._config_watcher is not None:
+            tasks.append(
+                asyncio.create_task(self._run_with_restart(self._config_watcher.run))
+            )
+
+        if self._metrics_server is not None:
+            tasks.append(
+                asyncio.create_task(self._run_with_restart(self._metrics_server.run))
+            )
+
+        await asyncio.gather(*tasks)
+
+    @staticmethod
+    def _get_module_key(index: int, module: BaseModule) -> str:
+        """Get the key identifying a module in job names and the snapshot."""
+
+        return f"{index}_{type(module).__name__}"
 
-        self._data_collection_task = asyncio.create_task(
-            self._run_with_restart(self._handle_data_collection)
+    async def _restore_state_snapshot(self) -> bool:
+        """Restore the module states and show the last frame from the snapshot."""
+
+        if self._state_snapshot is None:
+            return False
+
+        await asyncio.to_thread(self._state_snapshot.load)
+        is_restored = False
+
+        for index, module in enumerate(self._modules):
+            state = self._state_snapshot.module_states.get(
+                self._get_module_key(index, module)
+            )
+
+            if state is None:
+                continue
+
+            try:
+                module.restore_state(state)
+            except (KeyError, TypeError, ValueError) as ex:
+                logging.warning(
+                    f"State of module {module} could not be restored: {ex!r}"
+                )
+                continue
+
+            is_restored = True
+
+        frame = await asyncio.to_thread(self._state_snapshot.load_frame)
+
+        if frame is not None:
+            logging.info("Showing the last frame from the state snapshot")
+
+            # The last frame stays until the next view change or new data
+            self._scheduler.jobs[DISPLAY_REFRESH_JOB].run_immediately = False
+            self._current_view_id = self._state_snapshot.view_id
+
+            await asyncio.get_running_loop().run_in_executor(
+                self._display_executor, self._push_image, frame
+            )
+            self.first_frame_shown.set()
+
+        return is_restored
+
+    async def _save_state_snapshot(self):
+        """Save the module states and the shown frame if they changed."""
+
+        module_states = {}
+
+        for index, module in enumerate(self._modules):
+            state = module.dump_state()
+
+            if state is not None:
+                module_states[self._get_module_key(index, module)] = state
+
+        # The shown frame is only written on the display thread, so it is read there
+        await asyncio.get_running_loop().run_in_executor(
+            self._display_executor,
+            self._write_state_snapshot,
+            module_states,
+            self._current_view_id,
         )
-        self._display_refresh_task = asyncio.create_task(
-            self._run_with_restart(self._handle_display_refresh)
+
+    def _write_state_snapshot(
+        self, module_states: dict[str, dict], view_id: str | None
+    ):
+        """Write the module states and the shown frame to the snapshot."""
+
+        if self._state_snapshot is None:
+            return
+
+        self._state_snapshot.save(
+            module_states,
+            view_id,
+            self._displayed_image,
+            self._displayed_fingerprint,
         )
 
-        await asyncio.gather(self._data_collection_task, self._display_refresh_task)
+    async def _update_modules(self):
+        """Update all modules concurrently."""
 
-    async def _handle_data_collection(self):
-        """Start data collection."""
+        await asyncio.gather(*(self._update_module(module) for module in self._modules))
 
-        while self._is_running:
-            for module in self._modules:
-                logging.debug(f"Updating module {module}...")
-                await module.update()
-            await asyncio.sleep(self._config.data_timeout_seconds)
+    async def _update_module(self, module: BaseModule):
+        """Update a module, containing its failures and counting them for backoff."""
 
-    async def _handle_display_refresh(self):
-        """Start the display."""
+        logging.debug(f"Updating module {module}...")
 
-        while self._is_running:
-            logging.debug("Refreshing display...")
-            await self._refresh_display()
-            await asyncio.sleep(self._config.view_change_interval_seconds)
+        try:
+            async with asyncio.timeout(module.update_timeout_seconds):
+                with (
+                    self._profiler.profile_cycle(f"update_{type(module).__name__}"),
+                    metrics.time("module_update"),
+                ):
+                    await module.update()
+        except Exception as ex:
+            metrics.increment("module_update_failures")
+            failures = self._module_failures.get(module, 0) + 1
+            self._module_failures[module] = failures
+            logging.error(
+                f"Updating module {module} failed {failures} times in a row, "
+                f"retrying in {self._get_module_interval_seconds(module)}s: {ex!r}"
+            )
+            return
+
+        if self._module_failures.pop(module, 0):
+            logging.info(f"Updating module {module} succeeded again")
+
+    def _get_module_interval_seconds(self, module: BaseModule) -> float:
+        """Get the time until the next update of a module, backing off on failures."""
+
+        failures = self._module_failures.get(module, 0)
+
+        if not failures:
+            return module.update_interval_seconds
+
+        return min(
+            RESTART_DELAY_SECONDS * 2 ** (failures - 1), MODULE_BACKOFF_MAX_SECONDS
+        )
+
+    def _add_signal_handlers(self):
+        """Start profiling on SIGUSR1 where the platform supports it."""
+
+        if not hasattr(signal, "SIGUSR1"):
+            return
+
+        try:
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGUSR1, self._start_profiling
+            )
+        except (NotImplementedError, RuntimeError) as ex:
+            logging.debug(f"Profiling signal handler could not be added: {ex!r}")
+
+    def _start_profiling(self):
+        """Profile the next configured number of cycles."""
+
+        self._profiler.start(
+            self._config.profiling_config.cycles,
+            self._config.profiling_config.top_allocations,
+        )
+
+    async def _log_metrics_summary(self):
+        """Log a summary of the metrics."""
+
+        logging.info(metrics.summary())
+
+    async def _apply_config(self, config: Config):
+        """Apply a reloaded config, invalidating only what its changes affect."""
+
+        changed_fields, pending_fields = self._config.apply(config)
+
+        if pending_fields:
+            logging.warning(
+                f"Config changes take effect after a restart: "
+                f"{', '.join(sorted(pending_fields))}"
+            )
+
+        if not changed_fields:
+            return
+
+        logging.info(f"Config changed: {', '.join(sorted(changed_fields))}")
+
+        if changed_fields & CONFIG_RENDER_FIELDS:
+            self._image_generator.invalidate()
+            self._frame_cache.clear()
+            self._prepared_frames = {}
+
+        if "frame_cache_size" in changed_fields:
+            self._frame_cache.resize(self._config.frame_cache_size)
+
+        if "logging_config" in changed_fields:
+            # Only the level is applied live, the handlers keep their settings
+            logging.getLogger().setLevel(self._config.logging_config.level.upper())
+
+        if changed_fields & CONFIG_SCHEDULE_FIELDS:
+            self._scheduler.reschedule()
+
+        if (
+            "profiling_config" in changed_fields
+            and self._config.profiling_config.enabled
+        ):
+            self._start_profiling()
+
+        for module in self._modules:
+            module.on_config_changed(changed_fields)
+
+        if "home_assistant_config" in changed_fields:
+            await self._update_modules()
 
     async def _refresh_display(self):
-        """Update the display."""
+        """Show the next view."""
+
+        logging.debug("Refreshing display...")
+
+        with self._profiler.profile_cycle("refresh_display"):
+            await self._show_view(rotate=True)
+
+    async def _refresh_current_view(self):
+        """Show the current view again with the latest data."""
+
+        logging.debug("Refreshing current view with new data...")
+        await self._show_view(rotate=False)
 
+    async def _show_view(self, rotate: bool):
+        """Show the prepared frame of the next or the current view."""
+
+        view_ids: list[str] = []
         view_datas: list[ViewData] = []
 
-        for module in self._modules:
-            module_view_datas = await module.get_view_datas()
-            view_datas.extend(module_view_datas)
+        for index, module in enumerate(self._modules):
+            module_key = self._get_module_key(index, module)
+            with metrics.time("get_view_datas"):
+                module_view_datas = await module.get_view_datas()
+
+            for position, view_data in enumerate(module_view_datas):
+                view_ids.append(f"{module_key}/{view_data.view_id or position}")
+                view_datas.append(view_data)
 
         if not view_datas:
             logging.warning("No view data available")
             return
 
-        selected_view_data = (
-            view_datas[(view_datas.index(self._last_view_data) + 1) % len(view_datas)]
-            if self._last_view_data
-            else view_datas[0]
+        frames = await self._prepare_frames(view_datas)
+
+        if view_ids != self._view_ids:
+            self._view_ids = view_ids
+            self._view_positions = {
+                view_id: position for position, view_id in enumerate(view_ids)
+            }
+
+        view_index = self._select_view(view_datas, rotate)
+
+        # The blocking display push runs off the event loop
+        await asyncio.get_running_loop().run_in_executor(
+            self._display_executor, self._push_image, frames[view_index]
         )
 
-        image: Image.Image
-        match selected_view_data:
-            case DashboardViewData():
-                image = self._image_generator.generate_dashboard_view(
-                    selected_view_data
-                )
-            case DetailedViewData():
-                image = self._image_generator.generate_detailed_view(selected_view_data)
-            case DetailedViewTwoLinesData():
-                image = self._image_generator.generate_detailed_view_two_lines(
-                    selected_view_data
-                )
+        self._current_view_id = view_ids[view_index]
+        self._last_view_index = view_index
+        self.first_frame_shown.set()
+
+    def _select_view(self, view_datas: list[ViewData], rotate: bool) -> int:
+        """
+        Get the position of the view to show from the rotation cursor.
+
+        The cursor follows the id of the current view, so it stays on the view
+        when its content changes. A view is shown for as many view changes as
+        its dwell weight.
+        """
+
+        position = (
+            self._view_positions.get(self._current_view_id)
+            if self._current_view_id is not None
+            else None
+        )
+
+        if position is None:
+            # The view that moved into the place of a removed view comes next
+            self._current_view_dwell = 0
+            return (
+                self._last_view_index % len(view_datas)
+                if self._last_view_index is not None
+                else 0
+            )
+
+        if not rotate:
+            return position
+
+        self._current_view_dwell += 1
+
+        if self._current_view_dwell < view_datas[position].dwell_weight:
+            return position
 
-        if self._config.enable_inky:
-            self._inky_display.set_image(image)
-            self._inky_display.show()
+        self._current_view_dwell = 0
+        return (position + 1) % len(view_datas)
+
+    async def _prepare_frames(self, view_datas: list[ViewData]) -> list[Image.Image]:
+        """
+        Get the frames of all views, rendering only new or changed views.
+
+        New data triggers a refresh, which renders the frames of all views at
+        once, so the following view changes only look up their frame. Frames of
+        views that disappeared are dropped.
+        """
+
+        # A reload can replace the prepared frames while the views render
+        prepared_frames = self._prepared_frames
+        keys = [FrameCache.key(view_data, self._config) for view_data in view_datas]
+        missing_views = {
+            key: view_data
+            for key, view_data in zip(keys, view_datas)
+            if key not in prepared_frames
+        }
+
+        if missing_views:
+            logging.debug(f"Rendering {len(missing_views)} of {len(keys)} views...")
+
+            # Views render in parallel on the render workers, off the event loop
+            loop = asyncio.get_running_loop()
+            rendered_frames = dict(
+                zip(
+                    missing_views,
+                    await asyncio.gather(
+                        *(
+                            loop.run_in_executor(
+                                self._render_executor, self._render_view, view_data, key
+                            )
+                            for key, view_data in missing_views.items()
+                        )
+                    ),
+                )
+            )
         else:
-            image.show()
+            rendered_frames = {}
+
+        self._prepared_frames = {
+            key: prepared_frames.get(key) or rendered_frames[key] for key in keys
+        }
+
+        return [self._prepared_frames[key] for key in keys]
+
+    def _push_image(self, image: Image.Image):
+        """Show an image on the display unless it is already shown."""
+
+        fingerprint = ImageTools.fingerprint(image)
+
+        if fingerprint == self._displayed_fingerprint:
+            self._skipped_display_pushes += 1
+            metrics.increment("display_pushes_skipped")
+            logging.debug(
+                f"Frame unchanged, skipping display refresh "
+                f"({self._display_pushes} pushes, "
+                f"{self._skipped_display_pushes} skipped)"
+            )
+            return
+
+        if self._displayed_image is not None:
+            frame_diff = ImageTools.diff_images(self._displayed_image, image)
+            logging.info(
+                f"Frame changed in {frame_diff.changed_bbox} "
+                f"({frame_diff.changed_fraction:.1%} of pixels, "
+                f"{self._display_pushes} pushes, "
+                f"{self._skipped_display_pushes} skipped)"
+            )
+
+        with metrics.time("display_show"):
+            self._get_display().show(image)
+
+        metrics.increment("display_pushes")
+
+        self._displayed_image = image
+        self._displayed_fingerprint = fingerprint
+        self._display_pushes += 1
+
+    def _render_view(self, view_data: ViewData, key: str) -> Image.Image:
+        """Render a view, reusing the cached frame for the same content."""
+
+        cached_image = self._frame_cache.get(key)
+
+        logging.debug(
+            f"Frame cache {'hit' if cached_image is not None else 'miss'} "
+            f"({self._frame_cache.hits} hits, {self._frame_cache.misses} misses)"
+        )
+
+        if cached_image is not None:
+            metrics.increment("frame_cache_hits")
+            return cached_image
+
+        metrics.increment("frame_cache_misses")
+
+        image: Image.Image
+        with self._profiler.profile_section("render"):
+            match view_data:
+                case DashboardViewData():
+                    with metrics.time("generate_dashboard_view"):
+                        image = self._image_generator.generate_dashboard_view(view_data)
+                case DetailedViewData():
+                    with metrics.time("generate_detailed_view"):
+                        image = self._image_generator.generate_detailed_view(view_data)
+                case DetailedViewTwoLinesData():
+                    with metrics.time("generate_detailed_view_two_lines"):
+                        image = self._image_generator.generate_detailed_view_two_lines(
+                            view_data
+                        )
+
+        metrics.increment("frames_rendered")
+        self._frame_cache.put(key, image)
 
-        self._last_view_data = selected_view_data
+        return image
 
     async def _run_with_restart(self, func: Callable, *args, **kwargs):
         """Run a task and restart it on exception."""
@@ -118,6 +629,7 @@ class Dashboard:
                 await func(*args, **kwargs)
             except Exception as ex:
                 self._handle_exception(ex)
+                metrics.increment("task_restarts")
                 await asyncio.sleep(RESTART_DELAY_SECONDS)
                 logging.debug(f"Restarting task {func.__name__} after exception...")
 
@@ -0,0 +1,35 @@
+"""File display for the Inky pHat Dashboard."""
+
+from pathlib import Path
+
+from PIL import Image
+
+from inky_phat_dashboard.base_display import BaseDisplay
+from inky_phat_dashboard.const import FrameFileFormat
+
+
+class FileDisplay(BaseDisplay):
+    """Writes images as numbered frame files to a directory."""
+
+    def __init__(self, output_path: Path, file_format: FrameFileFormat):
+        """Initialize the file display."""
+
+        self._output_path = output_path
+        self._file_format = file_format
+        self._frame_count = 0
+
+        self._output_path.mkdir(parents=True, exist_ok=True)
+
+    def show(self, image: Image.Image) -> None:
+        """Show an image on the display."""
+
+        self._frame_count += 1
+        frame_path = (
+            self._output_path / f"frame_{self._frame_count:06d}.{self._file_format}"
+        )
+
+        match self._file_format:
+            case FrameFileFormat.PNG:
+                image.save(frame_path)
+            case FrameFileFormat.RAW:
+                frame_path.write_bytes(image.tobytes())
@@ -0,0 +1,91 @@
+"""Frame cache for the Inky pHat Dashboard."""
+
+import dataclasses
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+from inky_phat_dashboard.models import Config, ViewData
+
+
+class FrameCache:
+    """Bounded LRU cache of rendered frames keyed by their view data, thread safe."""
+
+    def __init__(self, max_size: int):
+        """Initialize the frame cache."""
+
+        self._max_size = max_size
+        self._frames: OrderedDict[str, Image.Image] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """Get the number of cached frames."""
+
+        return len(self._frames)
+
+    @staticmethod
+    def key(view_data: ViewData, config: Config) -> str:
+        """Get a stable content hash of a view data and the render relevant config."""
+
+        # The identity and the dwell weight of a view do not change its frame
+        view_data_dict = dataclasses.asdict(view_data)
+        del view_data_dict["view_id"], view_data_dict["dwell_weight"]
+
+        content = {
+            "type": type(view_data).__name__,
+            "view_data": view_data_dict,
+            "color_mode": config.color_mode,
+            "color_palette": config.color_palette,
+            "flip_screen": config.flip_screen,
+            "font_path": config.font_path,
+            "render_mode": config.render_mode,
+            "text_renderer": config.text_renderer,
+        }
+
+        return hashlib.sha256(
+            json.dumps(content, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    def get(self, key: str) -> Image.Image | None:
+        """Get a cached frame and count the lookup as a hit or a miss."""
+
+        with self._lock:
+            frame = self._frames.get(key)
+
+            if frame is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._frames.move_to_end(key)
+            return frame
+
+    def put(self, key: str, frame: Image.Image):
+        """Add a frame, evicting the least recently used frames beyond the size."""
+
+        with self._lock:
+            self._frames[key] = frame
+            self._frames.move_to_end(key)
+
+            while len(self._frames) > self._max_size:
+                self._frames.popitem(last=False)
+
+    def resize(self, max_size: int):
+        """Change the size, evicting the least recently used frames beyond it."""
+
+        with self._lock:
+            self._max_size = max_size
+
+            while len(self._frames) > self._max_size:
+                self._frames.popitem(last=False)
+
+    def clear(self):
+        """Remove all cached frames."""
+
+        with self._lock:
+            self._frames.clear()
@@ -0,0 +1,83 @@
+"""Glyph atlas for the Inky pHat Dashboard."""
+
+import threading
+
+from PIL import Image, ImageDraw, ImageFont
+
+from inky_phat_dashboard.const import PALETTE_MASK_LUT
+
+
+class GlyphAtlas:
+    """
+    Pre-rasterized glyphs of a font at a single size.
+
+    Each glyph is rasterized once into a thresholded mask, so strings are drawn
+    by pasting the masks at whole pixel advances instead of going through
+    FreeType for every text.
+    """
+
+    def __init__(self, font: ImageFont.FreeTypeFont):
+        """Initialize the glyph atlas for a font at its size."""
+
+        self._font = font
+        self._glyphs: dict[str, tuple[Image.Image | None, tuple[int, int], int]] = {}
+        self._lock = threading.Lock()
+
+    def draw_text(
+        self,
+        image: Image.Image,
+        position: tuple[int, int],
+        text: str,
+        color: tuple[int, int, int, int] | int,
+    ) -> Image.Image:
+        """Draw a text with its top left at the ascender line like ImageDraw.text."""
+
+        x, y = position
+
+        for character in text:
+            mask, (offset_x, offset_y), advance = self._get_glyph(character)
+
+            if mask is not None:
+                left, top = x + offset_x, y + offset_y
+                image.paste(
+                    color, (left, top, left + mask.width, top + mask.height), mask
+                )
+
+            x += advance
+
+        return image
+
+    def _get_glyph(
+        self, character: str
+    ) -> tuple[Image.Image | None, tuple[int, int], int]:
+        """Get the mask, offset and advance of a glyph, rasterizing it once."""
+
+        with self._lock:
+            glyph = self._glyphs.get(character)
+
+            if glyph is None:
+                glyph = self._rasterize(character)
+                self._glyphs[character] = glyph
+
+        return glyph
+
+    def _rasterize(
+        self, character: str
+    ) -> tuple[Image.Image | None, tuple[int, int], int]:
+        """Rasterize a glyph into a mask aligned to the pixel grid."""
+
+        advance = round(self._font.getlength(character))
+        left, top, right, bottom = map(int, self._font.getbbox(character))
+
+        if right <= left or bottom <= top:
+            return None, (0, 0), advance
+
+        mask = Image.new("L", (right - left, bottom - top))
+        ImageDraw.Draw(mask).text((-left, -top), character, font=self._font, fill=255)
+
+        return mask.point(PALETTE_MASK_LUT), (left, top), advance
+
+    def __len__(self) -> int:
+        """Get the number of rasterized glyphs."""
+
+        return len(self._glyphs)
@@ -0,0 +1,138 @@
+"""Home Assistant WebSocket client for the Inky pHat Dashboard."""
+
+import asyncio
+import logging
+from collections.abc import Callable
+
+import aiohttp
+
+from inky_phat_dashboard.const import (
+    WEBSOCKET_GET_STATES_MESSAGE_ID,
+    WEBSOCKET_RECONNECT_DELAY_SECONDS,
+    WEBSOCKET_SUBSCRIBE_MESSAGE_ID,
+)
+
+
+class HomeAssistantWebSocket:
+    """Subscribes to state changes of entities over the Home Assistant WebSocket API."""
+
+    def __init__(
+        self,
+        url: str,
+        token: str,
+        entity_ids: list[str],
+        on_state: Callable[[str, str | None], None],
+        reconnect_delay_seconds: float = WEBSOCKET_RECONNECT_DELAY_SECONDS,
+    ):
+        """Initialize the Home Assistant WebSocket client."""
+
+        self._url = url
+        self._token = token
+        self._entity_ids = set(entity_ids)
+        self._on_state = on_state
+        self._reconnect_delay_seconds = reconnect_delay_seconds
+        self._synced = asyncio.Event()
+
+    @property
+    def websocket_url(self) -> str:
+        """Get the url of the WebSocket API."""
+
+        url = self._url.rstrip("/")
+
+        if url.startswith("https://"):
+            url = "wss://" + url.removeprefix("https://")
+        elif url.startswith("http://"):
+            url = "ws://" + url.removeprefix("http://")
+
+        return f"{url}/api/websocket"
+
+    @property
+    def is_synced(self) -> bool:
+        """Get whether the states of the current connection have been received."""
+
+        return self._synced.is_set()
+
+    async def wait_synced(self):
+        """Wait until the states of the current connection have been received."""
+
+        await self._synced.wait()
+
+    async def run(self):
+        """Keep a subscription open, reconnecting and resyncing after disconnects."""
+
+        while True:
+            try:
+                await self._subscribe()
+                logging.warning("Home Assistant WebSocket connection closed")
+            except (aiohttp.ClientError, ConnectionError, ValueError) as ex:
+                logging.warning(f"Home Assistant WebSocket connection failed: {ex}")
+
+            self._synced.clear()
+            await asyncio.sleep(self._reconnect_delay_seconds)
+
+    async def _subscribe(self):
+        """Authenticate, subscribe to state changes and handle incoming messages."""
+
+        async with (
+            aiohttp.ClientSession() as session,
+            session.ws_connect(self.websocket_url) as websocket,
+        ):
+            await self._authenticate(websocket)
+
+            # Subscribe before requesting the snapshot so no change is missed
+            await websocket.send_json(
+                {
+                    "id": WEBSOCKET_SUBSCRIBE_MESSAGE_ID,
+                    "type": "subscribe_events",
+                    "event_type": "state_changed",
+                }
+            )
+            await websocket.send_json(
+                {"id": WEBSOCKET_GET_STATES_MESSAGE_ID, "type": "get_states"}
+            )
+
+            async for message in websocket:
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    break
+
+                self._handle_message(message.json())
+
+    async def _authenticate(self, websocket: aiohttp.ClientWebSocketResponse):
+        """Authenticate with the access token."""
+
+        message = await websocket.receive_json()
+
+        if message.get("type") != "auth_required":
+            raise ValueError(f"Unexpected message: {message}")
+
+        await websocket.send_json({"type": "auth", "access_token": self._token})
+        message = await websocket.receive_json()
+
+        if message.get("type") != "auth_ok":
+            raise ValueError(f"Authentication failed: {message.get('message')}")
+
+        logging.debug("Authenticated with the Home Assistant WebSocket API")
+
+    def _handle_message(self, message: dict):
+        """Handle a message received from Home Assistant."""
+
+        match message.get("type"):
+            case "result" if not message.get("success"):
+                raise ValueError(f"Request failed: {message.get('error')}")
+            case "result" if message.get("id") == WEBSOCKET_GET_STATES_MESSAGE_ID:
+                for state in message["result"]:
+                    if state["entity_id"] in self._entity_ids:
+                        self._on_state(state["entity_id"], state["state"])
+
+                logging.debug("Received states snapshot from Home Assistant")
+                self._synced.set()
+            case "event":
+                data = message["event"]["data"]
+
+                if data["entity_id"] not in self._entity_ids:
+                    return
+
+                new_state = data.get("new_state")
+                self._on_state(
+                    data["entity_id"], new_state["state"] if new_state else None
+                )
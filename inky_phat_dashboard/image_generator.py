@@ -1,5 +1,7 @@
 """Image generator for Inky pHat Dashboard."""
 
+import threading
+
 from PIL import Image
 
 from inky_phat_dashboard.const import (
@@ -16,17 +18,23 @@ from inky_phat_dashboard.const import (
     RECTANGLE_TEXT_DETAILED_CENTER,
     RECTANGLE_TEXT_DETAILED_LOWER,
     RECTANGLE_TEXT_DETAILED_UPPER,
+    TEXT_LAYOUT_CACHE_FILE_NAME,
+    ColorInPalette,
     ColorMode,
     ColorPalette,
+    RenderMode,
     VerticalAlign,
 )
 from inky_phat_dashboard.image_tools import ImageTools
+from inky_phat_dashboard.metrics import metrics
 from inky_phat_dashboard.models import (
     Config,
     DashboardViewData,
     DetailedViewData,
     DetailedViewTwoLinesData,
 )
+from inky_phat_dashboard.sprite_cache import SpriteCache
+from inky_phat_dashboard.text_layout_cache import TextLayoutCache
 
 
 class ImageGenerator:
@@ -37,6 +45,27 @@ class ImageGenerator:
 
         self._config = config
         self._palette = ImageTools.palette_from_color_palette(config.color_palette)
+        self._sprite_cache = SpriteCache()
+        self._text_layout_cache = TextLayoutCache(
+            config.config_file_path.parent / TEXT_LAYOUT_CACHE_FILE_NAME
+            if config.config_file_path is not None
+            else None
+        )
+        self._base_layers: dict[
+            tuple[RenderMode, ColorMode, bool],
+            tuple[Image.Image, Image.Image],
+        ] = {}
+        # Render workers share the base layers and the palette
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Drop everything derived from the rendering settings of the config."""
+
+        with self._lock:
+            self._palette = ImageTools.palette_from_color_palette(
+                self._config.color_palette
+            )
+            self._base_layers.clear()
 
     @property
     def primary_color(self) -> tuple[int, int, int, int]:
@@ -68,85 +97,160 @@ class ImageGenerator:
             else (255, 255, 0, 255)
         )
 
+    @property
+    def primary_index(self) -> int:
+        """Get the palette index of the primary color."""
+
+        return (
+            ColorInPalette.BLACK.value
+            if self._config.color_mode == ColorMode.LIGHT
+            else ColorInPalette.WHITE.value
+        )
+
+    @property
+    def alert_index(self) -> int:
+        """Get the palette index of the alert color."""
+
+        return ColorInPalette.ALERT.value
+
+    def _rgba_color(self, is_alert: bool) -> tuple[int, int, int, int]:
+        """Get the primary or alert color for the RGBA render mode."""
+
+        return self.alert_color if is_alert else self.primary_color
+
+    def _palette_index(self, is_alert: bool) -> int:
+        """Get the palette index of the primary or alert color."""
+
+        return self.alert_index if is_alert else self.primary_index
+
+    def _text_color(self, is_alert: bool) -> tuple[int, int, int, int] | int:
+        """Get the primary or alert text color for the render mode."""
+
+        if self._config.render_mode == RenderMode.PALETTE:
+            return self._palette_index(is_alert)
+
+        return self._rgba_color(is_alert)
+
+    def _create_base_layer(self, is_border_alert: bool) -> Image.Image:
+        """Get a copy of the background with the border drawn on it."""
+
+        key = (self._config.render_mode, self._config.color_mode, is_border_alert)
+
+        if self._config.render_mode == RenderMode.PALETTE:
+            border = self._sprite_cache.get_mask(IMAGE_BORDER_PATH)
+        else:
+            border = self._sprite_cache.get(
+                IMAGE_BORDER_PATH, self._rgba_color(is_border_alert)
+            )
+
+        with self._lock:
+            # The base layer is rebuilt when the border sprite has been reloaded
+            cached = self._base_layers.get(key)
+            if cached is None or cached[0] is not border:
+                if self._config.render_mode == RenderMode.PALETTE:
+                    base_layer = ImageTools.merge_mask(
+                        ImageTools.create_palette_background(
+                            self._config.color_mode, self._palette
+                        ),
+                        border,
+                        (0, 0),
+                        self._palette_index(is_border_alert),
+                    )
+                else:
+                    base_layer = ImageTools.merge_images(
+                        ImageTools.create_background(self._config.color_mode),
+                        border,
+                        (0, 0),
+                    )
+                self._base_layers[key] = (border, base_layer)
+            else:
+                base_layer = cached[1]
+
+        return base_layer.copy()
+
+    def _merge_sprite(
+        self,
+        image: Image.Image,
+        path: str,
+        position: tuple[int, int],
+        is_alert: bool,
+    ) -> Image.Image:
+        """Draw a sprite in the primary or alert color onto the image."""
+
+        if self._config.render_mode == RenderMode.PALETTE:
+            return ImageTools.merge_mask(
+                image,
+                self._sprite_cache.get_mask(path),
+                position,
+                self._palette_index(is_alert),
+            )
+
+        return ImageTools.merge_images(
+            image, self._sprite_cache.get(path, self._rgba_color(is_alert)), position
+        )
+
+    def _finish(self, image: Image.Image) -> Image.Image:
+        """Convert the image to the palette and rotate it if needed."""
+
+        if self._config.render_mode != RenderMode.PALETTE:
+            with metrics.time("palette_conversion"):
+                image = ImageTools.quantize_to_palette(image, self._palette)
+
+        if self._config.flip_screen:
+            image = image.rotate(180)
+
+        self._text_layout_cache.save()
+
+        return image
+
     def generate_detailed_view(
         self, detailed_view_data: DetailedViewData
     ) -> Image.Image:
         """Generate an image for the detailed view."""
 
-        result = ImageTools.create_background(self._config.color_mode)
-        border = Image.open(IMAGE_BORDER_PATH).convert("RGBA")
-        icon = Image.open(detailed_view_data.icon_path).convert("RGBA")
-
-        border = ImageTools.recolor_non_transparent_pixels(
-            border,
-            self.alert_color
-            if detailed_view_data.is_border_alert
-            else self.primary_color,
-        )
-
-        icon = ImageTools.recolor_non_transparent_pixels(
-            icon,
-            self.alert_color
-            if detailed_view_data.is_icon_alert
-            else self.primary_color,
+        result = self._create_base_layer(detailed_view_data.is_border_alert)
+        result = self._merge_sprite(
+            result,
+            detailed_view_data.icon_path,
+            POSITION_ICON_LARGE,
+            detailed_view_data.is_icon_alert,
         )
 
-        result = ImageTools.merge_images(result, border, (0, 0))
-        result = ImageTools.merge_images(result, icon, POSITION_ICON_LARGE)
-
         result = ImageTools.place_text_in_rectangle(
             result,
             self._config.font_path,
             RECTANGLE_TEXT_DETAILED_CENTER,
             detailed_view_data.text,
-            self.alert_color
-            if detailed_view_data.is_text_alert
-            else self.primary_color,
+            self._text_color(detailed_view_data.is_text_alert),
             vertical_align=VerticalAlign.CENTER,
+            text_layout_cache=self._text_layout_cache,
+            text_renderer=self._config.text_renderer,
         )
 
-        result = result.convert("P", palette=self._palette, colors=256)
-
-        if self._config.flip_screen:
-            result = result.rotate(180)
-
-        return result
+        return self._finish(result)
 
     def generate_detailed_view_two_lines(
         self, detailed_view_two_lines_data: DetailedViewTwoLinesData
     ) -> Image.Image:
         """Generate an image for the detailed view with two lines."""
 
-        result = ImageTools.create_background(self._config.color_mode)
-        border = Image.open(IMAGE_BORDER_PATH).convert("RGBA")
-        icon = Image.open(detailed_view_two_lines_data.icon_path).convert("RGBA")
-
-        border = ImageTools.recolor_non_transparent_pixels(
-            border,
-            self.alert_color
-            if detailed_view_two_lines_data.is_border_alert
-            else self.primary_color,
-        )
-
-        icon = ImageTools.recolor_non_transparent_pixels(
-            icon,
-            self.alert_color
-            if detailed_view_two_lines_data.is_icon_alert
-            else self.primary_color,
+        result = self._create_base_layer(detailed_view_two_lines_data.is_border_alert)
+        result = self._merge_sprite(
+            result,
+            detailed_view_two_lines_data.icon_path,
+            POSITION_ICON_LARGE,
+            detailed_view_two_lines_data.is_icon_alert,
         )
 
-        result = ImageTools.merge_images(result, border, (0, 0))
-        result = ImageTools.merge_images(result, icon, POSITION_ICON_LARGE)
-
         result = ImageTools.place_text_in_rectangle(
             result,
             self._config.font_path,
             RECTANGLE_TEXT_DETAILED_UPPER,
             detailed_view_two_lines_data.upper_text,
-            self.alert_color
-            if detailed_view_two_lines_data.is_upper_text_alert
-            else self.primary_color,
+            self._text_color(detailed_view_two_lines_data.is_upper_text_alert),
             vertical_align=VerticalAlign.BOTTOM,
+            text_layout_cache=self._text_layout_cache,
+            text_renderer=self._config.text_renderer,
         )
 
         result = ImageTools.place_text_in_rectangle(
@@ -154,18 +258,13 @@ class ImageGenerator:
             self._config.font_path,
             RECTANGLE_TEXT_DETAILED_LOWER,
             detailed_view_two_lines_data.lower_text,
-            self.alert_color
-            if detailed_view_two_lines_data.is_lower_text_alert
-            else self.primary_color,
+            self._text_color(detailed_view_two_lines_data.is_lower_text_alert),
             vertical_align=VerticalAlign.TOP,
+            text_layout_cache=self._text_layout_cache,
+            text_renderer=self._config.text_renderer,
         )
 
-        result = result.convert("P", palette=self._palette, colors=256)
-
-        if self._config.flip_screen:
-            result = result.rotate(180)
-
-        return result
+        return self._finish(result)
 
     def generate_dashboard_view(
         self, dashboard_view_data: DashboardViewData
@@ -175,17 +274,7 @@ class ImageGenerator:
         if len(dashboard_view_data.elements) > 4:
             raise ValueError("Too many dashboard elements")
 
-        result = ImageTools.create_background(self._config.color_mode)
-        border = Image.open(IMAGE_BORDER_PATH).convert("RGBA")
-
-        border = ImageTools.recolor_non_transparent_pixels(
-            border,
-            self.alert_color
-            if dashboard_view_data.is_border_alert
-            else self.primary_color,
-        )
-
-        result = ImageTools.merge_images(result, border, (0, 0))
+        result = self._create_base_layer(dashboard_view_data.is_border_alert)
 
         positions = [
             POSITION_ICON_UPPER_LEFT,
@@ -202,32 +291,24 @@ class ImageGenerator:
         ]
 
         for i, dashboard_element_data in enumerate(dashboard_view_data.elements):
-            icon = Image.open(dashboard_element_data.icon_path).convert("RGBA")
             position = positions[i]
             rectangle = rectangles[i]
 
-            icon = ImageTools.recolor_non_transparent_pixels(
-                icon,
-                self.alert_color
-                if dashboard_element_data.is_icon_alert
-                else self.primary_color,
+            result = self._merge_sprite(
+                result,
+                dashboard_element_data.icon_path,
+                position,
+                dashboard_element_data.is_icon_alert,
             )
-
-            result = ImageTools.merge_images(result, icon, position)
             result = ImageTools.place_text_in_rectangle(
                 result,
                 self._config.font_path,
                 rectangle,
                 dashboard_element_data.text,
-                self.alert_color
-                if dashboard_element_data.is_text_alert
-                else self.primary_color,
+                self._text_color(dashboard_element_data.is_text_alert),
                 vertical_align=VerticalAlign.CENTER,
+                text_layout_cache=self._text_layout_cache,
+                text_renderer=self._config.text_renderer,
             )
 
-        result = result.convert("P", palette=self._palette, colors=256)
-
-        if self._config.flip_screen:
-            result = result.rotate(180)
-
-        return result
+        return self._finish(result)
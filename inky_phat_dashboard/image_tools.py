@@ -1,17 +1,31 @@
 """Image tools for the Inky pHat Dashboard."""
 
+import functools
+import hashlib
 from abc import ABC
+from collections.abc import Iterable
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageChops, ImageDraw, ImageFont
 
 from inky_phat_dashboard.const import (
     COLOR_PALETTE_TO_COLORS,
+    FONT_CACHE_SIZE,
+    GLYPH_ATLAS_CACHE_SIZE,
     INKY_HEIGHT,
     INKY_WIDTH,
+    MAX_FONT_SIZE,
+    MIN_FONT_SIZE,
+    NON_TRANSPARENT_MASK_LUT,
+    PALETTE_MASK_LUT,
+    ColorInPalette,
     ColorMode,
     ColorPalette,
+    TextRenderer,
     VerticalAlign,
 )
+from inky_phat_dashboard.glyph_atlas import GlyphAtlas
+from inky_phat_dashboard.models import FrameDiff, TextLayout
+from inky_phat_dashboard.text_layout_cache import TextLayoutCache
 
 
 class ImageTools(ABC):
@@ -20,7 +34,7 @@ class ImageTools(ABC):
     @staticmethod
     def palette_from_color_palette(
         color_palette: ColorPalette,
-    ) -> list[tuple[int, int, int, int]]:
+    ) -> list[int]:
         """Get the palette from the color palette."""
 
         colors = COLOR_PALETTE_TO_COLORS[color_palette]
@@ -42,6 +56,41 @@ class ImageTools(ABC):
             (255, 255, 255, 255) if color_mode == ColorMode.LIGHT else (0, 0, 0, 255),
         )
 
+    @staticmethod
+    def create_palette_background(
+        color_mode: ColorMode, palette: list[int]
+    ) -> Image.Image:
+        """Create a palette indexed background image."""
+
+        image = Image.new(
+            "P",
+            (INKY_WIDTH, INKY_HEIGHT),
+            ColorInPalette.WHITE.value
+            if color_mode == ColorMode.LIGHT
+            else ColorInPalette.BLACK.value,
+        )
+        image.putpalette(palette)
+
+        return image
+
+    @staticmethod
+    def quantize_to_palette(image: Image.Image, palette: list[int]) -> Image.Image:
+        """Map every pixel to the nearest color of the palette, without dithering."""
+
+        # Only the colors of the panel are used, so the indices are its indices
+        palette_image = Image.new("P", (1, 1))
+        palette_image.putpalette(palette[: len(ColorInPalette) * 3])
+
+        return image.convert("RGB").quantize(
+            palette=palette_image, dither=Image.Dither.NONE
+        )
+
+    @staticmethod
+    def mask_from_alpha(image: Image.Image) -> Image.Image:
+        """Get a mask of the pixels that are at least half opaque."""
+
+        return image.getchannel("A").point(PALETTE_MASK_LUT)
+
     @staticmethod
     def recolor_non_transparent_pixels(
         image: Image.Image, new_color: tuple[int, int, int, int]
@@ -49,25 +98,46 @@ class ImageTools(ABC):
         """
         Changes all non-transparent pixels in an RGBA image to the specified color.
 
+        The alpha channel is kept as is and fully transparent pixels are left
+        untouched. The image is modified in place using band operations instead
+        of iterating over the pixels in Python.
+
         Parameters:
-        - image_path: Path to the input image
+        - image: The RGBA image to recolor
         - new_color: Tuple of RGBA values for the new color, e.g., (255, 255, 255, 255) for white
 
         Returns:
         - Image object with recolored non-transparent pixels
         """
-        data = image.getdata()
 
-        new_data: list[tuple[int, int, int, int]] = []
-        for item in data:
-            if item[3] != 0:
-                new_data.append((new_color[0], new_color[1], new_color[2], item[3]))
-            else:
-                new_data.append(item)
+        alpha = image.getchannel("A")
+        mask = alpha.point(NON_TRANSPARENT_MASK_LUT)
+
+        recolored = Image.new("RGBA", image.size, (*new_color[:3], 0))
+        recolored.putalpha(alpha)
 
-        image.putdata(new_data)
+        image.paste(recolored, (0, 0), mask)
         return image
 
+    @staticmethod
+    def recolor_non_transparent_pixels_batch(
+        images_and_colors: Iterable[tuple[Image.Image, tuple[int, int, int, int]]],
+    ) -> list[Image.Image]:
+        """
+        Recolor a batch of RGBA images, each with its own color.
+
+        Parameters:
+        - images_and_colors: Pairs of RGBA images and the colors to apply to them
+
+        Returns:
+        - List of the recolored images in the order they were given
+        """
+
+        return [
+            ImageTools.recolor_non_transparent_pixels(image, new_color)
+            for image, new_color in images_and_colors
+        ]
+
     @staticmethod
     def merge_images(
         first: Image.Image, second: Image.Image, position: tuple[int, int]
@@ -78,29 +148,95 @@ class ImageTools(ABC):
         return first
 
     @staticmethod
-    def place_text_in_rectangle(
-        image: Image.Image,
+    def fingerprint(image: Image.Image) -> str:
+        """Get a hash of the mode, size, palette and pixels of an image."""
+
+        digest = hashlib.sha256(f"{image.mode}{image.size}".encode())
+        digest.update(bytes(image.getpalette() or []))
+        digest.update(image.tobytes())
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def diff_images(first: Image.Image, second: Image.Image) -> FrameDiff:
+        """Get the bounding box and the fraction of pixels that differ."""
+
+        if first.size != second.size:
+            return FrameDiff(changed_bbox=(0, 0, *second.size), changed_fraction=1.0)
+
+        difference = ImageChops.difference(first.convert("RGB"), second.convert("RGB"))
+        red, green, blue = difference.split()
+        changed = ImageChops.lighter(ImageChops.lighter(red, green), blue)
+
+        unchanged_pixels = changed.histogram()[0]
+        total_pixels = second.width * second.height
+
+        return FrameDiff(
+            changed_bbox=changed.getbbox(),
+            changed_fraction=(total_pixels - unchanged_pixels) / total_pixels,
+        )
+
+    @staticmethod
+    @functools.lru_cache(maxsize=FONT_CACHE_SIZE)
+    def get_font(font_path: str, font_size: int) -> ImageFont.FreeTypeFont:
+        """Get a font, loading it only once per path and size for the process."""
+
+        return ImageFont.truetype(font_path, font_size)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=GLYPH_ATLAS_CACHE_SIZE)
+    def get_glyph_atlas(font_path: str, font_size: int) -> GlyphAtlas:
+        """Get the glyph atlas of a font, shared per path and size for the process."""
+
+        return GlyphAtlas(ImageTools.get_font(font_path, font_size))
+
+    @staticmethod
+    def measure_text(
+        font: ImageFont.FreeTypeFont, text: str
+    ) -> tuple[int, int, int, int]:
+        """Get the bounding box of a text drawn at the origin."""
+
+        draw = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+        left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+
+        return int(left), int(top), int(right), int(bottom)
+
+    @staticmethod
+    def layout_text(
         font_path: str,
         rectangle: tuple[int, int, int, int],
         text: str,
-        color: tuple[int, int, int, int],
         vertical_align: VerticalAlign,
-    ):
-        draw = ImageDraw.Draw(image)
+    ) -> TextLayout:
+        """Find the largest font size for a text to fit a rectangle and place it."""
+
         x, y, width, height = rectangle
-        max_font_size = 100  # Start with a large font size
-
-        # Try to find the maximum font size that fits within the rectangle
-        font_size = max_font_size
-        while font_size > 0:
-            font = ImageFont.truetype(font_path, font_size)
-            # Use textbbox to calculate the bounding box of the text
-            text_bbox = draw.textbbox((0, 0), text, font=font)
-            text_width = text_bbox[2] - text_bbox[0]
-            text_height = text_bbox[3] - text_bbox[1]
-            if text_width <= width and text_height <= height:
-                break
-            font_size -= 1
+
+        def measure(font_size: int) -> tuple[int, int, int, int]:
+            return ImageTools.measure_text(
+                ImageTools.get_font(font_path, font_size), text
+            )
+
+        def fits(text_bbox: tuple[int, int, int, int]) -> bool:
+            return (
+                text_bbox[2] - text_bbox[0] <= width
+                and text_bbox[3] - text_bbox[1] <= height
+            )
+
+        # Bisect for the maximum font size that fits within the rectangle,
+        # falling back to the smallest size if even that is too large
+        low, high = MIN_FONT_SIZE, MAX_FONT_SIZE
+        while low < high:
+            font_size = (low + high + 1) // 2
+            if fits(measure(font_size)):
+                low = font_size
+            else:
+                high = font_size - 1
+
+        font_size = low
+        text_bbox = measure(font_size)
+        text_width = text_bbox[2] - text_bbox[0]
+        text_height = text_bbox[3] - text_bbox[1]
 
         # Calculate horizontal center alignment
         text_x = x + (width - text_width) // 2
@@ -116,7 +252,59 @@ class ImageTools(ABC):
         else:
             raise ValueError("Invalid vertical align mode")
 
+        return TextLayout(
+            font_size=font_size, text_bbox=text_bbox, position=(text_x, text_y)
+        )
+
+    @staticmethod
+    def merge_mask(
+        image: Image.Image,
+        mask: Image.Image,
+        position: tuple[int, int],
+        index: int,
+    ) -> Image.Image:
+        """Fill the pixels of a mask with a palette index."""
+
+        x, y = position
+        image.paste(index, (x, y, x + mask.width, y + mask.height), mask)
+        return image
+
+    @staticmethod
+    def place_text_in_rectangle(
+        image: Image.Image,
+        font_path: str,
+        rectangle: tuple[int, int, int, int],
+        text: str,
+        color: tuple[int, int, int, int] | int,
+        vertical_align: VerticalAlign,
+        text_layout_cache: TextLayoutCache | None = None,
+        text_renderer: TextRenderer = TextRenderer.FREETYPE,
+    ):
+        text_layout = (
+            text_layout_cache.get(font_path, rectangle, text, vertical_align)
+            if text_layout_cache is not None
+            else None
+        )
+
+        if text_layout is None:
+            text_layout = ImageTools.layout_text(
+                font_path, rectangle, text, vertical_align
+            )
+
+            if text_layout_cache is not None:
+                text_layout_cache.put(
+                    font_path, rectangle, text, vertical_align, text_layout
+                )
+
+        if text_renderer == TextRenderer.GLYPH_ATLAS:
+            return ImageTools.get_glyph_atlas(
+                font_path, text_layout.font_size
+            ).draw_text(image, text_layout.position, text, color)
+
+        font = ImageTools.get_font(font_path, text_layout.font_size)
+
         # Draw the text at the computed position
-        draw.text((text_x, text_y), text, font=font, fill=color)
+        draw = ImageDraw.Draw(image)
+        draw.text(text_layout.position, text, font=font, fill=color)
 
         return image
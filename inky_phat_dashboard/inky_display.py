@@ -0,0 +1,22 @@
+"""Inky display for the Inky pHat Dashboard."""
+
+from PIL import Image
+
+from inky_phat_dashboard.base_display import BaseDisplay
+
+
+class InkyDisplay(BaseDisplay):
+    """Shows images on an attached Inky display."""
+
+    def __init__(self):
+        """Initialize the Inky display."""
+
+        from inky import auto
+
+        self._inky_display = auto()
+
+    def show(self, image: Image.Image) -> None:
+        """Show an image on the display."""
+
+        self._inky_display.set_image(image)
+        self._inky_display.show()
@@ -0,0 +1,48 @@
+"""Event loop lag monitor for the Inky pHat Dashboard."""
+
+import asyncio
+import logging
+import time
+
+from inky_phat_dashboard.const import (
+    LOOP_LAG_INTERVAL_SECONDS,
+    LOOP_LAG_REPORT_INTERVAL_SECONDS,
+)
+from inky_phat_dashboard.metrics import metrics
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up from short sleeps, as metrics."""
+
+    def __init__(
+        self,
+        interval_seconds: float = LOOP_LAG_INTERVAL_SECONDS,
+        report_interval_seconds: float = LOOP_LAG_REPORT_INTERVAL_SECONDS,
+    ):
+        """Initialize the loop lag monitor."""
+
+        self._interval_seconds = interval_seconds
+        self._report_interval_seconds = report_interval_seconds
+        self.max_lag_seconds = 0.0
+        self.last_lag_seconds = 0.0
+
+    async def run(self):
+        """Measure the loop lag and log the maximum periodically."""
+
+        last_report = time.monotonic()
+
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self._interval_seconds)
+            now = time.monotonic()
+
+            self.last_lag_seconds = max(0.0, now - start - self._interval_seconds)
+            self.max_lag_seconds = max(self.max_lag_seconds, self.last_lag_seconds)
+            metrics.observe("loop_lag", self.last_lag_seconds)
+
+            if now - last_report >= self._report_interval_seconds:
+                logging.debug(
+                    f"Event loop lag: max {self.max_lag_seconds * 1000:.1f} ms"
+                )
+                self.max_lag_seconds = 0.0
+                last_report = now
@@ -0,0 +1,27 @@
+"""Memory display for the Inky pHat Dashboard."""
+
+import time
+from collections import deque
+
+from PIL import Image
+
+from inky_phat_dashboard.base_display import BaseDisplay
+from inky_phat_dashboard.const import DEFAULT_MEMORY_DISPLAY_MAX_FRAMES
+
+
+class MemoryDisplay(BaseDisplay):
+    """Records the shown images and the times they were shown at."""
+
+    def __init__(self, max_frames: int = DEFAULT_MEMORY_DISPLAY_MAX_FRAMES):
+        """Initialize the memory display."""
+
+        self.frames: deque[Image.Image] = deque(maxlen=max_frames)
+        self.timestamps: deque[float] = deque(maxlen=max_frames)
+        self.frame_count = 0
+
+    def show(self, image: Image.Image) -> None:
+        """Show an image on the display."""
+
+        self.frames.append(image)
+        self.timestamps.append(time.monotonic())
+        self.frame_count += 1
@@ -0,0 +1,169 @@
+"""Metrics for the Inky pHat Dashboard."""
+
+import bisect
+import contextlib
+import threading
+import time
+from collections.abc import Iterator
+
+from inky_phat_dashboard.const import METRICS_BUCKETS_SECONDS, METRICS_PREFIX
+
+_NULL_TIMER = contextlib.nullcontext()
+
+
+class Histogram:
+    """Histogram of durations in fixed buckets."""
+
+    def __init__(self, buckets: tuple[float, ...] = METRICS_BUCKETS_SECONDS):
+        """Initialize the histogram."""
+
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        """Add a duration to the histogram."""
+
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, quantile: float) -> float:
+        """Get the upper bound of the bucket containing a quantile."""
+
+        rank = quantile * self.count
+        cumulative_count = 0
+
+        for bucket, bucket_count in zip(self.buckets, self.bucket_counts):
+            cumulative_count += bucket_count
+
+            if cumulative_count >= rank:
+                return bucket
+
+        return self.max
+
+
+class Metrics:
+    """
+    Latency histograms per pipeline stage and counters.
+
+    While disabled, every call returns right away and timing a stage returns a
+    shared null context, so the instrumentation costs only a function call.
+    """
+
+    def __init__(self, enabled: bool = False):
+        """Initialize the metrics."""
+
+        self.enabled = enabled
+        self._histograms: dict[str, Histogram] = {}
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: int = 1):
+        """Increment a counter."""
+
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, stage: str, seconds: float):
+        """Add the duration of a stage to its histogram."""
+
+        if not self.enabled:
+            return
+
+        with self._lock:
+            histogram = self._histograms.get(stage)
+
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+
+            histogram.observe(seconds)
+
+    def time(self, stage: str) -> contextlib.AbstractContextManager:
+        """Get a context manager measuring the duration of a stage."""
+
+        if not self.enabled:
+            return _NULL_TIMER
+
+        return self._time(stage)
+
+    @contextlib.contextmanager
+    def _time(self, stage: str) -> Iterator[None]:
+        """Measure the duration of a stage, including failed runs."""
+
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def reset(self):
+        """Remove all recorded values."""
+
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render_prometheus(self) -> str:
+        """Get the metrics in the Prometheus text exposition format."""
+
+        lines = []
+
+        with self._lock:
+            if self._histograms:
+                name = f"{METRICS_PREFIX}_stage_seconds"
+                lines.append(f"# HELP {name} Duration of the pipeline stages.")
+                lines.append(f"# TYPE {name} histogram")
+
+            for stage, histogram in sorted(self._histograms.items()):
+                cumulative_count = 0
+
+                for bucket, bucket_count in zip(
+                    histogram.buckets, histogram.bucket_counts
+                ):
+                    cumulative_count += bucket_count
+                    lines.append(
+                        f'{name}_bucket{{stage="{stage}",le="{bucket}"}} '
+                        f"{cumulative_count}"
+                    )
+
+                lines.append(
+                    f'{name}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}'
+                )
+                lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+
+            for counter, value in sorted(self._counters.items()):
+                name = f"{METRICS_PREFIX}_{counter}_total"
+                lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """Get a one line summary of the stages and counters for the log."""
+
+        with self._lock:
+            stages = [
+                f"{stage} n={histogram.count} "
+                f"mean={histogram.sum / histogram.count * 1000:.1f}ms "
+                f"p95<={histogram.quantile(0.95) * 1000:.0f}ms "
+                f"max={histogram.max * 1000:.1f}ms"
+                for stage, histogram in sorted(self._histograms.items())
+            ]
+            counters = [
+                f"{counter}={value}"
+                for counter, value in sorted(self._counters.items())
+            ]
+
+        return f"Metrics: {'; '.join(stages + counters) or 'none recorded'}"
+
+
+metrics = Metrics()
@@ -0,0 +1,53 @@
+"""Metrics server for the Inky pHat Dashboard."""
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from inky_phat_dashboard.metrics import Metrics
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+
+class MetricsServer:
+    """Serves the metrics in the Prometheus text format over HTTP."""
+
+    def __init__(self, metrics: Metrics, host: str, port: int):
+        """Initialize the metrics server."""
+
+        self._metrics = metrics
+        self._host = host
+        self._port = port
+        self.addresses: list = []
+
+    async def run(self):
+        """Serve the metrics until cancelled."""
+
+        # The server is optional, so aiohttp.web is only imported when it runs
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+
+        try:
+            await web.TCPSite(runner, self._host, self._port).start()
+            self.addresses = runner.addresses
+            logging.info(f"Serving metrics on {self._host}:{self._port}/metrics")
+
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+    async def _handle_metrics(self, request: "web.Request") -> "web.Response":
+        """Handle a request for the metrics."""
+
+        from aiohttp import web
+
+        return web.Response(
+            text=self._metrics.render_prometheus(),
+            content_type="text/plain",
+            charset="utf-8",
+        )
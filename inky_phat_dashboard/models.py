@@ -1,35 +1,78 @@
 """Models for the Inky pHat Dashboard."""
 
+import dataclasses
 import datetime
+import functools
+import os
 from abc import ABC
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import marshmallow_dataclass
 import tzlocal
-import yaml
 
 from inky_phat_dashboard.const import (
+    CONFIG_RESTART_FIELDS,
+    DEFAULT_BULK_FETCH,
     DEFAULT_COLOR_MODE,
+    DEFAULT_CONFIG_WATCH_INTERVAL_SECONDS,
     DEFAULT_DATA_TIMEOUT_SECONDS,
+    DEFAULT_DISPLAY_FILE_FORMAT,
+    DEFAULT_DISPLAY_OUTPUT_PATH,
+    DEFAULT_DWELL_WEIGHT,
     DEFAULT_ENABLE_INKY,
+    DEFAULT_ENABLE_STATE_SNAPSHOT,
     DEFAULT_FLIP_SCREEN,
     DEFAULT_FONT_PATH,
+    DEFAULT_FRAME_CACHE_SIZE,
     DEFAULT_LOG_DATEFMT,
     DEFAULT_LOG_FILEMODE,
     DEFAULT_LOG_FMT,
     DEFAULT_LOG_LEVEL,
+    DEFAULT_LOG_PATH,
+    DEFAULT_MAX_PARALLEL_REQUESTS,
+    DEFAULT_MAX_POLL_INTERVAL_SECONDS,
+    DEFAULT_METRICS_ENABLED,
+    DEFAULT_METRICS_HOST,
+    DEFAULT_METRICS_LOG_INTERVAL_SECONDS,
+    DEFAULT_PROFILING_CYCLES,
+    DEFAULT_PROFILING_ENABLED,
+    DEFAULT_PROFILING_TOP_ALLOCATIONS,
+    DEFAULT_RENDER_MODE,
+    DEFAULT_RENDER_WORKER_COUNT,
+    DEFAULT_REQUEST_TIMEOUT_SECONDS,
+    DEFAULT_STATE_SNAPSHOT_INTERVAL_SECONDS,
+    DEFAULT_TEXT_RENDERER,
+    DEFAULT_UPDATE_TIMEOUT_SECONDS,
+    DEFAULT_USE_WEBSOCKET,
     DEFAULT_VIEW_CHANGE_SECONDS,
     DEFAULT_WASTE_ALERT_DAYS,
     DEFAULT_WASTE_DETAILED_DAYS,
+    ENV_LOG_FILE_PATH,
     ColorMode,
     ColorPalette,
+    DisplayType,
+    FrameFileFormat,
+    RenderMode,
+    TextRenderer,
 )
 
+if TYPE_CHECKING:
+    import marshmallow
+
 
 @dataclass
 class ViewData(ABC):
-    """Data for a view."""
+    """
+    Data for a view.
+
+    The view id identifies the view within its module across changes of the
+    content. The dwell weight is the number of view changes the view is shown
+    for.
+    """
+
+    view_id: str = field(default="", kw_only=True)
+    dwell_weight: int = field(default=DEFAULT_DWELL_WEIGHT, kw_only=True)
 
 
 @dataclass
@@ -74,6 +117,23 @@ class DetailedViewTwoLinesData(ViewData):
     is_lower_text_alert: bool = False
 
 
+@dataclass(frozen=True)
+class TextLayout:
+    """Layout of a text fitted into a rectangle."""
+
+    font_size: int
+    text_bbox: tuple[int, int, int, int]
+    position: tuple[int, int]
+
+
+@dataclass(frozen=True)
+class FrameDiff:
+    """Difference between two frames."""
+
+    changed_bbox: tuple[int, int, int, int] | None
+    changed_fraction: float
+
+
 @dataclass
 class StateInformation:
     """Information about the state of a sensor."""
@@ -104,6 +164,25 @@ class LoggingConfig:
     filemode: str = DEFAULT_LOG_FILEMODE
 
 
+@dataclass
+class MetricsConfig:
+    """Configuration for metrics."""
+
+    enabled: bool = DEFAULT_METRICS_ENABLED
+    host: str = DEFAULT_METRICS_HOST
+    port: int | None = None
+    log_interval_seconds: float | None = DEFAULT_METRICS_LOG_INTERVAL_SECONDS
+
+
+@dataclass
+class ProfilingConfig:
+    """Configuration for profiling."""
+
+    enabled: bool = DEFAULT_PROFILING_ENABLED
+    cycles: int = DEFAULT_PROFILING_CYCLES
+    top_allocations: int = DEFAULT_PROFILING_TOP_ALLOCATIONS
+
+
 @dataclass
 class SensorConfig:
     """Configuration for a sensor."""
@@ -127,6 +206,12 @@ class HomeAssistantConfig:
     sensor_configs: list[SensorConfig] = field(
         default_factory=list, metadata=dict(data_key="sensors")
     )
+    request_timeout_seconds: float = DEFAULT_REQUEST_TIMEOUT_SECONDS
+    max_parallel_requests: int = DEFAULT_MAX_PARALLEL_REQUESTS
+    use_websocket: bool = DEFAULT_USE_WEBSOCKET
+    bulk_fetch: bool = DEFAULT_BULK_FETCH
+    update_timeout_seconds: float = DEFAULT_UPDATE_TIMEOUT_SECONDS
+    max_poll_interval_seconds: float = DEFAULT_MAX_POLL_INTERVAL_SECONDS
 
 
 @dataclass
@@ -140,17 +225,86 @@ class Config:
     logging_config: LoggingConfig = field(
         default_factory=LoggingConfig, metadata=dict(data_key="logging")
     )
+    metrics_config: MetricsConfig = field(
+        default_factory=MetricsConfig, metadata=dict(data_key="metrics")
+    )
+    profiling_config: ProfilingConfig = field(
+        default_factory=ProfilingConfig, metadata=dict(data_key="profiling")
+    )
     data_timeout_seconds: int = DEFAULT_DATA_TIMEOUT_SECONDS
     view_change_interval_seconds: int = DEFAULT_VIEW_CHANGE_SECONDS
     timezone: str = field(default=tzlocal.get_localzone_name())
     font_path: str = DEFAULT_FONT_PATH
     color_mode: ColorMode = DEFAULT_COLOR_MODE
+    render_mode: RenderMode = DEFAULT_RENDER_MODE
+    text_renderer: TextRenderer = DEFAULT_TEXT_RENDERER
     waste_detailed_days: int = DEFAULT_WASTE_DETAILED_DAYS
     waste_alert_days: int = DEFAULT_WASTE_ALERT_DAYS
+    waste_alert_dwell_weight: int = DEFAULT_DWELL_WEIGHT
     enable_inky: bool = DEFAULT_ENABLE_INKY
     flip_screen: bool = DEFAULT_FLIP_SCREEN
+    display: DisplayType | None = None
+    display_output_path: str = DEFAULT_DISPLAY_OUTPUT_PATH
+    display_file_format: FrameFileFormat = DEFAULT_DISPLAY_FILE_FORMAT
+    frame_cache_size: int = DEFAULT_FRAME_CACHE_SIZE
+    render_worker_count: int = DEFAULT_RENDER_WORKER_COUNT
+    config_watch_interval_seconds: float = DEFAULT_CONFIG_WATCH_INTERVAL_SECONDS
+    enable_state_snapshot: bool = DEFAULT_ENABLE_STATE_SNAPSHOT
+    state_snapshot_interval_seconds: float = DEFAULT_STATE_SNAPSHOT_INTERVAL_SECONDS
+
+    config_file_path: Path | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
-    config_file_path: Path = field(init=False, repr=False, compare=False)
+    @property
+    def log_file_path(self) -> Path:
+        """Get the path of the log file, relative paths are relative to the config."""
+
+        log_file_path = Path(
+            self.logging_config.path or os.getenv(ENV_LOG_FILE_PATH) or DEFAULT_LOG_PATH
+        )
+
+        if not log_file_path.is_absolute() and self.config_file_path is not None:
+            log_file_path = self.config_file_path.parent / log_file_path
+
+        return log_file_path
+
+    @property
+    def display_type(self) -> DisplayType:
+        """Get the display type, derived from enable_inky if not configured."""
+
+        if self.display is not None:
+            return self.display
+
+        return DisplayType.INKY if self.enable_inky else DisplayType.VIEWER
+
+    def apply(self, other: "Config") -> tuple[set[str], set[str]]:
+        """
+        Take over the values of another configuration.
+
+        Fields only read at startup keep their running values. Returns the
+        changed fields and the fields pending until a restart.
+        """
+
+        changed_fields = set()
+        pending_fields = set()
+
+        for config_field in dataclasses.fields(self):
+            if not config_field.init:
+                continue
+
+            value = getattr(other, config_field.name)
+
+            if getattr(self, config_field.name) == value:
+                continue
+
+            if config_field.name in CONFIG_RESTART_FIELDS:
+                pending_fields.add(config_field.name)
+            else:
+                setattr(self, config_field.name, value)
+                changed_fields.add(config_field.name)
+
+        return changed_fields, pending_fields
 
     @classmethod
     def load(cls, config_file_path: Path) -> "Config":
@@ -159,10 +313,23 @@ class Config:
         if not config_file_path.exists():
             raise FileNotFoundError(f"Config file not found: {config_file_path}")
 
+        # The YAML and schema libraries are only needed here, so they are
+        # imported on first use to keep them off the import path
+        import yaml
+
         with config_file_path.open() as config_file:
             config_dict = yaml.load(config_file, Loader=yaml.FullLoader)
 
-        config = marshmallow_dataclass.class_schema(cls)().load(config_dict)
+        config = cls.schema().load(config_dict)
         config.config_file_path = config_file_path
 
         return config
+
+    @classmethod
+    @functools.cache
+    def schema(cls) -> "marshmallow.Schema":
+        """Get the schema of the configuration, built once per process."""
+
+        import marshmallow_dataclass
+
+        return marshmallow_dataclass.class_schema(cls)()
@@ -24,8 +24,12 @@ class RemainingDaysParser(Parser):
 
         try:
             remaining_days = int(state.split(" ")[1])
-            datetime_now = datetime.datetime.now(tzlocal.get_localzone())
-            due_date = datetime_now + datetime.timedelta(days=remaining_days)
+            # The state is only precise to the day, so equal states on the same
+            # day parse to equal due dates
+            today = datetime.datetime.now(tzlocal.get_localzone()).replace(
+                hour=0, minute=0, second=0, microsecond=0
+            )
+            due_date = today + datetime.timedelta(days=remaining_days)
 
             return StateInformation(is_available=True, due_date=due_date)
         except (IndexError, ValueError):
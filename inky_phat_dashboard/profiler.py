@@ -0,0 +1,180 @@
+"""Profiler for the Inky pHat Dashboard."""
+
+import contextlib
+import cProfile
+import datetime
+import logging
+import threading
+import tracemalloc
+from collections.abc import Iterator
+from pathlib import Path
+
+_NULL_PROFILE = contextlib.nullcontext()
+
+
+class Profiler:
+    """
+    Profiles the next cycles with cProfile and tracemalloc, then turns itself off.
+
+    Every profiled cycle writes a .pstats file and a text file with the top
+    allocations to the output directory. cProfile only sees the thread it runs
+    on, so work handed to other threads is profiled as sections of the running
+    cycles. While a cycle is profiled on the event loop, the other tasks that
+    run in between are included in its profile, and cycles that overlap with
+    it are not profiled.
+    """
+
+    def __init__(self, output_directory: Path):
+        """Initialize the profiler."""
+
+        self._output_directory = output_directory
+        self._top_allocations = 0
+        self._remaining_cycles = 0
+        self._profiled_cycles = 0
+        self._is_tracing_owned = False
+        self._active = threading.local()
+        self._lock = threading.Lock()
+        self.written_paths: list[Path] = []
+
+    @property
+    def is_active(self) -> bool:
+        """Get whether cycles are profiled."""
+
+        return self._remaining_cycles > 0
+
+    def start(self, cycles: int, top_allocations: int):
+        """Profile the next cycles, listing the given number of top allocations."""
+
+        if cycles <= 0:
+            return
+
+        with self._lock:
+            self._remaining_cycles = cycles
+            self._top_allocations = top_allocations
+            self._profiled_cycles = 0
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._is_tracing_owned = True
+
+        logging.info(
+            f"Profiling the next {cycles} cycles to {self._output_directory}..."
+        )
+
+    def stop(self):
+        """Stop profiling and the memory tracing started for it."""
+
+        with self._lock:
+            self._remaining_cycles = 0
+
+            if self._is_tracing_owned:
+                tracemalloc.stop()
+                self._is_tracing_owned = False
+
+        logging.info(f"Profiling finished after {self._profiled_cycles} cycles")
+
+    def profile_cycle(self, name: str) -> contextlib.AbstractContextManager:
+        """Get a context manager profiling a cycle, which counts toward the limit."""
+
+        if not self.is_active:
+            return _NULL_PROFILE
+
+        return self._profile(name, is_cycle=True)
+
+    def profile_section(self, name: str) -> contextlib.AbstractContextManager:
+        """Get a context manager profiling a section of a cycle on another thread."""
+
+        if not self.is_active:
+            return _NULL_PROFILE
+
+        return self._profile(name, is_cycle=False)
+
+    @contextlib.contextmanager
+    def _profile(self, name: str, is_cycle: bool) -> Iterator[None]:
+        """Profile the body and write the results."""
+
+        # Only one profiler can be enabled per thread
+        if getattr(self._active, "is_profiling", False):
+            yield
+            return
+
+        self._active.is_profiling = True
+        start_snapshot = (
+            tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        )
+        profile = cProfile.Profile()
+        profile.enable()
+
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._active.is_profiling = False
+            self._write(name, profile, start_snapshot)
+
+            if is_cycle:
+                self._count_cycle()
+
+    def _count_cycle(self):
+        """Count a profiled cycle and stop after the last one."""
+
+        with self._lock:
+            if self._remaining_cycles <= 0:
+                return
+
+            self._remaining_cycles -= 1
+            self._profiled_cycles += 1
+            is_finished = self._remaining_cycles == 0
+
+        if is_finished:
+            self.stop()
+
+    def _write(
+        self,
+        name: str,
+        profile: cProfile.Profile,
+        start_snapshot: tracemalloc.Snapshot | None,
+    ):
+        """Write the profile and the top allocations of a cycle."""
+
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        base_path = self._output_directory / f"profile_{timestamp}_{name}"
+        stats_path = base_path.with_name(f"{base_path.name}.pstats")
+
+        try:
+            self._output_directory.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(stats_path)
+            self.written_paths.append(stats_path)
+
+            if start_snapshot is None or not tracemalloc.is_tracing():
+                return
+
+            allocations_path = base_path.with_name(f"{base_path.name}.allocations.txt")
+            allocations_path.write_text(
+                self._format_allocations(start_snapshot, tracemalloc.take_snapshot())
+            )
+            self.written_paths.append(allocations_path)
+        except (OSError, RuntimeError) as ex:
+            # Tracing stops when the last cycle ends while a section still runs
+            logging.warning(f"Profile {name} could not be written: {ex}")
+
+    def _format_allocations(
+        self, start_snapshot: tracemalloc.Snapshot, end_snapshot: tracemalloc.Snapshot
+    ) -> str:
+        """Format the top allocations and the top changes during a cycle."""
+
+        lines = [f"Top {self._top_allocations} allocations:"]
+        lines.extend(
+            str(statistic)
+            for statistic in end_snapshot.statistics("lineno")[: self._top_allocations]
+        )
+        lines.append("")
+        lines.append(f"Top {self._top_allocations} changes during the cycle:")
+        lines.extend(
+            str(statistic)
+            for statistic in end_snapshot.compare_to(start_snapshot, "lineno")[
+                : self._top_allocations
+            ]
+        )
+
+        return "\n".join(lines) + "\n"
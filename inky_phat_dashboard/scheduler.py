@@ -0,0 +1,177 @@
+"""Scheduler for the Inky pHat Dashboard."""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from inky_phat_dashboard.const import RESTART_DELAY_SECONDS
+
+
+class ScheduledJob:
+    """A job that runs on absolute deadlines spaced by its interval."""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[None]],
+        get_interval_seconds: Callable[[], float],
+        on_trigger: Callable[[], Awaitable[None]] | None,
+        run_immediately: bool,
+    ):
+        """Initialize the scheduled job."""
+
+        self.name = name
+        self.func = func
+        self.on_trigger = on_trigger or func
+        self.get_interval_seconds = get_interval_seconds
+        self.run_immediately = run_immediately
+        self.last_deadline = 0.0
+        self.is_triggered = False
+        self.runs = 0
+        self.triggered_runs = 0
+        self.missed_deadlines = 0
+        self.last_drift_seconds = 0.0
+        self.max_drift_seconds = 0.0
+        self.wakeup = asyncio.Event()
+
+    @property
+    def next_deadline(self) -> float:
+        """Get the monotonic time of the next scheduled run."""
+
+        return self.last_deadline + self.get_interval_seconds()
+
+
+class Scheduler:
+    """
+    Runs jobs on absolute monotonic deadlines.
+
+    A deadline is derived from the previous deadline instead of from the end of
+    the previous run, so slow runs do not push the following ones back. Jobs can
+    be triggered to run right away, which leaves their deadlines as they are.
+    Triggers that arrive while a job is waiting or running are coalesced into a
+    single run. A job whose deadline cannot be computed is retried after a delay
+    without stopping the other jobs.
+    """
+
+    def __init__(self, retry_delay_seconds: float = RESTART_DELAY_SECONDS):
+        """Initialize the scheduler."""
+
+        self.jobs: dict[str, ScheduledJob] = {}
+        self._retry_delay_seconds = retry_delay_seconds
+
+    def add_job(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[None]],
+        get_interval_seconds: Callable[[], float],
+        on_trigger: Callable[[], Awaitable[None]] | None = None,
+        run_immediately: bool = True,
+    ):
+        """Add a job, run by trigger with on_trigger instead of func if given."""
+
+        self.jobs[name] = ScheduledJob(
+            name, func, get_interval_seconds, on_trigger, run_immediately
+        )
+
+    def trigger(self, name: str):
+        """Run a job as soon as possible, coalescing with pending triggers."""
+
+        job = self.jobs[name]
+        job.is_triggered = True
+        job.wakeup.set()
+
+    def reschedule(self):
+        """Let all jobs recompute their deadlines after an interval changed."""
+
+        for job in self.jobs.values():
+            job.wakeup.set()
+
+    async def run(self):
+        """Run all jobs until cancelled."""
+
+        await asyncio.gather(*(self._run_job(job) for job in self.jobs.values()))
+
+    async def _run_job(self, job: ScheduledJob):
+        """Run a job on its deadlines and triggers, retrying failed scheduling."""
+
+        is_started = False
+
+        while True:
+            try:
+                if not is_started:
+                    self._start_job(job)
+                    is_started = True
+
+                await self._run_next(job)
+            except Exception as ex:
+                logging.exception(f"Job {job.name} could not be scheduled: {ex}")
+                await asyncio.sleep(self._retry_delay_seconds)
+
+    def _start_job(self, job: ScheduledJob):
+        """Set the first deadline of a job."""
+
+        now = time.monotonic()
+        job.last_deadline = (
+            now - job.get_interval_seconds() if job.run_immediately else now
+        )
+
+    async def _run_next(self, job: ScheduledJob):
+        """Wait for the next deadline or trigger of a job and run it."""
+
+        remaining_seconds = job.next_deadline - time.monotonic()
+
+        if remaining_seconds > 0 and not job.is_triggered:
+            try:
+                async with asyncio.timeout(remaining_seconds):
+                    await job.wakeup.wait()
+            except TimeoutError:
+                pass
+
+        job.wakeup.clear()
+        now = time.monotonic()
+        deadline = job.next_deadline
+
+        if now >= deadline:
+            # A due run also serves any pending trigger
+            job.is_triggered = False
+            self._record_drift(job, now, deadline)
+            await self._run(job, job.func)
+        elif job.is_triggered:
+            job.is_triggered = False
+            job.triggered_runs += 1
+            await self._run(job, job.on_trigger)
+
+    def _record_drift(self, job: ScheduledJob, now: float, deadline: float):
+        """Record how late a run starts and advance the job's deadline."""
+
+        interval_seconds = job.get_interval_seconds()
+        job.last_drift_seconds = now - deadline
+        job.max_drift_seconds = max(job.max_drift_seconds, job.last_drift_seconds)
+
+        if interval_seconds > 0 and job.last_drift_seconds >= interval_seconds:
+            # Skip the deadlines that already passed instead of running them late
+            missed_deadlines = int(job.last_drift_seconds // interval_seconds)
+            job.missed_deadlines += missed_deadlines
+            logging.warning(
+                f"Job {job.name} missed {missed_deadlines} deadlines, "
+                f"running {job.last_drift_seconds:.3f}s late"
+            )
+            deadline += missed_deadlines * interval_seconds
+
+        job.last_deadline = deadline
+
+        logging.debug(
+            f"Job {job.name} started {job.last_drift_seconds * 1000:.1f}ms late "
+            f"(max {job.max_drift_seconds * 1000:.1f}ms)"
+        )
+
+    async def _run(self, job: ScheduledJob, func: Callable[[], Awaitable[None]]):
+        """Run a job function, logging exceptions so the job keeps running."""
+
+        job.runs += 1
+
+        try:
+            await func()
+        except Exception as ex:
+            logging.exception(ex)
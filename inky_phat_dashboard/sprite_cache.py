@@ -0,0 +1,94 @@
+"""Sprite cache for the Inky pHat Dashboard."""
+
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+
+from PIL import Image
+
+from inky_phat_dashboard.const import DEFAULT_SPRITE_CACHE_SIZE
+from inky_phat_dashboard.image_tools import ImageTools
+
+
+class SpriteCache:
+    """Bounded LRU cache of decoded and recolored sprites, thread safe."""
+
+    def __init__(self, max_size: int = DEFAULT_SPRITE_CACHE_SIZE):
+        """Initialize the sprite cache."""
+
+        self._max_size = max_size
+        self._sprites: OrderedDict[
+            tuple[str, tuple[int, int, int, int] | None], tuple[int, Image.Image]
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Get the number of cached sprites."""
+
+        return len(self._sprites)
+
+    def get(self, path: str, color: tuple[int, int, int, int]) -> Image.Image:
+        """
+        Get the sprite for an asset recolored to the given color.
+
+        The returned RGBA image is shared between callers and must not be modified.
+        It is decoded and recolored again when the file's mtime has changed.
+        """
+
+        return self._get(
+            (path, color),
+            path,
+            lambda image: ImageTools.recolor_non_transparent_pixels(
+                image.convert("RGBA"), color
+            ),
+        )
+
+    def get_mask(self, path: str) -> Image.Image:
+        """
+        Get the mask of the opaque pixels of an asset.
+
+        The returned "L" image is shared between callers and must not be modified.
+        It is decoded again when the file's mtime has changed.
+        """
+
+        return self._get(
+            (path, None),
+            path,
+            lambda image: ImageTools.mask_from_alpha(image.convert("RGBA")),
+        )
+
+    def _get(
+        self,
+        key: tuple[str, tuple[int, int, int, int] | None],
+        path: str,
+        create: Callable[[Image.Image], Image.Image],
+    ) -> Image.Image:
+        """Get a cached sprite or create it from the decoded asset."""
+
+        mtime = os.stat(path).st_mtime_ns
+
+        with self._lock:
+            entry = self._sprites.get(key)
+
+            if entry is not None and entry[0] == mtime:
+                self._sprites.move_to_end(key)
+                return entry[1]
+
+        with Image.open(path) as image:
+            sprite = create(image)
+
+        with self._lock:
+            self._sprites[key] = (mtime, sprite)
+            self._sprites.move_to_end(key)
+
+            while len(self._sprites) > self._max_size:
+                self._sprites.popitem(last=False)
+
+        return sprite
+
+    def clear(self):
+        """Remove all cached sprites."""
+
+        with self._lock:
+            self._sprites.clear()
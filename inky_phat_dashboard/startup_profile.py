@@ -0,0 +1,40 @@
+"""Startup profile for the Inky pHat Dashboard."""
+
+import time
+
+
+class StartupProfile:
+    """Measures the duration of the startup phases up to the first frame."""
+
+    def __init__(self):
+        """Initialize the startup profile, starting the first phase."""
+
+        self._start = time.perf_counter()
+        self._last = self._start
+        self.phases: list[tuple[str, float]] = []
+
+    def mark(self, phase: str):
+        """End a phase that started when the previous one ended."""
+
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    @property
+    def total_seconds(self) -> float:
+        """Get the duration of all ended phases."""
+
+        return self._last - self._start
+
+    def report(self) -> str:
+        """Get a breakdown of the phases and their share of the total."""
+
+        lines = [f"{'phase':<16}{'ms':>10}{'share':>8}"]
+
+        for phase, seconds in self.phases:
+            share = seconds / self.total_seconds if self.total_seconds else 0
+            lines.append(f"{phase:<16}{seconds * 1000:>10.1f}{share:>8.1%}")
+
+        lines.append(f"{'total':<16}{self.total_seconds * 1000:>10.1f}")
+
+        return "\n".join(lines)
@@ -0,0 +1,131 @@
+"""State snapshot for the Inky pHat Dashboard."""
+
+import json
+import logging
+import os
+from collections.abc import Callable
+from pathlib import Path
+from typing import BinaryIO
+
+from PIL import Image
+
+from inky_phat_dashboard.const import (
+    LAST_FRAME_FILE_NAME,
+    STATE_SNAPSHOT_FILE_NAME,
+    STATE_SNAPSHOT_VERSION,
+)
+from inky_phat_dashboard.image_tools import ImageTools
+
+
+class StateSnapshot:
+    """
+    Last known module states and last shown frame, persisted to a directory.
+
+    Files are written and synced to a temporary file first and then renamed, so
+    a power loss leaves either the previous or the new snapshot. Unchanged content is
+    not written again to spare the SD card.
+    """
+
+    def __init__(self, directory: Path):
+        """Initialize the state snapshot."""
+
+        self._state_path = directory / STATE_SNAPSHOT_FILE_NAME
+        self._frame_path = directory / LAST_FRAME_FILE_NAME
+        self._saved_content: str | None = None
+        self._saved_frame_fingerprint: str | None = None
+        self.module_states: dict[str, dict] = {}
+        self.view_id: str | None = None
+        self.saves = 0
+
+    def load(self):
+        """Load the module states and the view id if the snapshot exists."""
+
+        try:
+            content = self._state_path.read_text()
+            snapshot = json.loads(content)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as ex:
+            logging.warning(f"State snapshot could not be loaded: {ex}")
+            return
+
+        if snapshot.get("version") != STATE_SNAPSHOT_VERSION:
+            return
+
+        self.module_states = snapshot.get("modules", {})
+        self.view_id = snapshot.get("view_id")
+        self._saved_content = content
+
+    def load_frame(self) -> Image.Image | None:
+        """Load the last shown frame if it exists."""
+
+        try:
+            with Image.open(self._frame_path) as image:
+                image.load()
+        except FileNotFoundError:
+            return None
+        except OSError as ex:
+            logging.warning(f"Last frame could not be loaded: {ex}")
+            return None
+
+        # Frames are opaque, the transparency chunk is an artifact of the PNG file
+        image.info.pop("transparency", None)
+        self._saved_frame_fingerprint = ImageTools.fingerprint(image)
+
+        return image
+
+    def save(
+        self,
+        module_states: dict[str, dict],
+        view_id: str | None,
+        frame: Image.Image | None,
+        frame_fingerprint: str | None,
+    ):
+        """Write the states and the frame, each only if it changed."""
+
+        self.module_states = module_states
+        self.view_id = view_id
+        content = json.dumps(
+            {
+                "version": STATE_SNAPSHOT_VERSION,
+                "modules": module_states,
+                "view_id": view_id,
+            },
+            sort_keys=True,
+        )
+
+        try:
+            if frame is not None and frame_fingerprint != self._saved_frame_fingerprint:
+                self._replace(self._frame_path, lambda file: frame.save(file, "PNG"))
+                self._saved_frame_fingerprint = frame_fingerprint
+                self.saves += 1
+
+            if content != self._saved_content:
+                self._replace(
+                    self._state_path, lambda file: file.write(content.encode())
+                )
+                self._saved_content = content
+                self.saves += 1
+        except OSError as ex:
+            logging.warning(f"State snapshot could not be saved: {ex}")
+
+    @staticmethod
+    def _replace(path: Path, write: Callable[[BinaryIO], object]):
+        """Write a file through a temporary file that replaces it atomically."""
+
+        temporary_path = path.with_name(f".{path.name}.tmp")
+
+        with temporary_path.open("wb") as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temporary_path, path)
+
+        # The rename itself is only durable once the directory is synced
+        directory_descriptor = os.open(path.parent, os.O_RDONLY)
+
+        try:
+            os.fsync(directory_descriptor)
+        finally:
+            os.close(directory_descriptor)
@@ -0,0 +1,145 @@
+"""Text layout cache for the Inky pHat Dashboard."""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+from inky_phat_dashboard.const import TEXT_LAYOUT_CACHE_VERSION, VerticalAlign
+from inky_phat_dashboard.models import TextLayout
+
+
+class TextLayoutCache:
+    """
+    Cache of fitted text layouts, optionally persisted to a file.
+
+    The layouts of a font are dropped when the hash of the font file changes.
+    """
+
+    def __init__(self, path: Path | None = None):
+        """Initialize the text layout cache and load the file if it exists."""
+
+        self._path = path
+        self._fonts: dict[str, dict] = {}
+        self._font_hashes: dict[str, tuple[int, str]] = {}
+        self._is_dirty = False
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+        if path is not None:
+            self._load(path)
+
+    def get(
+        self,
+        font_path: str,
+        rectangle: tuple[int, int, int, int],
+        text: str,
+        vertical_align: VerticalAlign,
+    ) -> TextLayout | None:
+        """Get the cached layout of a text."""
+
+        with self._lock:
+            layouts = self._layouts(font_path)
+            entry = layouts.get(self._key(rectangle, text, vertical_align))
+
+        if entry is None:
+            return None
+
+        font_size, text_bbox, position = entry
+        return TextLayout(
+            font_size=font_size, text_bbox=tuple(text_bbox), position=tuple(position)
+        )
+
+    def put(
+        self,
+        font_path: str,
+        rectangle: tuple[int, int, int, int],
+        text: str,
+        vertical_align: VerticalAlign,
+        text_layout: TextLayout,
+    ):
+        """Add the layout of a text."""
+
+        with self._lock:
+            self._layouts(font_path)[self._key(rectangle, text, vertical_align)] = [
+                text_layout.font_size,
+                list(text_layout.text_bbox),
+                list(text_layout.position),
+            ]
+            self._is_dirty = True
+
+    def save(self):
+        """Write the layouts to the file if they changed since the last save."""
+
+        if self._path is None or not self._is_dirty:
+            return
+
+        # Render threads save concurrently, so writes of the file are serialized
+        with self._save_lock:
+            with self._lock:
+                content = json.dumps(
+                    {"version": TEXT_LAYOUT_CACHE_VERSION, "fonts": self._fonts}
+                )
+                self._is_dirty = False
+
+            temporary_path = self._path.with_name(f".{self._path.name}.tmp")
+
+            try:
+                temporary_path.write_text(content)
+                os.replace(temporary_path, self._path)
+            except OSError as ex:
+                logging.warning(f"Text layout cache could not be saved: {ex}")
+
+    def _load(self, path: Path):
+        """Load the layouts from the file."""
+
+        try:
+            content = json.loads(path.read_text())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as ex:
+            logging.warning(f"Text layout cache could not be loaded: {ex}")
+            return
+
+        if content.get("version") != TEXT_LAYOUT_CACHE_VERSION:
+            return
+
+        self._fonts = content.get("fonts", {})
+
+    def _layouts(self, font_path: str) -> dict[str, list]:
+        """Get the layouts of a font, dropping them if the font file changed."""
+
+        font_hash = self._font_hash(font_path)
+        font = self._fonts.get(font_path)
+
+        if font is None or font["hash"] != font_hash:
+            font = {"hash": font_hash, "layouts": {}}
+            self._fonts[font_path] = font
+
+        return font["layouts"]
+
+    def _font_hash(self, font_path: str) -> str:
+        """Get the hash of a font file, hashing it again only if its mtime changed."""
+
+        mtime = os.stat(font_path).st_mtime_ns
+        cached = self._font_hashes.get(font_path)
+
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        with open(font_path, "rb") as font_file:
+            font_hash = hashlib.file_digest(font_file, "sha256").hexdigest()
+
+        self._font_hashes[font_path] = (mtime, font_hash)
+
+        return font_hash
+
+    @staticmethod
+    def _key(
+        rectangle: tuple[int, int, int, int], text: str, vertical_align: VerticalAlign
+    ) -> str:
+        """Get the key of a layout within a font."""
+
+        return json.dumps([list(rectangle), vertical_align.value, text])
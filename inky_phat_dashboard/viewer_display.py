@@ -0,0 +1,14 @@
+"""Viewer display for the Inky pHat Dashboard."""
+
+from PIL import Image
+
+from inky_phat_dashboard.base_display import BaseDisplay
+
+
+class ViewerDisplay(BaseDisplay):
+    """Opens images in the system's image viewer."""
+
+    def show(self, image: Image.Image) -> None:
+        """Show an image on the display."""
+
+        image.show()
@@ -1,10 +1,19 @@
 """Waste module for the Inky pHat Dashboard."""
 
+import asyncio
+import datetime
 import logging
+from typing import TYPE_CHECKING
 
-import aiohttp
+import tzlocal
 
 from inky_phat_dashboard.base_module import BaseModule
+from inky_phat_dashboard.const import (
+    DEFAULT_DWELL_WEIGHT,
+    POLL_BACKOFF_MAX_DOUBLINGS,
+    WASTE_CHANGE_WINDOW_SECONDS,
+)
+from inky_phat_dashboard.metrics import metrics
 from inky_phat_dashboard.models import (
     Config,
     DashboardElementData,
@@ -16,6 +25,11 @@ from inky_phat_dashboard.models import (
 )
 from inky_phat_dashboard.parser import RemainingDaysParser
 
+if TYPE_CHECKING:
+    import aiohttp
+
+    from inky_phat_dashboard.home_assistant_websocket import HomeAssistantWebSocket
+
 
 class WasteModule(BaseModule):
     """Waste module for the Inky pHat Dashboard."""
@@ -23,6 +37,8 @@ class WasteModule(BaseModule):
     def __init__(self, config: Config):
         """Initialize the waste module."""
 
+        super().__init__()
+
         self._config = config
         self._parser = RemainingDaysParser()
         self._is_running: bool = False
@@ -30,33 +46,260 @@ class WasteModule(BaseModule):
             sensor_config: None
             for sensor_config in self._config.home_assistant_config.sensor_configs
         }
+        self._websocket: "HomeAssistantWebSocket | None" = None
+        self._websocket_task: asyncio.Task | None = None
+        self._parsed_states: dict[
+            SensorConfig, tuple[tuple[str | None, str | None], StateInformation]
+        ] = {}
+        self._view_datas: list[ViewData] | None = None
+        self._view_datas_date: datetime.date | None = None
+        self._stable_updates = 0
+
+    @property
+    def update_interval_seconds(self) -> float:
+        """Get the interval between updates of the waste module."""
+
+        return self._get_update_interval_seconds(
+            datetime.datetime.now(tzlocal.get_localzone())
+        )
+
+    def _get_update_interval_seconds(self, now: datetime.datetime) -> float:
+        """
+        Get the interval between updates at a point in time.
+
+        The interval doubles with every update that changed nothing, up to the
+        configured maximum. The states change around local midnight, so updates
+        never skip past midnight and run at the base interval shortly after it.
+        """
+
+        base_interval_seconds = self._config.data_timeout_seconds
+        interval_seconds = min(
+            base_interval_seconds * 2**self._stable_updates,
+            self._config.home_assistant_config.max_poll_interval_seconds,
+        )
+
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        seconds_since_midnight = (now - midnight).total_seconds()
+        seconds_until_midnight = (
+            midnight + datetime.timedelta(days=1) - now
+        ).total_seconds()
+
+        if seconds_since_midnight < WASTE_CHANGE_WINDOW_SECONDS:
+            return base_interval_seconds
+
+        return max(base_interval_seconds, min(interval_seconds, seconds_until_midnight))
+
+    @property
+    def update_timeout_seconds(self) -> float:
+        """Get the time after which an update of the waste module is cancelled."""
+
+        return self._config.home_assistant_config.update_timeout_seconds
+
+    def on_config_changed(self, changed_fields: set[str]):
+        """Keep the states of unchanged sensors and reconnect on new settings."""
+
+        self._view_datas = None
+
+        if "home_assistant_config" not in changed_fields:
+            return
+
+        self._latest_states = {
+            sensor_config: self._latest_states.get(sensor_config)
+            for sensor_config in self._config.home_assistant_config.sensor_configs
+        }
+        self._parsed_states = {
+            sensor_config: parsed_state
+            for sensor_config, parsed_state in self._parsed_states.items()
+            if sensor_config in self._latest_states
+        }
+
+        if self._websocket_task is not None:
+            self._websocket_task.cancel()
+
+        self._websocket = None
+        self._websocket_task = None
+
+    def dump_state(self) -> dict:
+        """Get the states with absolute due dates, keyed by the entity ids."""
+
+        return {
+            sensor_config.entity_id: {
+                "is_available": state_information.is_available,
+                "due_date": state_information.due_date.isoformat()
+                if state_information.due_date is not None
+                else None,
+            }
+            for sensor_config, state_information in self._latest_states.items()
+            if state_information is not None
+        }
+
+    def restore_state(self, state: dict):
+        """Restore the states of the configured sensors from the snapshot."""
+
+        for sensor_config in self._latest_states:
+            entry = state.get(sensor_config.entity_id)
+
+            if entry is None:
+                continue
+
+            self._latest_states[sensor_config] = StateInformation(
+                is_available=entry["is_available"],
+                due_date=datetime.datetime.fromisoformat(entry["due_date"])
+                if entry["due_date"] is not None
+                else None,
+            )
+
+        self._view_datas = None
 
     async def update(self):
-        """Update the waste module."""
+        """Update the waste module and notify the listeners if a state changed."""
+
+        previous_states = dict(self._latest_states)
+
+        await self._update_states()
+
+        if self._latest_states == previous_states:
+            self._stable_updates = min(
+                self._stable_updates + 1, POLL_BACKOFF_MAX_DOUBLINGS
+            )
+            return
+
+        self._stable_updates = 0
+        self._view_datas = None
+        self._notify_data_changed()
+
+    async def _update_states(self):
+        """Update the states of the sensors."""
+
+        if self._config.home_assistant_config.use_websocket:
+            await self._update_from_websocket()
+            return
+
+        # The HTTP stack is imported on the first fetch instead of at startup
+        import aiohttp
+
+        sensor_configs = list(self._latest_states.keys())
+        semaphore = asyncio.Semaphore(
+            self._config.home_assistant_config.max_parallel_requests
+        )
 
         async with aiohttp.ClientSession() as session:
-            sensor_configs = list(self._latest_states.keys())
+            if self._config.home_assistant_config.bulk_fetch:
+                states = await self._get_sensor_states_bulk(session)
+
+                if states is not None:
+                    for sensor_config in sensor_configs:
+                        self._latest_states[sensor_config] = (
+                            self._state_information_from_bulk(states, sensor_config)
+                        )
+                    return
+
+            state_informations = await asyncio.gather(
+                *(
+                    self._get_sensor_state_information(
+                        session, semaphore, sensor_config
+                    )
+                    for sensor_config in sensor_configs
+                )
+            )
+
+        for sensor_config, state_information in zip(sensor_configs, state_informations):
+            self._latest_states[sensor_config] = state_information
+
+    async def _update_from_websocket(self):
+        """Keep the WebSocket subscription running and wait for its first states."""
+
+        if self._websocket is None:
+            from inky_phat_dashboard.home_assistant_websocket import (
+                HomeAssistantWebSocket,
+            )
+
+            self._websocket = HomeAssistantWebSocket(
+                self._config.home_assistant_config.url,
+                self._config.home_assistant_config.token,
+                [sensor_config.entity_id for sensor_config in self._latest_states],
+                self._handle_state,
+            )
+
+        if self._websocket_task is None or self._websocket_task.done():
+            if (
+                self._websocket_task is not None
+                and not self._websocket_task.cancelled()
+            ):
+                logging.error(
+                    f"Home Assistant WebSocket subscription stopped: "
+                    f"{self._websocket_task.exception()}"
+                )
+
+            self._websocket_task = asyncio.create_task(self._websocket.run())
 
-            for sensor_config in sensor_configs:
-                state = await self._get_sensor_state(session, sensor_config)
-                self._latest_states[sensor_config] = self._parser.parse_state(state)
+        if self._websocket.is_synced:
+            return
+
+        try:
+            async with asyncio.timeout(
+                self._config.home_assistant_config.request_timeout_seconds
+            ):
+                await self._websocket.wait_synced()
+        except TimeoutError:
+            logging.warning("Timed out waiting for states from Home Assistant")
+
+    def _handle_state(self, entity_id: str, state: str | None):
+        """Handle a state received for an entity."""
+
+        logging.debug(f"State of {entity_id} changed to {state}")
+
+        with metrics.time("parse_state"):
+            state_information = (
+                self._parser.parse_state(state)
+                if state is not None
+                else StateInformation(is_available=False)
+            )
+
+        for sensor_config in self._latest_states:
+            if (
+                sensor_config.entity_id == entity_id
+                and self._latest_states[sensor_config] != state_information
+            ):
+                self._latest_states[sensor_config] = state_information
+                self._view_datas = None
+                self._notify_data_changed()
 
     async def get_view_datas(self):
-        """Get the view datas for the waste module."""
+        """Get the view datas for the waste module, built again only on changes."""
+
+        # The remaining days are relative to today, so a new day builds them again
+        today = datetime.date.today()
+
+        if self._view_datas is None or self._view_datas_date != today:
+            self._view_datas = self._create_view_datas()
+            self._view_datas_date = today
+
+        return list(self._view_datas)
+
+    def _create_view_datas(self) -> list[ViewData]:
+        """Create the view datas for the waste module."""
 
         view_datas: list[ViewData] = []
+        elements: list[DashboardElementData] = []
+        available_sensors: list[tuple[SensorConfig, datetime.datetime, int]] = []
+        unavailable_sensors: list[SensorConfig] = []
 
-        available_sensors = [
-            (sensor_config, state_information)
-            for sensor_config, state_information in self._latest_states.items()
-            if state_information is not None and state_information.is_available
-        ]
+        for sensor_config, state_information in self._latest_states.items():
+            if state_information is None:
+                continue
 
-        unavailable_sensors = [
-            (sensor_config, state_information)
-            for sensor_config, state_information in self._latest_states.items()
-            if state_information is not None and not state_information.is_available
-        ]
+            remaining_days = state_information.remaining_days
+            elements.append(
+                self._create_dashboard_element(sensor_config, remaining_days)
+            )
+
+            if state_information.due_date is None or remaining_days is None:
+                unavailable_sensors.append(sensor_config)
+            else:
+                available_sensors.append(
+                    (sensor_config, state_information.due_date, remaining_days)
+                )
 
         if not available_sensors:
             logging.warning("No sensors available")
@@ -64,62 +307,65 @@ class WasteModule(BaseModule):
         if not available_sensors and not unavailable_sensors:
             return view_datas
 
-        for sensor_config, state_information in unavailable_sensors:
+        for sensor_config in unavailable_sensors:
             logging.warning(f"Sensor {sensor_config.name} is unavailable")
 
-        for sensor_config, state_information in available_sensors:
-            logging.info(
-                f"{sensor_config.friendly_name} is due on {state_information.due_date.date()}"
-            )
+        for sensor_config, due_date, _ in available_sensors:
+            logging.info(f"{sensor_config.friendly_name} is due on {due_date.date()}")
 
         dashboard_view_data = DashboardViewData(
-            elements=[
-                DashboardElementData(
-                    icon_path=sensor_config.icon_path_small,
-                    text=self._text_from_remaining_days_short(
-                        state_information.remaining_days
-                    )
-                    if state_information.is_available
-                    else "Nicht verfügbar",
-                    is_icon_alert=not state_information.is_available
-                    or state_information.remaining_days
-                    <= self._config.waste_alert_days,
-                    is_text_alert=not state_information.is_available
-                    or state_information.remaining_days
-                    <= self._config.waste_alert_days,
-                )
-                for sensor_config, state_information in self._latest_states.items()
-            ],
-            is_border_alert=any(
-                not state_information.is_available
-                for state_information in self._latest_states.values()
-            )
-            or any(
-                state_information.remaining_days <= self._config.waste_alert_days
-                for state_information in self._latest_states.values()
-            ),
+            elements=elements,
+            is_border_alert=any(element.is_icon_alert for element in elements),
+            view_id="dashboard",
         )
 
+        if dashboard_view_data.is_border_alert:
+            dashboard_view_data.dwell_weight = self._config.waste_alert_dwell_weight
+
         view_datas.append(dashboard_view_data)
 
-        for sensor_config, state_information in available_sensors:
-            if state_information.remaining_days > self._config.waste_detailed_days:
+        for sensor_config, _, remaining_days in available_sensors:
+            if remaining_days > self._config.waste_detailed_days:
                 continue
 
+            is_alert = remaining_days <= self._config.waste_alert_days
             detailed_view_data = DetailedViewTwoLinesData(
                 icon_path=sensor_config.icon_path_large,
                 upper_text=sensor_config.friendly_name,
-                lower_text=self._text_from_remaining_days(
-                    state_information.remaining_days
-                ),
-                is_icon_alert=state_information.remaining_days
-                <= self._config.waste_alert_days,
+                lower_text=self._text_from_remaining_days(remaining_days),
+                is_icon_alert=is_alert,
+                view_id=f"detailed_{sensor_config.name}",
+                dwell_weight=self._config.waste_alert_dwell_weight
+                if is_alert
+                else DEFAULT_DWELL_WEIGHT,
             )
 
             view_datas.append(detailed_view_data)
 
         return view_datas
 
+    def _create_dashboard_element(
+        self, sensor_config: SensorConfig, remaining_days: int | None
+    ) -> DashboardElementData:
+        """Create the dashboard element of a sensor, unavailable without a due date."""
+
+        if remaining_days is None:
+            return DashboardElementData(
+                icon_path=sensor_config.icon_path_small,
+                text="Nicht verfügbar",
+                is_icon_alert=True,
+                is_text_alert=True,
+            )
+
+        is_alert = remaining_days <= self._config.waste_alert_days
+
+        return DashboardElementData(
+            icon_path=sensor_config.icon_path_small,
+            text=self._text_from_remaining_days_short(remaining_days),
+            is_icon_alert=is_alert,
+            is_text_alert=is_alert,
+        )
+
     def _text_from_remaining_days_short(self, remaining_days: int) -> str:
         """Get the text from the remaining days."""
 
@@ -142,19 +388,148 @@ class WasteModule(BaseModule):
 
         return f"{remaining_days} Tage"
 
+    async def _get_sensor_state_information(
+        self,
+        session: "aiohttp.ClientSession",
+        semaphore: asyncio.Semaphore,
+        sensor_config: SensorConfig,
+    ) -> StateInformation:
+        """Get the state information of a sensor, unavailable if it fails."""
+
+        import aiohttp
+
+        async with semaphore:
+            try:
+                async with asyncio.timeout(
+                    self._config.home_assistant_config.request_timeout_seconds
+                ):
+                    with metrics.time("fetch"):
+                        state_object = await self._get_sensor_state(
+                            session, sensor_config
+                        )
+            except TimeoutError:
+                metrics.increment("fetch_errors")
+                logging.warning(
+                    f"Getting state for sensor {sensor_config.name} timed out"
+                )
+                return StateInformation(is_available=False)
+            except (aiohttp.ClientError, KeyError, ValueError) as ex:
+                metrics.increment("fetch_errors")
+                logging.warning(
+                    f"Getting state for sensor {sensor_config.name} failed: {ex}"
+                )
+                return StateInformation(is_available=False)
+
+        return self._state_information_from_state_object(sensor_config, state_object)
+
+    def _state_information_from_bulk(
+        self, states: dict[str, dict], sensor_config: SensorConfig
+    ) -> StateInformation:
+        """Get the state information of a sensor from the bulk states."""
+
+        state_object = states.get(sensor_config.entity_id)
+
+        if state_object is None:
+            logging.warning(
+                f"Sensor {sensor_config.name} is missing in the bulk states"
+            )
+            return StateInformation(is_available=False)
+
+        return self._state_information_from_state_object(sensor_config, state_object)
+
+    def _state_information_from_state_object(
+        self, sensor_config: SensorConfig, state_object: dict
+    ) -> StateInformation:
+        """Parse a state object unless it did not change since it was last parsed."""
+
+        changed = (state_object.get("last_changed"), state_object.get("last_updated"))
+        parsed_state = self._parsed_states.get(sensor_config)
+
+        if (
+            parsed_state is not None
+            and None not in changed
+            and parsed_state[0] == changed
+        ):
+            logging.debug(f"State of sensor {sensor_config.name} is unchanged")
+            return parsed_state[1]
+
+        with metrics.time("parse_state"):
+            state_information = self._parser.parse_state(state_object["state"])
+
+        self._parsed_states[sensor_config] = (changed, state_information)
+
+        return state_information
+
+    async def _get_sensor_states_bulk(
+        self, session: "aiohttp.ClientSession"
+    ) -> dict[str, dict] | None:
+        """Get the state objects of all sensor entities in one request, None if it fails."""
+
+        import aiohttp
+
+        logging.debug("Getting states for all sensors...")
+
+        entity_ids = {sensor_config.entity_id for sensor_config in self._latest_states}
+
+        try:
+            with metrics.time("fetch_bulk"):
+                return await self._request_sensor_states_bulk(session, entity_ids)
+        except (
+            TimeoutError,
+            aiohttp.ClientError,
+            KeyError,
+            TypeError,
+            ValueError,
+        ) as ex:
+            metrics.increment("fetch_errors")
+            logging.warning(
+                f"Getting states in bulk failed, falling back to single requests: {ex!r}"
+            )
+            return None
+
+    async def _request_sensor_states_bulk(
+        self, session: "aiohttp.ClientSession", entity_ids: set[str]
+    ) -> dict[str, dict]:
+        """Request the state objects of the sensor entities from /api/states."""
+
+        async with (
+            asyncio.timeout(self._config.home_assistant_config.request_timeout_seconds),
+            session.get(
+                f"{self._config.home_assistant_config.url}/api/states",
+                headers=self._headers,
+            ) as response,
+        ):
+            response.raise_for_status()
+
+            logging.debug(f"Response: {response.status} {response.reason}")
+
+            response_json = await response.json()
+
+            return {
+                state["entity_id"]: state
+                for state in response_json
+                if state["entity_id"] in entity_ids and isinstance(state["state"], str)
+            }
+
+    @property
+    def _headers(self) -> dict[str, str]:
+        """Get the headers for requests to Home Assistant."""
+
+        return {
+            "Authorization": f"Bearer {self._config.home_assistant_config.token}",
+            "content-type": "application/json",
+        }
+
     async def _get_sensor_state(
-        self, session: aiohttp.ClientSession, sensor_config: SensorConfig
-    ) -> str:
-        """Get the state of a sensor entity."""
+        self, session: "aiohttp.ClientSession", sensor_config: SensorConfig
+    ) -> dict:
+        """Get the state object of a sensor entity."""
 
         logging.debug(f"Getting state for sensor {sensor_config.name}...")
 
         async with session.get(
             f"{self._config.home_assistant_config.url}/api/states/{sensor_config.entity_id}",
-            headers={
-                "Authorization": f"Bearer {self._config.home_assistant_config.token}",
-                "content-type": "application/json",
-            },
+            headers=self._headers,
         ) as response:
             response.raise_for_status()
 
@@ -168,4 +543,4 @@ class WasteModule(BaseModule):
 
             logging.debug(f"State: {state}")
 
-            return state
+            return response_json
@@ -16,7 +16,11 @@ def config():
             token="",
             sensor_configs=[
                 SensorConfig(
-                    name="sensor1", friendly_name="Sensor 1", entity_id="sensor.sensor1"
+                    name="sensor1",
+                    friendly_name="Sensor 1",
+                    entity_id="sensor.sensor1",
+                    icon_path_small="media/waste/waste_small.png",
+                    icon_path_large="media/waste/waste_large.png",
                 ),
             ],
         ),
@@ -0,0 +1,212 @@
+"""Local stand-in for the Home Assistant API used in tests and benchmarks."""
+
+import asyncio
+import datetime
+
+from aiohttp import WSMsgType, web
+from aiohttp.test_utils import TestServer
+
+from inky_phat_dashboard.const import ColorPalette
+from inky_phat_dashboard.models import Config, HomeAssistantConfig, SensorConfig
+
+
+def create_config(url: str, sensor_count: int, **home_assistant_options) -> Config:
+    """Create a config with the given number of sensors."""
+
+    return Config(
+        color_palette=ColorPalette.RED,
+        home_assistant_config=HomeAssistantConfig(
+            url=url,
+            token="token",
+            sensor_configs=[
+                SensorConfig(
+                    name=f"sensor{i}",
+                    friendly_name=f"Sensor {i}",
+                    entity_id=f"sensor.sensor{i}",
+                    icon_path_small="media/waste/waste_small.png",
+                    icon_path_large="media/waste/waste_large.png",
+                )
+                for i in range(sensor_count)
+            ],
+            **home_assistant_options,
+        ),
+    )
+
+
+def create_states(sensor_count: int) -> dict[str, str]:
+    """Create the states for the given number of sensors."""
+
+    return {f"sensor.sensor{i}": f"In {i} Tagen" for i in range(sensor_count)}
+
+
+class FakeHomeAssistant:
+    """Serves entity states over HTTP with injectable latency and failures."""
+
+    def __init__(
+        self,
+        states: dict[str, str],
+        latency_seconds: float = 0,
+        token: str = "token",
+    ):
+        """Initialize the fake Home Assistant."""
+
+        self.states = states
+        self.latency_seconds = latency_seconds
+        self.entity_latency_seconds: dict[str, float] = {}
+        self.failing_entity_ids: set[str] = set()
+        self.is_bulk_failing = False
+        self.is_bulk_malformed = False
+        self.token = token
+        self.request_count = 0
+        self.websocket_connection_count = 0
+        self._subscribers: dict[web.WebSocketResponse, int] = {}
+        self._last_changed: dict[str, tuple[str, str]] = {}
+
+        app = web.Application()
+        app.router.add_get("/api/states", self._handle_states)
+        app.router.add_get("/api/states/{entity_id}", self._handle_state)
+        app.router.add_get("/api/websocket", self._handle_websocket)
+        self._server = TestServer(app, host="127.0.0.1")
+
+    @property
+    def url(self) -> str:
+        """Get the base url of the server."""
+
+        return str(self._server.make_url("")).rstrip("/")
+
+    async def __aenter__(self) -> "FakeHomeAssistant":
+        """Start the server."""
+
+        await self._server.start_server()
+        return self
+
+    async def __aexit__(self, *args):
+        """Stop the server."""
+
+        await self.disconnect_websockets()
+        await self._server.close()
+
+    async def set_state(self, entity_id: str, state: str):
+        """Change the state of an entity and notify the WebSocket subscribers."""
+
+        self.states[entity_id] = state
+
+        for websocket, subscription_id in list(self._subscribers.items()):
+            await websocket.send_json(
+                {
+                    "id": subscription_id,
+                    "type": "event",
+                    "event": {
+                        "event_type": "state_changed",
+                        "data": {
+                            "entity_id": entity_id,
+                            "new_state": self._state_json(entity_id),
+                        },
+                    },
+                }
+            )
+
+    async def disconnect_websockets(self):
+        """Close all open WebSocket connections."""
+
+        for websocket in list(self._subscribers):
+            await websocket.close()
+
+    def _check_token(self, request: web.Request):
+        """Reject requests without the expected token."""
+
+        if request.headers.get("Authorization") != f"Bearer {self.token}":
+            raise web.HTTPUnauthorized()
+
+    def _state_json(self, entity_id: str) -> dict:
+        """Get the state object of an entity, stamped when its state changed."""
+
+        state = self.states[entity_id]
+        last_state, last_changed = self._last_changed.get(entity_id, (None, None))
+
+        if state != last_state:
+            last_changed = datetime.datetime.now(datetime.timezone.utc).isoformat()
+            self._last_changed[entity_id] = (state, last_changed)
+
+        return {
+            "entity_id": entity_id,
+            "state": state,
+            "last_changed": last_changed,
+            "last_updated": last_changed,
+        }
+
+    async def _handle_states(self, request: web.Request) -> web.Response:
+        """Handle a request for the states of all entities."""
+
+        self.request_count += 1
+        self._check_token(request)
+
+        await asyncio.sleep(self.latency_seconds)
+
+        if self.is_bulk_failing:
+            raise web.HTTPInternalServerError()
+
+        if self.is_bulk_malformed:
+            return web.Response(text="[{", content_type="application/json")
+
+        return web.json_response(
+            [self._state_json(entity_id) for entity_id in self.states]
+        )
+
+    async def _handle_state(self, request: web.Request) -> web.Response:
+        """Handle a request for the state of a single entity."""
+
+        self.request_count += 1
+        self._check_token(request)
+        entity_id = request.match_info["entity_id"]
+
+        await asyncio.sleep(
+            self.entity_latency_seconds.get(entity_id, self.latency_seconds)
+        )
+
+        if entity_id in self.failing_entity_ids:
+            raise web.HTTPInternalServerError()
+
+        if entity_id not in self.states:
+            raise web.HTTPNotFound()
+
+        return web.json_response(self._state_json(entity_id))
+
+    async def _handle_websocket(self, request: web.Request) -> web.WebSocketResponse:
+        """Handle a connection to the WebSocket API."""
+
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        self.websocket_connection_count += 1
+
+        await websocket.send_json({"type": "auth_required"})
+        message = await websocket.receive_json()
+
+        if message.get("access_token") != self.token:
+            await websocket.send_json(
+                {"type": "auth_invalid", "message": "Invalid access token"}
+            )
+            await websocket.close()
+            return websocket
+
+        await websocket.send_json({"type": "auth_ok"})
+
+        async for message in websocket:
+            if message.type != WSMsgType.TEXT:
+                break
+
+            data = message.json()
+
+            match data["type"]:
+                case "subscribe_events":
+                    self._subscribers[websocket] = data["id"]
+                    result = None
+                case "get_states":
+                    result = [self._state_json(entity_id) for entity_id in self.states]
+
+            await websocket.send_json(
+                {"id": data["id"], "type": "result", "success": True, "result": result}
+            )
+
+        self._subscribers.pop(websocket, None)
+        return websocket
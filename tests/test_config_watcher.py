@@ -0,0 +1,65 @@
+"""Tests for the config_watcher module."""
+
+import asyncio
+import os
+from pathlib import Path
+
+import yaml
+
+from inky_phat_dashboard.config_watcher import ConfigWatcher
+from inky_phat_dashboard.const import ColorMode
+from inky_phat_dashboard.models import Config
+
+CONFIG = {
+    "home_assistant": {"url": "http://localhost", "token": "token"},
+    "color_palette": "RED",
+}
+
+
+def write_config(config_file_path: Path, mtime_ns: int, **options):
+    """Write a config file with a fixed modification time."""
+
+    config_file_path.write_text(yaml.safe_dump({**CONFIG, **options}))
+    os.utime(config_file_path, ns=(mtime_ns, mtime_ns))
+
+
+def test_check_loads_modified_config(tmp_path: Path):
+    """Test that a modified config is loaded and an unmodified one is not."""
+
+    config_file_path = tmp_path / "config.yml"
+    write_config(config_file_path, 1)
+    configs: list[Config] = []
+
+    async def on_change(config: Config):
+        configs.append(config)
+
+    config_watcher = ConfigWatcher(config_file_path, on_change, 1)
+
+    asyncio.run(config_watcher.check())
+    assert configs == []
+
+    write_config(config_file_path, 2, color_mode="DARK")
+    asyncio.run(config_watcher.check())
+    asyncio.run(config_watcher.check())
+
+    assert len(configs) == 1
+    assert configs[0].color_mode == ColorMode.DARK
+    assert configs[0].config_file_path == config_file_path
+
+
+def test_check_keeps_config_when_invalid(tmp_path: Path):
+    """Test that an invalid config is not handed over."""
+
+    config_file_path = tmp_path / "config.yml"
+    write_config(config_file_path, 1)
+    configs: list[Config] = []
+
+    async def on_change(config: Config):
+        configs.append(config)
+
+    config_watcher = ConfigWatcher(config_file_path, on_change, 1)
+
+    write_config(config_file_path, 2, color_mode="PURPLE")
+    asyncio.run(config_watcher.check())
+
+    assert configs == []
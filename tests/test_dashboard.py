@@ -0,0 +1,653 @@
+"""Tests for the dashboard module."""
+
+import asyncio
+import dataclasses
+import functools
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fake_home_assistant import FakeHomeAssistant
+from PIL import Image
+
+from inky_phat_dashboard.base_module import BaseModule
+from inky_phat_dashboard.const import (
+    DISPLAY_REFRESH_JOB,
+    STATE_SNAPSHOT_FILE_NAME,
+    ColorMode,
+    DisplayType,
+)
+from inky_phat_dashboard.dashboard import Dashboard
+from inky_phat_dashboard.loop_lag_monitor import LoopLagMonitor
+from inky_phat_dashboard.memory_display import MemoryDisplay
+from inky_phat_dashboard.models import Config, DetailedViewTwoLinesData, ViewData
+
+
+class FakeModule(BaseModule):
+    """Module returning a fixed list of view datas."""
+
+    def __init__(self, view_datas: list[ViewData]):
+        super().__init__()
+
+        self.view_datas = view_datas
+
+    async def update(self):
+        """Update the module."""
+
+    async def get_view_datas(self) -> list[ViewData]:
+        """Get the view datas for the module."""
+
+        return self.view_datas
+
+
+def test_refresh_display_skips_unchanged_frame(config: Config):
+    """Test that a frame already on the display is not pushed again."""
+
+    config.display = DisplayType.MEMORY
+    dashboard = Dashboard(config)
+    module = FakeModule(
+        [DetailedViewTwoLinesData("media/waste/waste_large.png", "Restabfall", "2")]
+    )
+    dashboard._modules = [module]
+
+    asyncio.run(dashboard._refresh_display())
+    asyncio.run(dashboard._refresh_display())
+
+    assert dashboard._display.frame_count == 1
+
+    module.view_datas[0].lower_text = "Morgen"
+    asyncio.run(dashboard._refresh_display())
+
+    assert dashboard._display.frame_count == 2
+
+
+def test_start_renders_home_assistant_states(config: Config):
+    """Test the pipeline from fetching states to showing frames."""
+
+    async def run() -> MemoryDisplay:
+        async with FakeHomeAssistant(
+            {"sensor.sensor1": "In 1 Tagen"}
+        ) as home_assistant:
+            config.home_assistant_config.url = home_assistant.url
+            config.home_assistant_config.token = home_assistant.token
+            config.display = DisplayType.MEMORY
+            config.waste_detailed_days = 1
+            config.view_change_interval_seconds = 1
+
+            dashboard = Dashboard(config)
+            task = asyncio.create_task(dashboard.start())
+            await asyncio.sleep(1.5)
+            task.cancel()
+
+            return dashboard._display
+
+    display = asyncio.run(run())
+
+    assert display.frame_count == 2
+    assert display.frames[0].size == (250, 122)
+    assert display.frames[0].tobytes() != display.frames[1].tobytes()
+
+
+class SlowDisplay(MemoryDisplay):
+    """Memory display blocking like a panel refresh."""
+
+    def show(self, image: Image.Image) -> None:
+        """Show an image on the display."""
+
+        time.sleep(0.3)
+        super().show(image)
+
+
+def test_refresh_display_keeps_event_loop_responsive(config: Config):
+    """Test that rendering and a slow display push do not block the event loop."""
+
+    async def run() -> float:
+        config.display = DisplayType.MEMORY
+        dashboard = Dashboard(config)
+        dashboard._display = SlowDisplay()
+        dashboard._modules = [
+            FakeModule(
+                [
+                    DetailedViewTwoLinesData(
+                        "media/waste/waste_large.png", "Restabfall", "Morgen"
+                    )
+                ]
+            )
+        ]
+
+        loop_lag_monitor = LoopLagMonitor(interval_seconds=0.01)
+        task = asyncio.create_task(loop_lag_monitor.run())
+
+        await dashboard._refresh_display()
+
+        task.cancel()
+        assert dashboard._display.frame_count == 1
+        return loop_lag_monitor.max_lag_seconds
+
+    assert asyncio.run(run()) < 0.1
+
+
+def test_import_does_not_load_unused_dependencies():
+    """Test that the HTTP stack, display driver and config parser load lazily."""
+
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, inky_phat_dashboard.dashboard; "
+            "print(sorted({'aiohttp', 'inky', 'marshmallow', 'yaml'} & set(sys.modules)))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_first_frame_shown(config: Config):
+    """Test that the first frame event is set once a frame is shown."""
+
+    config.display = DisplayType.MEMORY
+    dashboard = Dashboard(config)
+    dashboard._modules = [
+        FakeModule(
+            [DetailedViewTwoLinesData("media/waste/waste_large.png", "Restabfall", "2")]
+        )
+    ]
+
+    assert not dashboard.first_frame_shown.is_set()
+
+    asyncio.run(dashboard._refresh_display())
+
+    assert dashboard.first_frame_shown.is_set()
+
+
+def test_apply_config_invalidates_only_render_caches(config: Config):
+    """Test that a render setting clears the frames but keeps the sprites."""
+
+    config.display = DisplayType.MEMORY
+    dashboard = Dashboard(config)
+    dashboard._modules = [
+        FakeModule(
+            [DetailedViewTwoLinesData("media/waste/waste_large.png", "Restabfall", "2")]
+        )
+    ]
+    asyncio.run(dashboard._refresh_display())
+    sprite_count = len(dashboard._image_generator._sprite_cache)
+
+    asyncio.run(
+        dashboard._apply_config(
+            dataclasses.replace(config, view_change_interval_seconds=30)
+        )
+    )
+
+    assert len(dashboard._frame_cache) == 1
+
+    asyncio.run(
+        dashboard._apply_config(dataclasses.replace(config, color_mode=ColorMode.DARK))
+    )
+
+    assert len(dashboard._frame_cache) == 0
+    assert len(dashboard._image_generator._sprite_cache) == sprite_count
+
+    asyncio.run(dashboard._refresh_display())
+
+    assert dashboard._display.frame_count == 2
+
+
+def test_apply_config_reschedules_display_refresh(config: Config):
+    """Test that a shorter interval from a reload ends the running wait."""
+
+    config.display = DisplayType.MEMORY
+    config.view_change_interval_seconds = 60
+    dashboard = Dashboard(config)
+    dashboard._modules = [
+        FakeModule(
+            [
+                DetailedViewTwoLinesData("media/waste/waste_large.png", "Paper", "2"),
+                DetailedViewTwoLinesData("media/waste/waste_large.png", "Waste", "3"),
+            ]
+        )
+    ]
+
+    async def run():
+        task = asyncio.create_task(dashboard._scheduler.run())
+        await asyncio.sleep(0.2)
+        assert dashboard._display.frame_count == 1
+
+        await dashboard._apply_config(
+            dataclasses.replace(config, view_change_interval_seconds=0.25)
+        )
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+    asyncio.run(run())
+
+    assert dashboard._display.frame_count == 2
+
+
+def test_apply_config_keeps_restart_fields_pending(
+    config: Config, caplog: pytest.LogCaptureFixture
+):
+    """Test that fields only read at startup keep their values until a restart."""
+
+    config.display = DisplayType.MEMORY
+    dashboard = Dashboard(config)
+    reloaded_config = dataclasses.replace(
+        config,
+        render_worker_count=4,
+        enable_state_snapshot=False,
+        view_change_interval_seconds=30,
+    )
+    reloaded_config.metrics_config = dataclasses.replace(
+        config.metrics_config, log_interval_seconds=None
+    )
+
+    asyncio.run(dashboard._apply_config(reloaded_config))
+
+    assert dashboard._config.render_worker_count == 1
+    assert dashboard._config.enable_state_snapshot
+    assert dashboard._config.metrics_config.log_interval_seconds == 300
+    assert dashboard._config.view_change_interval_seconds == 30
+    assert (
+        "Config changes take effect after a restart: "
+        "enable_state_snapshot, metrics_config, render_worker_count" in caplog.text
+    )
+
+
+def test_data_change_refreshes_current_view(config: Config):
+    """Test that new data shows the current view again without rotating."""
+
+    config.display = DisplayType.MEMORY
+    config.view_change_interval_seconds = 60
+    dashboard = Dashboard(config)
+    module = FakeModule(
+        [
+            DetailedViewTwoLinesData("media/waste/waste_large.png", "Paper", "2"),
+            DetailedViewTwoLinesData("media/waste/waste_large.png", "Waste", "3"),
+        ]
+    )
+    dashboard._modules = [module]
+
+    async def run():
+        module.add_data_listener(
+            lambda: dashboard._scheduler.trigger(DISPLAY_REFRESH_JOB)
+        )
+        task = asyncio.create_task(dashboard._scheduler.run())
+        await asyncio.sleep(0.2)
+
+        module.view_datas[0] = DetailedViewTwoLinesData(
+            "media/waste/waste_large.png", "Paper", "Morgen"
+        )
+        module._notify_data_changed()
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+    asyncio.run(run())
+
+    assert dashboard._display.frame_count == 2
+    assert dashboard._current_view_id == "0_FakeModule/0"
+
+
+class CountingModule(FakeModule):
+    """Module counting its updates, optionally failing or hanging."""
+
+    def __init__(
+        self,
+        interval_seconds: float,
+        is_failing: bool = False,
+        is_hanging: bool = False,
+    ):
+        super().__init__([])
+
+        self.interval_seconds = interval_seconds
+        self.is_failing = is_failing
+        self.is_hanging = is_hanging
+        self.updates = 0
+
+    @property
+    def update_interval_seconds(self) -> float:
+        """Get the interval between updates of the module."""
+
+        return self.interval_seconds
+
+    @property
+    def update_timeout_seconds(self) -> float:
+        """Get the time after which an update of the module is cancelled."""
+
+        return 0.1
+
+    async def update(self):
+        """Count the update and fail or hang if configured."""
+
+        self.updates += 1
+
+        if self.is_hanging:
+            await asyncio.sleep(10)
+
+        if self.is_failing:
+            raise RuntimeError("Update failed")
+
+
+def test_module_updates_are_isolated(config: Config):
+    """Test that failing and hanging modules do not hold back the others."""
+
+    config.view_change_interval_seconds = 60
+    dashboard = Dashboard(config)
+    fast_module = CountingModule(0.05)
+    failing_module = CountingModule(0.05, is_failing=True)
+    hanging_module = CountingModule(0.05, is_hanging=True)
+    dashboard._modules = [fast_module, failing_module, hanging_module]
+
+    async def run():
+        start = time.perf_counter()
+        await dashboard._update_modules()
+        assert time.perf_counter() - start < 0.5
+
+        for index, module in enumerate(dashboard._modules):
+            dashboard._scheduler.add_job(
+                f"module_{index}",
+                functools.partial(dashboard._update_module, module),
+                functools.partial(dashboard._get_module_interval_seconds, module),
+                run_immediately=False,
+            )
+        task = asyncio.create_task(dashboard._scheduler.run())
+        await asyncio.sleep(0.5)
+        task.cancel()
+
+    asyncio.run(run())
+
+    assert fast_module.updates >= 8
+    assert failing_module.updates == 1
+    assert hanging_module.updates == 1
+    assert dashboard._module_failures == {failing_module: 1, hanging_module: 1}
+
+
+def test_module_backoff_grows_and_resets(config: Config):
+    """Test that the retry interval doubles on failures and resets on success."""
+
+    dashboard = Dashboard(config)
+    module = CountingModule(60, is_failing=True)
+    retry_intervals = []
+
+    for _ in range(4):
+        asyncio.run(dashboard._update_module(module))
+        retry_intervals.append(dashboard._get_module_interval_seconds(module))
+
+    module.is_failing = False
+    asyncio.run(dashboard._update_module(module))
+
+    assert retry_intervals == [5, 10, 20, 40]
+    assert dashboard._get_module_interval_seconds(module) == 60
+
+
+def test_start_shows_snapshot_before_home_assistant_answers(
+    config: Config, tmp_path: Path
+):
+    """Test that a restart shows the last frame at once and replaces it later."""
+
+    config.config_file_path = tmp_path / "config.yml"
+    config.config_file_path.write_text("")
+    config.display = DisplayType.MEMORY
+    config.view_change_interval_seconds = 60
+    config.state_snapshot_interval_seconds = 0.2
+
+    async def run_dashboard(
+        states: dict[str, str], latency_seconds: float, seconds: float
+    ) -> tuple[Dashboard, float]:
+        async with FakeHomeAssistant(states, latency_seconds) as home_assistant:
+            config.home_assistant_config.url = home_assistant.url
+            config.home_assistant_config.token = home_assistant.token
+            dashboard = Dashboard(config)
+            start = time.monotonic()
+            task = asyncio.create_task(dashboard.start())
+            await asyncio.sleep(seconds)
+            task.cancel()
+
+        return dashboard, start
+
+    first_dashboard, _ = asyncio.run(
+        run_dashboard({"sensor.sensor1": "In 1 Tagen"}, 0, 0.5)
+    )
+    dashboard, start = asyncio.run(
+        run_dashboard({"sensor.sensor1": "In 3 Tagen"}, 0.5, 1)
+    )
+    last_frame = first_dashboard._display.frames[-1]
+
+    assert dashboard._display.frame_count == 2
+    assert dashboard._display.timestamps[0] - start < 0.3
+    assert dashboard._display.frames[0].tobytes() == last_frame.tobytes()
+    assert dashboard._display.frames[1].tobytes() != last_frame.tobytes()
+
+
+def test_start_replaces_snapshot_frame_without_module_states(
+    config: Config, tmp_path: Path
+):
+    """Test that a last frame without module states is replaced after the update."""
+
+    config.config_file_path = tmp_path / "config.yml"
+    config.config_file_path.write_text("")
+    config.display = DisplayType.MEMORY
+    config.view_change_interval_seconds = 60
+    config.state_snapshot_interval_seconds = 0.2
+
+    async def run_dashboard(states: dict[str, str], seconds: float) -> Dashboard:
+        async with FakeHomeAssistant(states) as home_assistant:
+            config.home_assistant_config.url = home_assistant.url
+            config.home_assistant_config.token = home_assistant.token
+            dashboard = Dashboard(config)
+            task = asyncio.create_task(dashboard.start())
+            await asyncio.sleep(seconds)
+            task.cancel()
+
+        return dashboard
+
+    first_dashboard = asyncio.run(run_dashboard({"sensor.sensor1": "In 1 Tagen"}, 0.5))
+    (tmp_path / STATE_SNAPSHOT_FILE_NAME).unlink()
+    dashboard = asyncio.run(run_dashboard({"sensor.sensor1": "In 3 Tagen"}, 0.5))
+    last_frame = first_dashboard._display.frames[-1]
+
+    assert dashboard._display.frame_count == 2
+    assert dashboard._display.frames[0].tobytes() == last_frame.tobytes()
+    assert dashboard._display.frames[1].tobytes() != last_frame.tobytes()
+
+
+def test_show_view_prepares_all_frames_on_data_change(config: Config):
+    """Test that all views render at once and view changes only look them up."""
+
+    config.display = DisplayType.MEMORY
+    dashboard = Dashboard(config)
+    module = FakeModule(
+        [
+            DetailedViewTwoLinesData("media/waste/waste_large.png", "Paper", "2"),
+            DetailedViewTwoLinesData("media/waste/waste_large.png", "Waste", "3"),
+            DetailedViewTwoLinesData("media/waste/waste_large.png", "Bio", "4"),
+        ]
+    )
+    dashboard._modules = [module]
+
+    async def run():
+        await dashboard._refresh_display()
+        assert dashboard._frame_cache.misses == 3
+        assert len(dashboard._prepared_frames) == 3
+
+        await dashboard._refresh_display()
+        await dashboard._refresh_display()
+        assert dashboard._frame_cache.misses == 3
+
+        module.view_datas[0] = DetailedViewTwoLinesData(
+            "media/waste/waste_large.png", "Paper", "Morgen"
+        )
+        del module.view_datas[2]
+        await dashboard._refresh_current_view()
+        assert dashboard._frame_cache.misses == 4
+        assert len(dashboard._prepared_frames) == 2
+
+    asyncio.run(run())
+
+    assert dashboard._display.frame_count == 4
+
+
+def test_config_reload_during_render_keeps_prepared_frames(config: Config):
+    """Test that a reload while views render does not lose prepared frames."""
+
+    config.display = DisplayType.MEMORY
+    dashboard = Dashboard(config)
+    module = FakeModule(
+        [
+            DetailedViewTwoLinesData("media/waste/waste_large.png", "Paper", "2"),
+            DetailedViewTwoLinesData("media/waste/waste_large.png", "Waste", "3"),
+        ]
+    )
+    dashboard._modules = [module]
+    render_view = dashboard._render_view
+
+    def slow_render_view(view_data: ViewData, key: str) -> Image.Image:
+        time.sleep(0.1)
+        return render_view(view_data, key)
+
+    async def run():
+        await dashboard._refresh_display()
+        dashboard._render_view = slow_render_view  # type: ignore[method-assign]
+        module.view_datas[0] = DetailedViewTwoLinesData(
+            "media/waste/waste_large.png", "Paper", "Morgen"
+        )
+
+        refresh = asyncio.create_task(dashboard._refresh_current_view())
+        await asyncio.sleep(0.05)
+        await dashboard._apply_config(
+            dataclasses.replace(config, color_mode=ColorMode.DARK)
+        )
+        await refresh
+
+    asyncio.run(run())
+
+    assert dashboard._display.frame_count == 2
+
+
+def test_render_workers_render_views_in_parallel(config: Config):
+    """Test that each view renders on its own worker with the same result."""
+
+    config.display = DisplayType.MEMORY
+    view_datas: list[ViewData] = [
+        DetailedViewTwoLinesData("media/waste/waste_large.png", name, "2")
+        for name in ("Paper", "Waste", "Bio", "Glass")
+    ]
+    sequential_dashboard = Dashboard(config)
+    parallel_dashboard = Dashboard(dataclasses.replace(config, render_worker_count=4))
+    render_threads = set()
+    render_view = parallel_dashboard._render_view
+
+    def record_render_view(view_data: ViewData, key: str) -> Image.Image:
+        # Holding each render makes the workers overlap
+        time.sleep(0.05)
+        render_threads.add(threading.current_thread().name)
+        return render_view(view_data, key)
+
+    parallel_dashboard._render_view = record_render_view  # type: ignore[method-assign]
+
+    async def run() -> tuple[list[Image.Image], list[Image.Image]]:
+        return (
+            await sequential_dashboard._prepare_frames(view_datas),
+            await parallel_dashboard._prepare_frames(view_datas),
+        )
+
+    sequential_frames, parallel_frames = asyncio.run(run())
+
+    assert len(render_threads) > 1
+    assert [frame.tobytes() for frame in parallel_frames] == [
+        frame.tobytes() for frame in sequential_frames
+    ]
+
+
+def test_rotation_follows_view_ids_and_dwell_weights(config: Config):
+    """Test that the cursor keeps its view across changes and honors weights."""
+
+    config.display = DisplayType.MEMORY
+    dashboard = Dashboard(config)
+    module = FakeModule(
+        [
+            DetailedViewTwoLinesData(
+                "media/waste/waste_large.png",
+                "Paper",
+                "2",
+                view_id="paper",
+                dwell_weight=2,
+            ),
+            DetailedViewTwoLinesData(
+                "media/waste/waste_large.png", "Waste", "3", view_id="waste"
+            ),
+            DetailedViewTwoLinesData(
+                "media/waste/waste_large.png", "Bio", "4", view_id="bio"
+            ),
+        ]
+    )
+    dashboard._modules = [module]
+    shown_view_ids = []
+
+    async def refresh(rotate: bool = True):
+        await dashboard._show_view(rotate)
+        shown_view_ids.append(dashboard._current_view_id.split("/")[1])
+
+    async def run():
+        for _ in range(3):
+            await refresh()
+
+        # The content of the current view changes and a view is added before it
+        module.view_datas[1] = DetailedViewTwoLinesData(
+            "media/waste/waste_large.png", "Waste", "Morgen", view_id="waste"
+        )
+        module.view_datas.insert(
+            0,
+            DetailedViewTwoLinesData(
+                "media/waste/waste_large.png", "Glass", "5", view_id="glass"
+            ),
+        )
+        await refresh(rotate=False)
+
+        # The current view disappears, so the view in its place is next
+        del module.view_datas[2]
+        await refresh()
+        await refresh()
+
+    asyncio.run(run())
+
+    assert shown_view_ids == ["paper", "paper", "waste", "waste", "bio", "glass"]
+
+
+def test_sigusr1_profiles_the_next_refresh_cycles(config: Config, tmp_path: Path):
+    """Test that the signal profiles the configured cycles, including renders."""
+
+    config.display = DisplayType.MEMORY
+    config.logging_config.path = str(tmp_path / "dashboard.log")
+    config.profiling_config.cycles = 2
+    dashboard = Dashboard(config)
+    dashboard._modules = [
+        FakeModule(
+            [
+                DetailedViewTwoLinesData("media/waste/waste_large.png", "Paper", "2"),
+                DetailedViewTwoLinesData("media/waste/waste_large.png", "Waste", "3"),
+            ]
+        )
+    ]
+
+    async def run():
+        dashboard._add_signal_handlers()
+        os.kill(os.getpid(), signal.SIGUSR1)
+        await asyncio.sleep(0.01)
+        asyncio.get_running_loop().remove_signal_handler(signal.SIGUSR1)
+
+        for _ in range(3):
+            await dashboard._refresh_display()
+
+    asyncio.run(run())
+
+    assert not dashboard._profiler.is_active
+    assert len(list(tmp_path.glob("*_refresh_display.pstats"))) == 2
+    assert len(list(tmp_path.glob("*_render.pstats"))) == 2
@@ -0,0 +1,34 @@
+"""Tests for the file_display module."""
+
+from pathlib import Path
+
+from PIL import Image
+
+from inky_phat_dashboard.const import FrameFileFormat
+from inky_phat_dashboard.file_display import FileDisplay
+
+
+def test_show_writes_numbered_png_frames(tmp_path: Path):
+    """Test that every shown image is written to its own PNG file."""
+
+    display = FileDisplay(tmp_path / "frames", FrameFileFormat.PNG)
+    images = [Image.new("P", (4, 2), index) for index in range(2)]
+
+    for image in images:
+        display.show(image)
+
+    paths = sorted((tmp_path / "frames").iterdir())
+
+    assert [path.name for path in paths] == ["frame_000001.png", "frame_000002.png"]
+    assert [Image.open(path).tobytes() for path in paths] == [
+        image.tobytes() for image in images
+    ]
+
+
+def test_show_writes_raw_frames(tmp_path: Path):
+    """Test that raw frames contain the pixel data only."""
+
+    display = FileDisplay(tmp_path, FrameFileFormat.RAW)
+    display.show(Image.new("P", (4, 2), 2))
+
+    assert (tmp_path / "frame_000001.raw").read_bytes() == bytes([2] * 8)
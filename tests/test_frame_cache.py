@@ -0,0 +1,71 @@
+"""Tests for the frame_cache module."""
+
+from PIL import Image
+
+from inky_phat_dashboard.const import ColorMode
+from inky_phat_dashboard.frame_cache import FrameCache
+from inky_phat_dashboard.models import (
+    Config,
+    DashboardElementData,
+    DashboardViewData,
+    DetailedViewTwoLinesData,
+)
+
+
+def test_key_is_stable_for_equal_content(config: Config):
+    """Test that equal view datas get the same key."""
+
+    first = DetailedViewTwoLinesData(
+        "media/waste/waste_large.png", "Restabfall", "Morgen"
+    )
+    second = DetailedViewTwoLinesData(
+        "media/waste/waste_large.png", "Restabfall", "Morgen"
+    )
+
+    assert FrameCache.key(first, config) == FrameCache.key(second, config)
+
+
+def test_key_changes_with_content_and_config(config: Config):
+    """Test that the key depends on the view data and the render config."""
+
+    view_data = DashboardViewData(
+        elements=[DashboardElementData("media/waste/waste_small.png", "2")]
+    )
+    key = FrameCache.key(view_data, config)
+
+    view_data.elements[0].text = "Morgen"
+    changed_view_data_key = FrameCache.key(view_data, config)
+
+    config.color_mode = ColorMode.DARK
+    changed_config_key = FrameCache.key(view_data, config)
+
+    assert len({key, changed_view_data_key, changed_config_key}) == 3
+
+
+def test_get_counts_hits_and_misses():
+    """Test that lookups are counted."""
+
+    frame_cache = FrameCache(max_size=2)
+    frame = Image.new("P", (1, 1))
+
+    assert frame_cache.get("a") is None
+    frame_cache.put("a", frame)
+
+    assert frame_cache.get("a") is frame
+    assert (frame_cache.hits, frame_cache.misses) == (1, 1)
+
+
+def test_put_evicts_least_recently_used():
+    """Test that the least recently used frame is evicted."""
+
+    frame_cache = FrameCache(max_size=2)
+
+    for key in ("a", "b"):
+        frame_cache.put(key, Image.new("P", (1, 1)))
+
+    frame_cache.get("a")
+    frame_cache.put("c", Image.new("P", (1, 1)))
+
+    assert len(frame_cache) == 2
+    assert frame_cache.get("b") is None
+    assert frame_cache.get("a") is not None
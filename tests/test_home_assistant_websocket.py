@@ -0,0 +1,116 @@
+"""Tests for the home_assistant_websocket module."""
+
+import asyncio
+from collections.abc import Callable
+
+from fake_home_assistant import FakeHomeAssistant
+
+from inky_phat_dashboard.home_assistant_websocket import HomeAssistantWebSocket
+
+
+async def wait_until(condition: Callable[[], bool], timeout_seconds: float = 2):
+    """Wait until a condition is met."""
+
+    async with asyncio.timeout(timeout_seconds):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+def test_websocket_url():
+    """Test that the WebSocket url is derived from the Home Assistant url."""
+
+    def websocket_url(url: str) -> str:
+        return HomeAssistantWebSocket(url, "", [], lambda *_: None).websocket_url
+
+    assert websocket_url("http://ha:8123/") == "ws://ha:8123/api/websocket"
+    assert (
+        websocket_url("https://ha.example.com") == "wss://ha.example.com/api/websocket"
+    )
+
+
+def test_run_receives_snapshot_and_changes():
+    """Test that the snapshot and later state changes of the entities arrive."""
+
+    async def run() -> list[tuple[str, str | None]]:
+        states: list[tuple[str, str | None]] = []
+
+        async with FakeHomeAssistant(
+            {"sensor.waste": "In 2 Tagen", "sensor.other": "on"}
+        ) as home_assistant:
+            websocket = HomeAssistantWebSocket(
+                home_assistant.url,
+                home_assistant.token,
+                ["sensor.waste"],
+                lambda entity_id, state: states.append((entity_id, state)),
+            )
+            task = asyncio.create_task(websocket.run())
+
+            await asyncio.wait_for(websocket.wait_synced(), 2)
+            await home_assistant.set_state("sensor.other", "off")
+            await home_assistant.set_state("sensor.waste", "In 1 Tagen")
+            await wait_until(lambda: len(states) == 2)
+
+            task.cancel()
+
+        return states
+
+    assert asyncio.run(run()) == [
+        ("sensor.waste", "In 2 Tagen"),
+        ("sensor.waste", "In 1 Tagen"),
+    ]
+
+
+def test_run_resyncs_after_disconnect():
+    """Test that a new snapshot is received after reconnecting."""
+
+    async def run() -> list[tuple[str, str | None]]:
+        states: list[tuple[str, str | None]] = []
+
+        async with FakeHomeAssistant({"sensor.waste": "In 2 Tagen"}) as home_assistant:
+            websocket = HomeAssistantWebSocket(
+                home_assistant.url,
+                home_assistant.token,
+                ["sensor.waste"],
+                lambda entity_id, state: states.append((entity_id, state)),
+                reconnect_delay_seconds=0.05,
+            )
+            task = asyncio.create_task(websocket.run())
+
+            await asyncio.wait_for(websocket.wait_synced(), 2)
+            await home_assistant.disconnect_websockets()
+            home_assistant.states["sensor.waste"] = "In 0 Tagen"
+            await wait_until(lambda: len(states) == 2)
+
+            assert home_assistant.websocket_connection_count == 2
+            task.cancel()
+
+        return states
+
+    assert asyncio.run(run()) == [
+        ("sensor.waste", "In 2 Tagen"),
+        ("sensor.waste", "In 0 Tagen"),
+    ]
+
+
+def test_run_retries_after_failed_authentication():
+    """Test that an invalid token does not sync and keeps retrying."""
+
+    async def run() -> int:
+        async with FakeHomeAssistant({"sensor.waste": "In 2 Tagen"}) as home_assistant:
+            websocket = HomeAssistantWebSocket(
+                home_assistant.url,
+                "invalid",
+                ["sensor.waste"],
+                lambda *_: None,
+                reconnect_delay_seconds=0.05,
+            )
+            task = asyncio.create_task(websocket.run())
+
+            await wait_until(lambda: home_assistant.websocket_connection_count >= 2)
+
+            assert not websocket.is_synced
+            task.cancel()
+
+            return home_assistant.websocket_connection_count
+
+    assert asyncio.run(run()) >= 2
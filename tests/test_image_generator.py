@@ -1,9 +1,17 @@
 """Tests for the image_generator module."""
 
 import pytest
-
-from inky_phat_dashboard.const import ColorMode, ColorPalette
+from PIL import Image
+
+from inky_phat_dashboard.const import (
+    IMAGE_BORDER_PATH,
+    ColorInPalette,
+    ColorMode,
+    ColorPalette,
+    RenderMode,
+)
 from inky_phat_dashboard.image_generator import ImageGenerator
+from inky_phat_dashboard.image_tools import ImageTools
 from inky_phat_dashboard.models import (
     Config,
     DashboardElementData,
@@ -306,3 +314,150 @@ def test_generate_dashboard_view_dark_mode(config: Config):
     assert image is not None
 
     image.show()
+
+
+@pytest.mark.parametrize("color_mode", [ColorMode.LIGHT, ColorMode.DARK])
+@pytest.mark.parametrize("is_border_alert", [False, True])
+def test_create_base_layer(
+    config: Config, color_mode: ColorMode, is_border_alert: bool
+):
+    """Test that the base layer is the background with the recolored border."""
+
+    config.color_mode = color_mode
+    image_generator = ImageGenerator(config)
+    border_color = (
+        image_generator.alert_color
+        if is_border_alert
+        else image_generator.primary_color
+    )
+
+    expected = ImageTools.merge_images(
+        ImageTools.create_background(color_mode),
+        ImageTools.recolor_non_transparent_pixels(
+            Image.open(IMAGE_BORDER_PATH).convert("RGBA"), border_color
+        ),
+        (0, 0),
+    )
+    base_layer = image_generator._create_base_layer(is_border_alert)
+
+    assert base_layer.tobytes() == expected.tobytes()
+
+
+def test_create_base_layer_returns_copies(config: Config):
+    """Test that drawing on a base layer does not change the next one."""
+
+    image_generator = ImageGenerator(config)
+
+    first = image_generator._create_base_layer(False)
+    first.paste((1, 2, 3, 255), (0, 0, 250, 122))
+    second = image_generator._create_base_layer(False)
+
+    assert second is not first
+    assert second.getpixel((0, 0)) != (1, 2, 3, 255)
+
+
+def generate_views(image_generator: ImageGenerator, text: str) -> list[Image.Image]:
+    """Generate every view type with alert and non-alert elements."""
+
+    return [
+        image_generator.generate_detailed_view(
+            DetailedViewData(
+                "media/clock/clock_large.png",
+                text,
+                is_border_alert=True,
+                is_text_alert=True,
+            )
+        ),
+        image_generator.generate_detailed_view_two_lines(
+            DetailedViewTwoLinesData(
+                "media/waste/waste_large.png",
+                text,
+                text,
+                is_icon_alert=True,
+                is_lower_text_alert=True,
+            )
+        ),
+        image_generator.generate_dashboard_view(
+            DashboardViewData(
+                elements=[
+                    DashboardElementData("media/waste/waste_small.png", text),
+                    DashboardElementData(
+                        "media/waste/paper_small.png", text, is_icon_alert=True
+                    ),
+                    DashboardElementData(
+                        "media/waste/organic_small.png", text, is_text_alert=True
+                    ),
+                ]
+            )
+        ),
+    ]
+
+
+@pytest.mark.parametrize("color_mode", [ColorMode.LIGHT, ColorMode.DARK])
+@pytest.mark.parametrize("color_palette", [ColorPalette.RED, ColorPalette.YELLOW])
+def test_palette_render_mode_matches_rgba_without_text(
+    config: Config, color_mode: ColorMode, color_palette: ColorPalette
+):
+    """Test that both render modes give the same pixels without antialiasing."""
+
+    config.color_mode = color_mode
+    config.color_palette = color_palette
+
+    config.render_mode = RenderMode.RGBA
+    expected = generate_views(ImageGenerator(config), "")
+
+    config.render_mode = RenderMode.PALETTE
+    result = generate_views(ImageGenerator(config), "")
+
+    for expected_image, image in zip(expected, result):
+        assert image.mode == "P"
+        assert image.convert("RGB").tobytes() == expected_image.convert("RGB").tobytes()
+
+
+@pytest.mark.parametrize("color_mode", [ColorMode.LIGHT, ColorMode.DARK])
+def test_palette_render_mode_uses_palette_indices(
+    config: Config, color_mode: ColorMode
+):
+    """Test that text is drawn with the palette indices only."""
+
+    config.color_mode = color_mode
+    config.render_mode = RenderMode.PALETTE
+
+    for image in generate_views(ImageGenerator(config), "Morgen"):
+        indices = {index for _, index in image.getcolors()}
+        assert indices == {color.value for color in ColorInPalette}
+
+
+@pytest.mark.parametrize("render_mode", [RenderMode.RGBA, RenderMode.PALETTE])
+@pytest.mark.parametrize("color_mode", [ColorMode.LIGHT, ColorMode.DARK])
+@pytest.mark.parametrize("color_palette", [ColorPalette.RED, ColorPalette.YELLOW])
+def test_palette_indices_follow_inky_driver(
+    config: Config,
+    render_mode: RenderMode,
+    color_mode: ColorMode,
+    color_palette: ColorPalette,
+):
+    """Test that the raw indices are the colors the Inky driver shows for them."""
+
+    inky = pytest.importorskip("inky.inky").Inky
+    alert_index = inky.RED if color_palette == ColorPalette.RED else inky.YELLOW
+    alert_color = (255, 0, 0) if color_palette == ColorPalette.RED else (255, 255, 0)
+    # The driver ignores the embedded palette and only reads the indices
+    driver_colors = {
+        inky.WHITE: (255, 255, 255),
+        inky.BLACK: (0, 0, 0),
+        alert_index: alert_color,
+    }
+
+    config.render_mode = render_mode
+    config.color_mode = color_mode
+    config.color_palette = color_palette
+
+    for image in generate_views(ImageGenerator(config), ""):
+        assert image.mode == "P"
+        assert (
+            bytes(
+                channel for index in image.tobytes() for channel in driver_colors[index]
+            )
+            == image.convert("RGB").tobytes()
+        )
@@ -0,0 +1,237 @@
+"""Tests for the image_tools module."""
+
+import random
+
+import pytest
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+
+from inky_phat_dashboard.const import (
+    DEFAULT_FONT_PATH,
+    INKY_HEIGHT,
+    INKY_WIDTH,
+    RECTANGLE_TEXT_DASHBOARD_UPPER_LEFT,
+    RECTANGLE_TEXT_DETAILED_CENTER,
+    RECTANGLE_TEXT_DETAILED_UPPER,
+    TextRenderer,
+    VerticalAlign,
+)
+from inky_phat_dashboard.image_tools import ImageTools
+
+MEDIA_PATHS = [
+    "media/general/border.png",
+    "media/clock/clock_large.png",
+    "media/waste/organic_large.png",
+    "media/waste/organic_small.png",
+    "media/waste/paper_large.png",
+    "media/waste/paper_small.png",
+    "media/waste/recycling_large.png",
+    "media/waste/recycling_small.png",
+    "media/waste/waste_large.png",
+    "media/waste/waste_small.png",
+]
+
+
+def recolor_per_pixel(
+    image: Image.Image, new_color: tuple[int, int, int, int]
+) -> Image.Image:
+    """Recolor an image pixel by pixel like the original implementation."""
+
+    pixels = image.load()
+
+    for y in range(image.height):
+        for x in range(image.width):
+            pixel = pixels[x, y]
+            if pixel[3] != 0:
+                pixels[x, y] = (new_color[0], new_color[1], new_color[2], pixel[3])
+
+    return image
+
+
+@pytest.mark.parametrize("image_path", MEDIA_PATHS)
+@pytest.mark.parametrize(
+    "new_color", [(0, 0, 0, 255), (255, 255, 255, 255), (255, 0, 0, 255)]
+)
+def test_recolor_non_transparent_pixels_media(
+    image_path: str, new_color: tuple[int, int, int, int]
+):
+    """Test that recoloring the media assets matches the per-pixel implementation."""
+
+    image = Image.open(image_path).convert("RGBA")
+
+    expected = recolor_per_pixel(image.copy(), new_color)
+    result = ImageTools.recolor_non_transparent_pixels(image, new_color)
+
+    assert result is image
+    assert result.tobytes() == expected.tobytes()
+
+
+def test_recolor_non_transparent_pixels_partial_alpha():
+    """Test that partially transparent pixels keep their alpha value."""
+
+    rng = random.Random(0)
+    image = Image.frombytes(
+        "RGBA", (32, 16), bytes(rng.randrange(256) for _ in range(32 * 16 * 4))
+    )
+
+    expected = recolor_per_pixel(image.copy(), (255, 255, 0, 128))
+    result = ImageTools.recolor_non_transparent_pixels(image, (255, 255, 0, 128))
+
+    assert result.tobytes() == expected.tobytes()
+
+
+def test_recolor_non_transparent_pixels_batch():
+    """Test that a batch is recolored in order with a color per image."""
+
+    border = Image.open("media/general/border.png").convert("RGBA")
+    icon = Image.open("media/waste/waste_small.png").convert("RGBA")
+
+    expected = [
+        recolor_per_pixel(border.copy(), (255, 0, 0, 255)),
+        recolor_per_pixel(icon.copy(), (0, 0, 0, 255)),
+    ]
+    result = ImageTools.recolor_non_transparent_pixels_batch(
+        [(border, (255, 0, 0, 255)), (icon, (0, 0, 0, 255))]
+    )
+
+    assert [image.tobytes() for image in result] == [
+        image.tobytes() for image in expected
+    ]
+
+
+def layout_text_countdown(
+    font_path: str,
+    rectangle: tuple[int, int, int, int],
+    text: str,
+) -> tuple[int, tuple[float, float, float, float]]:
+    """Fit a text by counting the font size down like the original implementation."""
+
+    draw = ImageDraw.Draw(Image.new("RGBA", (INKY_WIDTH, INKY_HEIGHT)))
+    _, _, width, height = rectangle
+
+    font_size = 100
+    while font_size > 0:
+        font = ImageFont.truetype(font_path, font_size)
+        text_bbox = draw.textbbox((0, 0), text, font=font)
+        if (
+            text_bbox[2] - text_bbox[0] <= width
+            and text_bbox[3] - text_bbox[1] <= height
+        ):
+            break
+        font_size -= 1
+
+    return max(font_size, 1), text_bbox
+
+
+@pytest.mark.parametrize(
+    "rectangle",
+    [
+        RECTANGLE_TEXT_DASHBOARD_UPPER_LEFT,
+        RECTANGLE_TEXT_DETAILED_CENTER,
+        RECTANGLE_TEXT_DETAILED_UPPER,
+        (0, 0, 3, 3),
+    ],
+)
+@pytest.mark.parametrize(
+    "text",
+    ["Heute", "Morgen", "2", "14", "3 Tage", "Restabfall", "Nicht verfügbar", "22:30"],
+)
+def test_layout_text_matches_countdown(rectangle: tuple[int, int, int, int], text: str):
+    """Test that bisecting the font size gives the same result as counting down."""
+
+    font_size, text_bbox = layout_text_countdown(DEFAULT_FONT_PATH, rectangle, text)
+
+    text_layout = ImageTools.layout_text(
+        DEFAULT_FONT_PATH, rectangle, text, VerticalAlign.CENTER
+    )
+
+    assert text_layout.font_size == font_size
+    assert text_layout.text_bbox == text_bbox
+
+
+def test_get_font_is_cached():
+    """Test that fonts are loaded once per path and size."""
+
+    assert ImageTools.get_font(DEFAULT_FONT_PATH, 12) is ImageTools.get_font(
+        DEFAULT_FONT_PATH, 12
+    )
+
+
+def test_glyph_atlas_rasterizes_glyphs_once():
+    """Test that the glyph atlas is shared per size and rasterizes each glyph once."""
+
+    glyph_atlas = ImageTools.get_glyph_atlas(DEFAULT_FONT_PATH, 24)
+
+    assert ImageTools.get_glyph_atlas(DEFAULT_FONT_PATH, 24) is glyph_atlas
+
+    glyph_atlas.draw_text(Image.new("L", (100, 40)), (0, 0), "Heute", 255)
+
+    assert len(glyph_atlas) == 4
+
+
+@pytest.mark.parametrize("text", ["Heute", "14", "Nicht verfügbar"])
+def test_glyph_atlas_renderer_matches_freetype(text: str):
+    """Test that the glyph atlas draws crisp text where FreeType draws it."""
+
+    images = {}
+    for text_renderer in TextRenderer:
+        image = Image.new("RGBA", (INKY_WIDTH, INKY_HEIGHT), (255, 255, 255, 255))
+        ImageTools.place_text_in_rectangle(
+            image,
+            DEFAULT_FONT_PATH,
+            RECTANGLE_TEXT_DETAILED_CENTER,
+            text,
+            (0, 0, 0, 255),
+            VerticalAlign.CENTER,
+            text_renderer=text_renderer,
+        )
+        images[text_renderer] = image
+
+    glyph_atlas_image = images[TextRenderer.GLYPH_ATLAS]
+    freetype_bbox = ImageChops.invert(
+        images[TextRenderer.FREETYPE].convert("L")
+    ).getbbox()
+    glyph_atlas_bbox = ImageChops.invert(glyph_atlas_image.convert("L")).getbbox()
+
+    assert {color for _, color in glyph_atlas_image.getcolors()} == {
+        (0, 0, 0, 255),
+        (255, 255, 255, 255),
+    }
+    assert all(
+        abs(freetype_edge - glyph_atlas_edge) <= 1
+        for freetype_edge, glyph_atlas_edge in zip(freetype_bbox, glyph_atlas_bbox)
+    )
+
+
+def test_fingerprint_depends_on_pixels_and_palette():
+    """Test that the fingerprint changes with pixels and palette."""
+
+    image = Image.new("P", (4, 4))
+    image.putpalette([255, 255, 255, 255, 0, 0, 0, 0, 0])
+    fingerprint = ImageTools.fingerprint(image)
+
+    assert ImageTools.fingerprint(image.copy()) == fingerprint
+
+    changed_pixel = image.copy()
+    changed_pixel.putpixel((1, 2), 1)
+    assert ImageTools.fingerprint(changed_pixel) != fingerprint
+
+    changed_palette = image.copy()
+    changed_palette.putpalette([0, 0, 0, 255, 0, 0, 255, 255, 255])
+    assert ImageTools.fingerprint(changed_palette) != fingerprint
+
+
+def test_diff_images():
+    """Test the changed bounding box and fraction of two frames."""
+
+    first = Image.new("RGB", (10, 10), (255, 255, 255))
+    second = first.copy()
+
+    assert ImageTools.diff_images(first, second).changed_bbox is None
+    assert ImageTools.diff_images(first, second).changed_fraction == 0
+
+    second.putpixel((2, 3), (0, 0, 0))
+    second.putpixel((5, 7), (254, 255, 255))
+    frame_diff = ImageTools.diff_images(first, second)
+
+    assert frame_diff.changed_bbox == (2, 3, 6, 8)
+    assert frame_diff.changed_fraction == 0.02
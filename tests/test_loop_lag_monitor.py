@@ -0,0 +1,23 @@
+"""Tests for the loop_lag_monitor module."""
+
+import asyncio
+import time
+
+from inky_phat_dashboard.loop_lag_monitor import LoopLagMonitor
+
+
+def test_run_measures_blocked_loop():
+    """Test that blocking the event loop shows up as lag."""
+
+    async def run() -> float:
+        loop_lag_monitor = LoopLagMonitor(interval_seconds=0.01)
+        task = asyncio.create_task(loop_lag_monitor.run())
+
+        await asyncio.sleep(0.05)
+        time.sleep(0.2)
+        await asyncio.sleep(0.05)
+
+        task.cancel()
+        return loop_lag_monitor.max_lag_seconds
+
+    assert asyncio.run(run()) >= 0.15
@@ -0,0 +1,173 @@
+"""Tests for the metrics module."""
+
+import asyncio
+import dataclasses
+
+import aiohttp
+import pytest
+from test_dashboard import FakeModule
+
+from inky_phat_dashboard.const import METRICS_SUMMARY_JOB, DisplayType
+from inky_phat_dashboard.dashboard import Dashboard
+from inky_phat_dashboard.metrics import Metrics, metrics
+from inky_phat_dashboard.metrics_server import MetricsServer
+from inky_phat_dashboard.models import Config, DetailedViewTwoLinesData, ViewData
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    """Disable and clear the process wide metrics after each test."""
+
+    yield
+
+    metrics.enabled = False
+    metrics.reset()
+
+
+def test_disabled_metrics_record_nothing():
+    """Test that disabled metrics ignore all calls."""
+
+    disabled_metrics = Metrics()
+
+    with disabled_metrics.time("render"):
+        disabled_metrics.increment("frames_rendered")
+
+    assert disabled_metrics.render_prometheus() == "\n"
+    assert disabled_metrics.time("render") is disabled_metrics.time("fetch")
+
+
+def test_render_prometheus_contains_cumulative_buckets():
+    """Test the histogram and counter lines of the Prometheus text format."""
+
+    enabled_metrics = Metrics(enabled=True)
+    enabled_metrics.observe("fetch", 0.003)
+    enabled_metrics.observe("fetch", 0.2)
+    enabled_metrics.observe("fetch", 100)
+    enabled_metrics.increment("fetch_errors", 2)
+
+    lines = enabled_metrics.render_prometheus().splitlines()
+
+    assert "# TYPE inky_phat_dashboard_stage_seconds histogram" in lines
+    assert (
+        'inky_phat_dashboard_stage_seconds_bucket{stage="fetch",le="0.005"} 1' in lines
+    )
+    assert (
+        'inky_phat_dashboard_stage_seconds_bucket{stage="fetch",le="60.0"} 2' in lines
+    )
+    assert (
+        'inky_phat_dashboard_stage_seconds_bucket{stage="fetch",le="+Inf"} 3' in lines
+    )
+    assert 'inky_phat_dashboard_stage_seconds_count{stage="fetch"} 3' in lines
+    assert "inky_phat_dashboard_fetch_errors_total 2" in lines
+
+
+def test_summary_reports_stages_and_counters():
+    """Test the log summary of the metrics."""
+
+    enabled_metrics = Metrics(enabled=True)
+
+    assert enabled_metrics.summary() == "Metrics: none recorded"
+
+    enabled_metrics.observe("render", 0.004)
+    enabled_metrics.increment("frames_rendered")
+
+    assert enabled_metrics.summary() == (
+        "Metrics: render n=1 mean=4.0ms p95<=5ms max=4.0ms; frames_rendered=1"
+    )
+
+
+def test_metrics_server_serves_prometheus_text():
+    """Test that the endpoint returns the rendered metrics."""
+
+    enabled_metrics = Metrics(enabled=True)
+    enabled_metrics.increment("frames_rendered")
+    metrics_server = MetricsServer(enabled_metrics, "127.0.0.1", 0)
+
+    async def run() -> str:
+        task = asyncio.create_task(metrics_server.run())
+
+        while not metrics_server.addresses:
+            await asyncio.sleep(0.01)
+
+        host, port = metrics_server.addresses[0][:2]
+
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://{host}:{port}/metrics") as response:
+                text = await response.text()
+
+        task.cancel()
+        return text
+
+    assert "inky_phat_dashboard_frames_rendered_total 1" in asyncio.run(run())
+
+
+def test_dashboard_records_render_stages(config: Config):
+    """Test that rendering a view records its stages and counters."""
+
+    config.display = DisplayType.MEMORY
+    config.metrics_config.enabled = True
+    dashboard = Dashboard(config)
+    view_datas: list[ViewData] = [
+        DetailedViewTwoLinesData("media/waste/waste_large.png", "Restabfall", "2")
+    ]
+    dashboard._modules = [FakeModule(view_datas)]
+
+    asyncio.run(dashboard._refresh_display())
+    asyncio.run(dashboard._refresh_display())
+
+    summary = metrics.summary()
+
+    for stage in [
+        "display_show n=1",
+        "generate_detailed_view_two_lines n=1",
+        "get_view_datas n=2",
+        "palette_conversion n=1",
+        "display_pushes=1",
+        "display_pushes_skipped=1",
+        "frames_rendered=1",
+    ]:
+        assert stage in summary
+
+
+def test_metrics_summary_interval_survives_config_reload(config: Config):
+    """Test that a reload without a log interval keeps the summary job running."""
+
+    config.display = DisplayType.MEMORY
+    config.metrics_config.enabled = True
+    dashboard = Dashboard(config)
+    reloaded_config = dataclasses.replace(config)
+    reloaded_config.metrics_config = dataclasses.replace(
+        config.metrics_config, log_interval_seconds=None
+    )
+
+    asyncio.run(dashboard._apply_config(reloaded_config))
+
+    assert dashboard._scheduler.jobs[METRICS_SUMMARY_JOB].get_interval_seconds() == 300
+
+    config.metrics_config = reloaded_config.metrics_config
+
+    assert METRICS_SUMMARY_JOB not in Dashboard(config)._scheduler.jobs
+
+
+def test_loop_lag_monitor_runs_only_with_metrics_or_debug_logging(config: Config):
+    """Test that the loop lag is only sampled when it is reported."""
+
+    config.display = DisplayType.MEMORY
+    assert Dashboard(config)._loop_lag_monitor is None
+
+    config.logging_config.level = "debug"
+    assert Dashboard(config)._loop_lag_monitor is not None
+
+    config.logging_config.level = "INFO"
+    config.metrics_config.enabled = True
+    loop_lag_monitor = Dashboard(config)._loop_lag_monitor
+    assert loop_lag_monitor is not None
+
+    async def run():
+        task = asyncio.create_task(loop_lag_monitor.run())
+        await asyncio.sleep(0.25)
+        task.cancel()
+
+    asyncio.run(run())
+
+    assert "loop_lag n=" in metrics.summary()
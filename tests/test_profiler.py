@@ -0,0 +1,59 @@
+"""Tests for the profiler module."""
+
+import pstats
+import tracemalloc
+from pathlib import Path
+
+from inky_phat_dashboard.profiler import Profiler
+
+
+def test_profiles_the_next_cycles_and_turns_off(tmp_path: Path):
+    """Test that the given number of cycles is written before profiling stops."""
+
+    profiler = Profiler(tmp_path)
+    profiler.start(cycles=2, top_allocations=5)
+
+    assert profiler.is_active
+    assert tracemalloc.is_tracing()
+
+    for _ in range(3):
+        with profiler.profile_cycle("cycle"):
+            sorted(str(value) for value in range(1000))
+
+    assert not profiler.is_active
+    assert not tracemalloc.is_tracing()
+
+    stats_paths = sorted(tmp_path.glob("*_cycle.pstats"))
+    allocations_paths = sorted(tmp_path.glob("*_cycle.allocations.txt"))
+
+    assert len(stats_paths) == 2
+    assert len(allocations_paths) == 2
+    assert pstats.Stats(str(stats_paths[0])).total_calls > 0
+    assert allocations_paths[0].read_text().startswith("Top 5 allocations:")
+
+
+def test_nested_profiles_on_one_thread_are_skipped(tmp_path: Path):
+    """Test that a profile inside a running profile of the thread is not written."""
+
+    profiler = Profiler(tmp_path)
+    profiler.start(cycles=2, top_allocations=5)
+
+    with profiler.profile_cycle("outer"):
+        with profiler.profile_cycle("inner"):
+            pass
+
+    profiler.stop()
+
+    assert [path.suffix for path in profiler.written_paths] == [".pstats", ".txt"]
+    assert "outer" in profiler.written_paths[0].name
+
+
+def test_inactive_profiler_writes_nothing(tmp_path: Path):
+    """Test that nothing is profiled before the profiler is started."""
+
+    profiler = Profiler(tmp_path)
+
+    with profiler.profile_cycle("cycle"), profiler.profile_section("section"):
+        pass
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,148 @@
+"""Tests for the scheduler module."""
+
+import asyncio
+import time
+
+from inky_phat_dashboard.scheduler import Scheduler
+
+
+def test_slow_runs_do_not_drift():
+    """Test that runs start on their deadlines even when each run is slow."""
+
+    starts: list[float] = []
+
+    async def slow_job():
+        starts.append(time.monotonic())
+        await asyncio.sleep(0.05)
+
+    async def run():
+        scheduler = Scheduler()
+        scheduler.add_job("slow", slow_job, lambda: 0.1)
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.55)
+        task.cancel()
+        return scheduler
+
+    scheduler = asyncio.run(run())
+
+    assert len(starts) == 6
+    assert starts[-1] - starts[0] < 0.5 + 0.05
+    assert scheduler.jobs["slow"].max_drift_seconds < 0.05
+
+
+def test_triggers_are_coalesced_and_keep_the_deadline():
+    """Test that triggers run the job once without moving its deadline."""
+
+    runs: list[str] = []
+
+    async def job():
+        runs.append("deadline")
+
+    async def on_trigger():
+        runs.append("trigger")
+        await asyncio.sleep(0.05)
+
+    async def run():
+        scheduler = Scheduler()
+        scheduler.add_job("job", job, lambda: 0.3, on_trigger=on_trigger)
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.1)
+
+        for _ in range(3):
+            scheduler.trigger("job")
+        await asyncio.sleep(0.1)
+
+        scheduler.trigger("job")
+        scheduler.trigger("job")
+        await asyncio.sleep(0.15)
+        task.cancel()
+
+    asyncio.run(run())
+
+    assert runs == ["deadline", "trigger", "trigger", "deadline"]
+
+
+def test_reschedule_applies_changed_interval():
+    """Test that a shorter interval takes effect without waiting for the old one."""
+
+    interval_seconds = 10
+    runs: list[float] = []
+
+    async def job():
+        runs.append(time.monotonic())
+
+    async def run():
+        nonlocal interval_seconds
+
+        scheduler = Scheduler()
+        scheduler.add_job("job", job, lambda: interval_seconds, run_immediately=False)
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.05)
+
+        interval_seconds = 0.1
+        scheduler.reschedule()
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+    asyncio.run(run())
+
+    assert len(runs) == 1
+
+
+def test_missed_deadlines_are_skipped():
+    """Test that a run longer than several intervals skips the missed deadlines."""
+
+    runs = 0
+
+    async def job():
+        nonlocal runs
+        runs += 1
+        if runs == 1:
+            time.sleep(0.25)
+
+    async def run():
+        scheduler = Scheduler()
+        scheduler.add_job("job", job, lambda: 0.1)
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.32)
+        task.cancel()
+        return scheduler
+
+    scheduler = asyncio.run(run())
+
+    assert scheduler.jobs["job"].missed_deadlines == 1
+    assert runs == 3
+
+
+def test_failing_interval_does_not_stop_other_jobs():
+    """Test that a job whose interval raises is retried while others keep running."""
+
+    runs: list[str] = []
+    intervals: list[float | None] = [None, 0.1]
+
+    async def job():
+        runs.append("job")
+
+    async def failing_job():
+        runs.append("failing")
+
+    def get_failing_interval() -> float:
+        interval = intervals[0]
+        if interval is None:
+            intervals.pop(0)
+            raise TypeError("interval not set")
+        return interval
+
+    async def run():
+        scheduler = Scheduler(retry_delay_seconds=0.05)
+        scheduler.add_job("job", job, lambda: 0.1)
+        scheduler.add_job("failing", failing_job, get_failing_interval)
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.22)
+        assert not task.done()
+        task.cancel()
+
+    asyncio.run(run())
+
+    assert runs.count("job") == 3
+    assert runs.count("failing") >= 1
@@ -0,0 +1,75 @@
+"""Tests for the sprite_cache module."""
+
+import os
+import shutil
+from pathlib import Path
+
+from PIL import Image
+
+from inky_phat_dashboard.image_tools import ImageTools
+from inky_phat_dashboard.sprite_cache import SpriteCache
+
+RED = (255, 0, 0, 255)
+BLACK = (0, 0, 0, 255)
+
+
+def test_get_recolors_asset():
+    """Test that a sprite is the recolored asset."""
+
+    sprite_cache = SpriteCache()
+
+    sprite = sprite_cache.get("media/waste/waste_small.png", RED)
+    expected = ImageTools.recolor_non_transparent_pixels(
+        Image.open("media/waste/waste_small.png").convert("RGBA"), RED
+    )
+
+    assert sprite.mode == "RGBA"
+    assert sprite.tobytes() == expected.tobytes()
+
+
+def test_get_reuses_sprite():
+    """Test that a sprite is decoded once per path and color."""
+
+    sprite_cache = SpriteCache()
+
+    sprite = sprite_cache.get("media/waste/waste_small.png", RED)
+
+    assert sprite_cache.get("media/waste/waste_small.png", RED) is sprite
+    assert sprite_cache.get("media/waste/waste_small.png", BLACK) is not sprite
+    assert len(sprite_cache) == 2
+
+
+def test_get_evicts_least_recently_used():
+    """Test that the least recently used sprite is evicted."""
+
+    sprite_cache = SpriteCache(max_size=2)
+
+    paper = sprite_cache.get("media/waste/paper_small.png", RED)
+    sprite_cache.get("media/waste/waste_small.png", RED)
+    sprite_cache.get("media/waste/paper_small.png", RED)
+    sprite_cache.get("media/waste/organic_small.png", RED)
+
+    assert len(sprite_cache) == 2
+    assert sprite_cache.get("media/waste/paper_small.png", RED) is paper
+
+
+def test_get_invalidates_on_mtime_change(tmp_path: Path):
+    """Test that a sprite is reloaded when its file changes."""
+
+    path = tmp_path / "icon.png"
+    shutil.copy("media/waste/waste_small.png", path)
+
+    sprite_cache = SpriteCache()
+    sprite = sprite_cache.get(str(path), RED)
+
+    shutil.copy("media/waste/paper_small.png", path)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    reloaded = sprite_cache.get(str(path), RED)
+
+    assert reloaded is not sprite
+    assert (
+        reloaded.tobytes()
+        == sprite_cache.get("media/waste/paper_small.png", RED).tobytes()
+    )
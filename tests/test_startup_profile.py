@@ -0,0 +1,48 @@
+"""Tests for the startup_profile module."""
+
+import subprocess
+import sys
+import time
+
+import pytest
+
+from inky_phat_dashboard.startup_profile import StartupProfile
+
+
+def test_phases_follow_each_other():
+    """Test that each phase lasts from the end of the previous one."""
+
+    startup_profile = StartupProfile()
+
+    time.sleep(0.01)
+    startup_profile.mark("import")
+    startup_profile.mark("config")
+
+    (import_phase, import_seconds), (config_phase, config_seconds) = (
+        startup_profile.phases
+    )
+
+    assert (import_phase, config_phase) == ("import", "config")
+    assert import_seconds >= 0.01
+    assert import_seconds + config_seconds == pytest.approx(
+        startup_profile.total_seconds
+    )
+    assert startup_profile.report().splitlines()[1].startswith("import")
+
+
+def test_main_module_defers_imports_to_the_profile():
+    """Test that the main module imports nothing the import phase should cover."""
+
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, inky_phat_dashboard.__main__; "
+            "print(sorted({'dotenv', 'PIL', 'tzlocal'} & set(sys.modules)))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "[]"
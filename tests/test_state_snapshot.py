@@ -0,0 +1,70 @@
+"""Tests for the state_snapshot module."""
+
+from pathlib import Path
+
+from PIL import Image
+
+from inky_phat_dashboard.const import LAST_FRAME_FILE_NAME, STATE_SNAPSHOT_FILE_NAME
+from inky_phat_dashboard.image_tools import ImageTools
+from inky_phat_dashboard.state_snapshot import StateSnapshot
+
+MODULE_STATES = {"0_WasteModule": {"sensor.sensor1": {"is_available": False}}}
+
+
+def test_save_and_load_roundtrip(tmp_path: Path):
+    """Test that saved states and frames are loaded by a new snapshot."""
+
+    frame = Image.new("RGB", (250, 122), (255, 0, 0))
+    state_snapshot = StateSnapshot(tmp_path)
+    state_snapshot.save(
+        MODULE_STATES, "0_WasteModule/dashboard", frame, ImageTools.fingerprint(frame)
+    )
+
+    loaded_snapshot = StateSnapshot(tmp_path)
+    loaded_snapshot.load()
+    loaded_frame = loaded_snapshot.load_frame()
+
+    assert loaded_snapshot.module_states == MODULE_STATES
+    assert loaded_snapshot.view_id == "0_WasteModule/dashboard"
+    assert loaded_frame.tobytes() == frame.tobytes()
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        LAST_FRAME_FILE_NAME,
+        STATE_SNAPSHOT_FILE_NAME,
+    ]
+
+
+def test_save_skips_unchanged_content(tmp_path: Path):
+    """Test that unchanged states and frames are not written again."""
+
+    frame = Image.new("RGB", (250, 122))
+    fingerprint = ImageTools.fingerprint(frame)
+    state_snapshot = StateSnapshot(tmp_path)
+
+    state_snapshot.save(MODULE_STATES, "a", frame, fingerprint)
+    state_snapshot.save(MODULE_STATES, "a", frame, fingerprint)
+
+    assert state_snapshot.saves == 2
+
+    state_snapshot.save(MODULE_STATES, "b", frame, fingerprint)
+
+    assert state_snapshot.saves == 3
+
+    loaded_snapshot = StateSnapshot(tmp_path)
+    loaded_snapshot.load()
+    loaded_snapshot.load_frame()
+    loaded_snapshot.save(MODULE_STATES, "b", frame, fingerprint)
+
+    assert loaded_snapshot.saves == 0
+
+
+def test_load_ignores_invalid_snapshot(tmp_path: Path):
+    """Test that a corrupt snapshot is ignored instead of failing the startup."""
+
+    (tmp_path / STATE_SNAPSHOT_FILE_NAME).write_text("{")
+    (tmp_path / LAST_FRAME_FILE_NAME).write_bytes(b"not a png")
+    state_snapshot = StateSnapshot(tmp_path)
+
+    state_snapshot.load()
+
+    assert state_snapshot.module_states == {}
+    assert state_snapshot.load_frame() is None
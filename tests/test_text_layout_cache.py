@@ -0,0 +1,138 @@
+"""Tests for the text_layout_cache module."""
+
+import os
+import shutil
+from pathlib import Path
+
+from inky_phat_dashboard.const import DEFAULT_FONT_PATH, ColorMode, VerticalAlign
+from inky_phat_dashboard.image_tools import ImageTools
+from inky_phat_dashboard.text_layout_cache import TextLayoutCache
+
+RECTANGLE = (10, 10, 100, 40)
+
+
+def test_get_returns_put_layout():
+    """Test that a layout is returned for the same font, rectangle and text."""
+
+    text_layout_cache = TextLayoutCache()
+    text_layout = ImageTools.layout_text(
+        DEFAULT_FONT_PATH, RECTANGLE, "Heute", VerticalAlign.CENTER
+    )
+
+    assert (
+        text_layout_cache.get(
+            DEFAULT_FONT_PATH, RECTANGLE, "Heute", VerticalAlign.CENTER
+        )
+        is None
+    )
+
+    text_layout_cache.put(
+        DEFAULT_FONT_PATH, RECTANGLE, "Heute", VerticalAlign.CENTER, text_layout
+    )
+
+    assert (
+        text_layout_cache.get(
+            DEFAULT_FONT_PATH, RECTANGLE, "Heute", VerticalAlign.CENTER
+        )
+        == text_layout
+    )
+    assert (
+        text_layout_cache.get(DEFAULT_FONT_PATH, RECTANGLE, "Heute", VerticalAlign.TOP)
+        is None
+    )
+
+
+def test_layouts_persist_across_instances(tmp_path: Path):
+    """Test that saved layouts are loaded by a new cache."""
+
+    cache_path = tmp_path / "text_layout_cache.json"
+    text_layout = ImageTools.layout_text(
+        DEFAULT_FONT_PATH, RECTANGLE, "Morgen", VerticalAlign.TOP
+    )
+
+    text_layout_cache = TextLayoutCache(cache_path)
+    text_layout_cache.put(
+        DEFAULT_FONT_PATH, RECTANGLE, "Morgen", VerticalAlign.TOP, text_layout
+    )
+    text_layout_cache.save()
+
+    assert (
+        TextLayoutCache(cache_path).get(
+            DEFAULT_FONT_PATH, RECTANGLE, "Morgen", VerticalAlign.TOP
+        )
+        == text_layout
+    )
+
+
+def test_layouts_are_dropped_when_font_changes(tmp_path: Path):
+    """Test that layouts of a font are dropped when its file changes."""
+
+    font_path = str(tmp_path / "font.otf")
+    shutil.copyfile(DEFAULT_FONT_PATH, font_path)
+    cache_path = tmp_path / "text_layout_cache.json"
+    text_layout = ImageTools.layout_text(
+        font_path, RECTANGLE, "Heute", VerticalAlign.CENTER
+    )
+
+    text_layout_cache = TextLayoutCache(cache_path)
+    text_layout_cache.put(
+        font_path, RECTANGLE, "Heute", VerticalAlign.CENTER, text_layout
+    )
+    text_layout_cache.save()
+
+    with open(font_path, "ab") as font_file:
+        font_file.write(b"\0")
+    os.utime(font_path, ns=(0, 0))
+
+    assert (
+        TextLayoutCache(cache_path).get(
+            font_path, RECTANGLE, "Heute", VerticalAlign.CENTER
+        )
+        is None
+    )
+
+
+def test_place_text_in_rectangle_uses_cache():
+    """Test that text placed with a cached layout matches the fitted layout."""
+
+    text_layout_cache = TextLayoutCache()
+    text_layout = ImageTools.layout_text(
+        DEFAULT_FONT_PATH, RECTANGLE, "Heute", VerticalAlign.CENTER
+    )
+    image = ImageTools.create_background(ColorMode.LIGHT)
+    expected = ImageTools.create_background(ColorMode.LIGHT)
+
+    ImageTools.place_text_in_rectangle(
+        ImageTools.create_background(ColorMode.LIGHT),
+        DEFAULT_FONT_PATH,
+        RECTANGLE,
+        "Heute",
+        (0, 0, 0, 255),
+        VerticalAlign.CENTER,
+        text_layout_cache,
+    )
+    ImageTools.place_text_in_rectangle(
+        image,
+        DEFAULT_FONT_PATH,
+        RECTANGLE,
+        "Heute",
+        (0, 0, 0, 255),
+        VerticalAlign.CENTER,
+        text_layout_cache,
+    )
+    ImageTools.place_text_in_rectangle(
+        expected,
+        DEFAULT_FONT_PATH,
+        RECTANGLE,
+        "Heute",
+        (0, 0, 0, 255),
+        VerticalAlign.CENTER,
+    )
+
+    assert (
+        text_layout_cache.get(
+            DEFAULT_FONT_PATH, RECTANGLE, "Heute", VerticalAlign.CENTER
+        )
+        == text_layout
+    )
+    assert image.tobytes() == expected.tobytes()
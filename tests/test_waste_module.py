@@ -0,0 +1,359 @@
+"""Tests for the waste_module module."""
+
+import asyncio
+import datetime
+import time
+
+import pytest
+import tzlocal
+from fake_home_assistant import (
+    FakeHomeAssistant,
+    create_config,
+    create_states,
+)
+
+from inky_phat_dashboard.models import StateInformation
+from inky_phat_dashboard.waste_module import WasteModule
+
+
+async def timed_update(sensor_count: int, latency_seconds: float) -> float:
+    """Update a waste module against a slow server and return the duration."""
+
+    async with FakeHomeAssistant(
+        create_states(sensor_count), latency_seconds=latency_seconds
+    ) as home_assistant:
+        waste_module = WasteModule(
+            create_config(
+                home_assistant.url, sensor_count, max_parallel_requests=sensor_count
+            )
+        )
+
+        start = time.perf_counter()
+        await waste_module.update()
+        duration = time.perf_counter() - start
+
+    assert all(
+        state_information is not None and state_information.is_available
+        for state_information in waste_module._latest_states.values()
+    )
+
+    return duration
+
+
+def test_update_duration_does_not_grow_with_sensor_count():
+    """Test that sensors are fetched concurrently."""
+
+    single_duration = asyncio.run(timed_update(1, latency_seconds=0.2))
+    many_duration = asyncio.run(timed_update(8, latency_seconds=0.2))
+
+    assert many_duration < 0.2 * 3
+    assert many_duration < single_duration * 3
+
+
+def test_update_limits_parallel_requests():
+    """Test that no more than max_parallel_requests are sent at once."""
+
+    async def update() -> float:
+        async with FakeHomeAssistant(
+            create_states(4), latency_seconds=0.2
+        ) as home_assistant:
+            waste_module = WasteModule(
+                create_config(home_assistant.url, 4, max_parallel_requests=2)
+            )
+
+            start = time.perf_counter()
+            await waste_module.update()
+            return time.perf_counter() - start
+
+    assert asyncio.run(update()) >= 0.4
+
+
+def test_update_isolates_failing_and_slow_sensors():
+    """Test that only failing or timed out sensors become unavailable."""
+
+    async def update() -> WasteModule:
+        async with FakeHomeAssistant(create_states(3)) as home_assistant:
+            home_assistant.failing_entity_ids.add("sensor.sensor1")
+            home_assistant.entity_latency_seconds["sensor.sensor2"] = 5
+
+            waste_module = WasteModule(
+                create_config(home_assistant.url, 3, request_timeout_seconds=0.2)
+            )
+            await waste_module.update()
+            return waste_module
+
+    waste_module = asyncio.run(update())
+    availability = {
+        sensor_config.name: state_information.is_available
+        for sensor_config, state_information in waste_module._latest_states.items()
+    }
+
+    assert availability == {"sensor0": True, "sensor1": False, "sensor2": False}
+
+
+def test_update_with_websocket_does_not_poll():
+    """Test that states come from the WebSocket subscription instead of polling."""
+
+    def remaining_days(waste_module: WasteModule) -> list[int | None]:
+        return [
+            state_information.remaining_days
+            for state_information in waste_module._latest_states.values()
+        ]
+
+    async def update() -> tuple[list[int | None], list[int | None], int]:
+        async with FakeHomeAssistant(create_states(2)) as home_assistant:
+            waste_module = WasteModule(
+                create_config(home_assistant.url, 2, use_websocket=True)
+            )
+
+            await waste_module.update()
+            before = remaining_days(waste_module)
+
+            await home_assistant.set_state("sensor.sensor0", "In 3 Tagen")
+            async with asyncio.timeout(2):
+                while remaining_days(waste_module)[0] != 3:
+                    await asyncio.sleep(0.01)
+
+            await waste_module.update()
+            after = remaining_days(waste_module)
+
+            waste_module._websocket_task.cancel()
+
+            return before, after, home_assistant.request_count
+
+    before, after, request_count = asyncio.run(update())
+
+    assert before == [0, 1]
+    assert after == [3, 1]
+    assert request_count == 0
+
+
+def test_update_bulk_fetch_uses_single_request():
+    """Test that all sensors are fetched with one request in bulk mode."""
+
+    async def update() -> tuple[WasteModule, int]:
+        states = create_states(4)
+        states["sensor.unrelated"] = "on"
+
+        async with FakeHomeAssistant(states) as home_assistant:
+            waste_module = WasteModule(
+                create_config(home_assistant.url, 5, bulk_fetch=True)
+            )
+            await waste_module.update()
+            return waste_module, home_assistant.request_count
+
+    waste_module, request_count = asyncio.run(update())
+    availability = [
+        state_information.is_available
+        for state_information in waste_module._latest_states.values()
+    ]
+
+    assert request_count == 1
+    assert availability == [True, True, True, True, False]
+
+
+@pytest.mark.parametrize("failure", ["is_bulk_failing", "is_bulk_malformed"])
+def test_update_bulk_fetch_falls_back_to_single_requests(failure: str):
+    """Test that single requests are made when the bulk request fails."""
+
+    async def update() -> tuple[WasteModule, int]:
+        async with FakeHomeAssistant(create_states(3)) as home_assistant:
+            setattr(home_assistant, failure, True)
+            waste_module = WasteModule(
+                create_config(home_assistant.url, 3, bulk_fetch=True)
+            )
+            await waste_module.update()
+            return waste_module, home_assistant.request_count
+
+    waste_module, request_count = asyncio.run(update())
+
+    assert request_count == 1 + 3
+    assert all(
+        state_information.is_available
+        for state_information in waste_module._latest_states.values()
+    )
+
+
+def test_config_change_keeps_states_of_unchanged_sensors():
+    """Test that only added or changed sensors lose their state on a reload."""
+
+    async def run() -> WasteModule:
+        async with FakeHomeAssistant(create_states(3)) as home_assistant:
+            config = create_config(home_assistant.url, 2)
+            waste_module = WasteModule(config)
+            await waste_module.update()
+
+            config.apply(create_config(home_assistant.url, 3))
+            waste_module.on_config_changed({"home_assistant_config"})
+
+            assert await waste_module.get_view_datas()
+
+            return waste_module
+
+    waste_module = asyncio.run(run())
+
+    assert [
+        state_information is not None
+        for state_information in waste_module._latest_states.values()
+    ] == [True, True, False]
+
+
+def test_config_change_drops_parsed_states_of_removed_sensors():
+    """Test that a reload forgets the parsed states of removed sensors."""
+
+    async def run() -> WasteModule:
+        async with FakeHomeAssistant(create_states(3)) as home_assistant:
+            config = create_config(home_assistant.url, 3)
+            waste_module = WasteModule(config)
+            await waste_module.update()
+            assert len(waste_module._parsed_states) == 3
+
+            config.apply(create_config(home_assistant.url, 2))
+            waste_module.on_config_changed({"home_assistant_config"})
+
+            return waste_module
+
+    waste_module = asyncio.run(run())
+
+    assert set(waste_module._parsed_states) == set(waste_module._latest_states)
+
+
+def test_update_notifies_listeners_only_on_changes():
+    """Test that the data listeners are called when a state changed."""
+
+    notifications = 0
+
+    def on_data_changed():
+        nonlocal notifications
+        notifications += 1
+
+    async def run():
+        async with FakeHomeAssistant(create_states(2)) as home_assistant:
+            waste_module = WasteModule(create_config(home_assistant.url, 2))
+            waste_module.add_data_listener(on_data_changed)
+
+            await waste_module.update()
+            await waste_module.update()
+            assert notifications == 1
+
+            home_assistant.states["sensor.sensor1"] = "In 5 Tagen"
+            await waste_module.update()
+
+    asyncio.run(run())
+
+    assert notifications == 2
+
+
+def test_update_skips_parsing_unchanged_states():
+    """Test that states are parsed again only when last_changed moved."""
+
+    async def run() -> list[str]:
+        async with FakeHomeAssistant(create_states(2)) as home_assistant:
+            waste_module = WasteModule(create_config(home_assistant.url, 2))
+            parsed_states = []
+            parse_state = waste_module._parser.parse_state
+            waste_module._parser.parse_state = lambda state: (
+                parsed_states.append(state) or parse_state(state)
+            )
+
+            await waste_module.update()
+            await waste_module.update()
+
+            home_assistant.states["sensor.sensor1"] = "In 5 Tagen"
+            await waste_module.update()
+
+            return parsed_states
+
+    assert asyncio.run(run()) == ["In 0 Tagen", "In 1 Tagen", "In 5 Tagen"]
+
+
+def test_get_view_datas_reuses_view_datas_until_states_change():
+    """Test that the view datas are built again only after a change."""
+
+    async def run():
+        async with FakeHomeAssistant(create_states(2)) as home_assistant:
+            waste_module = WasteModule(create_config(home_assistant.url, 2))
+
+            await waste_module.update()
+            view_datas = await waste_module.get_view_datas()
+
+            await waste_module.update()
+            assert (await waste_module.get_view_datas())[0] is view_datas[0]
+
+            home_assistant.states["sensor.sensor1"] = "In 5 Tagen"
+            await waste_module.update()
+            assert (await waste_module.get_view_datas())[0] is not view_datas[0]
+
+    asyncio.run(run())
+
+
+def test_update_interval_backs_off_and_speeds_up_around_midnight():
+    """Test that stable states stretch the interval except around midnight."""
+
+    config = create_config("", 1, max_poll_interval_seconds=600)
+    config.data_timeout_seconds = 20
+    waste_module = WasteModule(config)
+    afternoon = datetime.datetime(2024, 5, 1, 15, 0)
+
+    assert waste_module._get_update_interval_seconds(afternoon) == 20
+
+    waste_module._stable_updates = 2
+    assert waste_module._get_update_interval_seconds(afternoon) == 80
+
+    waste_module._stable_updates = 10
+    assert waste_module._get_update_interval_seconds(afternoon) == 600
+    assert (
+        waste_module._get_update_interval_seconds(datetime.datetime(2024, 5, 1, 23, 58))
+        == 120
+    )
+    assert (
+        waste_module._get_update_interval_seconds(datetime.datetime(2024, 5, 2, 0, 5))
+        == 20
+    )
+
+
+def test_restore_state_keeps_absolute_due_dates():
+    """Test that dumped states are restored with the same due dates."""
+
+    due_date = datetime.datetime.now(tzlocal.get_localzone()) + datetime.timedelta(
+        days=2
+    )
+    config = create_config("", 2)
+    waste_module = WasteModule(config)
+    sensor_configs = config.home_assistant_config.sensor_configs
+    waste_module._latest_states[sensor_configs[0]] = StateInformation(
+        is_available=True, due_date=due_date
+    )
+    waste_module._latest_states[sensor_configs[1]] = StateInformation(
+        is_available=False
+    )
+
+    restored_module = WasteModule(config)
+    restored_module.restore_state(waste_module.dump_state())
+
+    assert restored_module._latest_states == waste_module._latest_states
+    assert asyncio.run(restored_module.get_view_datas()) == asyncio.run(
+        waste_module.get_view_datas()
+    )
+
+
+def test_view_datas_have_stable_ids_and_alert_dwell_weights():
+    """Test that views keep their ids and alert views stay longer."""
+
+    config = create_config("", 2)
+    config.waste_detailed_days = 3
+    config.waste_alert_days = 1
+    config.waste_alert_dwell_weight = 3
+    waste_module = WasteModule(config)
+    now = datetime.datetime.now(tzlocal.get_localzone())
+
+    for days, sensor_config in zip([1, 3], config.home_assistant_config.sensor_configs):
+        waste_module._latest_states[sensor_config] = StateInformation(
+            is_available=True, due_date=now + datetime.timedelta(days=days)
+        )
+
+    view_datas = asyncio.run(waste_module.get_view_datas())
+
+    assert [
+        (view_data.view_id, view_data.dwell_weight) for view_data in view_datas
+    ] == [("dashboard", 3), ("detailed_sensor0", 3), ("detailed_sensor1", 1)]